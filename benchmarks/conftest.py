@@ -0,0 +1,94 @@
+import pytest
+from allagash import Coverage
+from generators import (
+    radius_for_density,
+    random_demand_points,
+    random_demand_polygons,
+    random_service_areas,
+)
+
+# (demand, supply) sizes of each scale
+SCALES = {
+    "small": [(1_000, 100), (10_000, 1_000)],
+    "medium": [(100_000, 1_000), (100_000, 10_000)],
+    "large": [(1_000_000, 10_000)],
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--scale",
+        action="append",
+        choices=sorted(SCALES),
+        help="The sizes to benchmark. Can be repeated. Defaults to small.",
+    )
+    parser.addoption(
+        "--density",
+        type=float,
+        default=5.0,
+        help="The average number of supply locations covering a demand location.",
+    )
+    parser.addoption(
+        "--vertices",
+        type=int,
+        default=None,
+        help="The number of vertices of the service area polygons. Defaults to circles.",
+    )
+    parser.addoption(
+        "--max-solve-demand",
+        type=int,
+        default=10_000,
+        help="The largest number of demand locations to benchmark solving with CBC.",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        scales = metafunc.config.getoption("scale") or ["small"]
+        sizes = [size for scale in scales for size in SCALES[scale]]
+        metafunc.parametrize(
+            "size", sizes, ids=[f"{d}x{s}" for d, s in sizes], scope="session"
+        )
+
+
+@pytest.fixture(scope="session")
+def density(request):
+    return request.config.getoption("density")
+
+
+@pytest.fixture(scope="session")
+def demand_points(size):
+    return random_demand_points(size[0])
+
+
+@pytest.fixture(scope="session")
+def demand_polygons(size):
+    return random_demand_polygons(size[0])
+
+
+@pytest.fixture(scope="session")
+def service_areas(request, size, density):
+    return random_service_areas(
+        size[1],
+        radius_for_density(size[1], density),
+        vertices=request.config.getoption("vertices"),
+    )
+
+
+@pytest.fixture(scope="session")
+def coverage(demand_points, service_areas):
+    return Coverage.from_geodataframes(
+        demand_points,
+        service_areas,
+        "GEOID",
+        "ORIG_ID",
+        demand_col="Population",
+        sparse=True,
+    )
+
+
+@pytest.fixture
+def solvable_size(request, size):
+    if size[0] > request.config.getoption("max_solve_demand"):
+        pytest.skip("Too many demand locations to solve, see --max-solve-demand")
+    return size
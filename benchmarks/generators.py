@@ -0,0 +1,96 @@
+import math
+import numpy as np
+import geopandas
+import shapely
+
+
+def radius_for_density(n_supply, density, extent=1.0):
+    """
+    Finds the radius of the service areas so that, on average, each demand location is covered by `density` supply
+    locations when both are spread uniformly over a square.
+
+    :param int n_supply: The number of supply locations
+    :param float density: The average number of supply locations covering a demand location
+    :param float extent: (optional) The side length of the square. If not supplied, the default is 1.
+    :return: The radius of the service areas
+    :rtype: float
+    """
+    return extent * math.sqrt(density / (math.pi * n_supply))
+
+
+def random_demand_points(
+    n, seed=0, extent=1.0, id_col="GEOID", demand_col="Population"
+):
+    """
+    Creates demand points spread uniformly over a square, with a random amount of demand.
+
+    :param int n: The number of demand locations
+    :param int seed: (optional) The seed of the random numbers. If not supplied, the default is 0.
+    :param float extent: (optional) The side length of the square. If not supplied, the default is 1.
+    :param str id_col: (optional) The name of the id column. If not supplied, the default is "GEOID".
+    :param str demand_col: (optional) The name of the demand column. If not supplied, the default is "Population".
+    :return: The demand locations
+    :rtype: ~geopandas.GeoDataFrame
+    """
+    rng = np.random.default_rng(seed)
+    xy = rng.random((n, 2)) * extent
+    return geopandas.GeoDataFrame(
+        {id_col: np.arange(n), demand_col: rng.integers(1, 1000, n)},
+        geometry=shapely.points(xy),
+    )
+
+
+def random_demand_polygons(
+    n, seed=0, extent=1.0, id_col="GEOID", demand_col="Population"
+):
+    """
+    Creates square demand areas on a grid covering a square, with a random amount of demand. The number of areas is
+    rounded down to a square number.
+
+    :param int n: The number of demand locations
+    :param int seed: (optional) The seed of the random numbers. If not supplied, the default is 0.
+    :param float extent: (optional) The side length of the square. If not supplied, the default is 1.
+    :param str id_col: (optional) The name of the id column. If not supplied, the default is "GEOID".
+    :param str demand_col: (optional) The name of the demand column. If not supplied, the default is "Population".
+    :return: The demand locations
+    :rtype: ~geopandas.GeoDataFrame
+    """
+    rng = np.random.default_rng(seed)
+    side = max(int(math.sqrt(n)), 1)
+    size = extent / side
+    x, y = np.meshgrid(np.arange(side) * size, np.arange(side) * size)
+    x, y = x.ravel(), y.ravel()
+    return geopandas.GeoDataFrame(
+        {id_col: np.arange(len(x)), demand_col: rng.integers(1, 1000, len(x))},
+        geometry=shapely.box(x, y, x + size, y + size),
+    )
+
+
+def random_service_areas(
+    n, radius, seed=0, extent=1.0, vertices=None, id_col="ORIG_ID"
+):
+    """
+    Creates service areas centered on supply locations spread uniformly over a square. The service areas are circles,
+    or regular polygons if the number of vertices is supplied.
+
+    :param int n: The number of supply locations
+    :param float radius: The radius of the service areas, see :func:`radius_for_density`
+    :param int seed: (optional) The seed of the random numbers. If not supplied, the default is 0.
+    :param float extent: (optional) The side length of the square. If not supplied, the default is 1.
+    :param int vertices: (optional) The number of vertices of the polygons. If not supplied, circles are created.
+    :param str id_col: (optional) The name of the id column. If not supplied, the default is "ORIG_ID".
+    :return: The service areas
+    :rtype: ~geopandas.GeoDataFrame
+    """
+    rng = np.random.default_rng(seed + 1)
+    xy = rng.random((n, 2)) * extent
+    if vertices is None:
+        geometry = shapely.buffer(shapely.points(xy), radius)
+    else:
+        angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+        ring = np.column_stack([np.cos(angles), np.sin(angles)]) * radius
+        coordinates = xy[:, np.newaxis, :] + ring[np.newaxis, :, :]
+        geometry = shapely.polygons(
+            np.concatenate([coordinates, coordinates[:, :1]], axis=1)
+        )
+    return geopandas.GeoDataFrame({id_col: np.arange(n)}, geometry=geometry)
@@ -0,0 +1,25 @@
+from allagash import Coverage
+
+
+def test_from_geodataframes_binary(benchmark, demand_points, service_areas):
+    coverage = benchmark.pedantic(
+        Coverage.from_geodataframes,
+        args=(demand_points, service_areas, "GEOID", "ORIG_ID"),
+        kwargs={"demand_col": "Population", "sparse": True},
+        rounds=3,
+    )
+    benchmark.extra_info["nonzeros"] = int(coverage.matrix.nnz)
+
+
+def test_from_geodataframes_partial(benchmark, demand_polygons, service_areas):
+    coverage = benchmark.pedantic(
+        Coverage.from_geodataframes,
+        args=(demand_polygons, service_areas, "GEOID", "ORIG_ID"),
+        kwargs={
+            "demand_col": "Population",
+            "coverage_type": "partial",
+            "sparse": True,
+        },
+        rounds=3,
+    )
+    benchmark.extra_info["nonzeros"] = int(coverage.matrix.nnz)
@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+
+# Modules that are only loaded when they are used
+LAZY_MODULES = ["pulp", "scipy.spatial", "importlib.metadata", "geopandas", "highspy"]
+
+IMPORT_SCRIPT = f"""
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import allagash
+
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _import_allagash():
+    # Each import runs in a new interpreter, the modules of this one are already loaded
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_import(benchmark):
+    result = benchmark.pedantic(_import_allagash, rounds=5)
+    benchmark.extra_info["import_seconds"] = result["seconds"]
+    assert result["loaded"] == []
@@ -0,0 +1,29 @@
+import pytest
+from allagash import Problem
+
+
+def _max_supply(coverage):
+    return {coverage: max(len(coverage.supply_ids) // 10, 1)}
+
+
+def _generate(problem_type, coverage):
+    if problem_type == "lscp":
+        return Problem.lscp(coverage)
+    return getattr(Problem, problem_type)(coverage, _max_supply(coverage))
+
+
+@pytest.mark.parametrize("problem_type", ["lscp", "mclp", "bclp"])
+def test_generate_pulp_problem(benchmark, coverage, problem_type):
+    problem = benchmark.pedantic(
+        lambda: _generate(problem_type, coverage).pulp_problem, rounds=3
+    )
+    benchmark.extra_info["variables"] = problem.numVariables()
+    benchmark.extra_info["constraints"] = problem.numConstraints()
+
+
+@pytest.mark.parametrize("problem_type", ["lscp", "mclp", "bclp"])
+def test_generate_matrix_model(benchmark, coverage, problem_type):
+    model = benchmark.pedantic(
+        lambda: _generate(problem_type, coverage).matrix_model, rounds=3
+    )
+    benchmark.extra_info["nonzeros"] = int(model.matrix.nnz)
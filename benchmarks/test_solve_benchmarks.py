@@ -0,0 +1,22 @@
+import pulp
+import pytest
+from allagash import Problem
+
+
+@pytest.mark.parametrize("problem_type", ["lscp", "mclp", "bclp"])
+def test_solve_cbc(benchmark, coverage, solvable_size, problem_type):
+    if problem_type in ("lscp", "bclp"):
+        # Demand locations no service area reaches make the LSCP and BCLP infeasible
+        if (coverage.matrix.getnnz(axis=1) == 0).any():
+            pytest.skip("Not every demand location can be covered, see --density")
+    if problem_type == "lscp":
+        problem = Problem.lscp(coverage)
+    else:
+        max_supply = {coverage: max(len(coverage.supply_ids) // 10, 1)}
+        problem = getattr(Problem, problem_type)(coverage, max_supply)
+    # Generate the problem before timing so only the solver is measured
+    problem.pulp_problem
+    benchmark.pedantic(
+        problem.solve, args=(pulp.PULP_CBC_CMD(msg=False),), rounds=1, iterations=1
+    )
+    benchmark.extra_info["objective"] = pulp.value(problem.pulp_problem.objective)
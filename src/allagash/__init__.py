@@ -1,5 +1,3 @@
-import importlib.metadata
-
 from .problem import (
     Problem,
     UnboundedException,
@@ -8,6 +6,22 @@ from .problem import (
     NotSolvedException,
 )
 from .coverage import Coverage
+from .costs import CostMatrix
+from .model import MatrixModel
+from .presolve import Presolve
+from .cache import CoverageCache
+from .solvers import (
+    MatrixSolver,
+    HeuristicSolver,
+    MatrixSolution,
+    HeuristicSolution,
+    GreedySolver,
+    LagrangianSolver,
+    HighsSolver,
+    DecompositionSolver,
+)
+from .stats import ProblemStats
+from .scenarios import Scenario, ScenarioResult, ScenarioRunner
 
 __all__ = [
     "Problem",
@@ -16,6 +30,29 @@ __all__ = [
     "InfeasibleException",
     "NotSolvedException",
     "Coverage",
+    "CostMatrix",
+    "MatrixModel",
+    "Presolve",
+    "CoverageCache",
+    "MatrixSolver",
+    "HeuristicSolver",
+    "MatrixSolution",
+    "HeuristicSolution",
+    "GreedySolver",
+    "LagrangianSolver",
+    "HighsSolver",
+    "DecompositionSolver",
+    "ProblemStats",
+    "Scenario",
+    "ScenarioResult",
+    "ScenarioRunner",
 ]
 
-__version__ = importlib.metadata.version(__package__ or __name__)
+
+def __getattr__(name):
+    # The version is read from the package metadata on first access, which is slow compared to importing allagash
+    if name == "__version__":
+        import importlib.metadata
+
+        return importlib.metadata.version(__package__ or __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
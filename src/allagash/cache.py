@@ -0,0 +1,364 @@
+import hashlib
+import os
+import pandas as pd
+from .coverage import Coverage
+
+
+class CoverageCache:
+    _version = 1
+
+    def __init__(self, directory, max_size=None):
+        """
+        An on-disk cache of coverage matrices. Coverages are keyed by a fingerprint of the input geometries, id columns,
+        demand values and coverage type, so building the same coverage again loads it from disk instead of intersecting
+        the geometries. When the cache grows larger than max_size, the least recently used entries are removed.
+
+        .. code-block:: python
+
+            cache = CoverageCache("coverage_cache", max_size=2 * 1024**3)
+            coverage = cache.from_geodataframes(demand_df, supply_df, "GEOID10", "ORIG_ID", demand_col="Population")
+
+        :param str directory: The directory to store the cached coverages in. It is created if it does not exist.
+        :param int max_size: (optional) The maximum size of the cache in bytes. If not supplied, the size is unbounded.
+        """
+        self._validate(directory, max_size)
+        self._directory = os.fspath(directory)
+        self._max_size = max_size
+        os.makedirs(self._directory, exist_ok=True)
+
+    @staticmethod
+    def _validate(directory, max_size):
+        if not isinstance(directory, (str, os.PathLike)):
+            raise TypeError(
+                f"Expected 'str' or 'PathLike' type for directory, got '{type(directory)}'"
+            )
+        if max_size is not None and not isinstance(max_size, int):
+            raise TypeError(f"Expected 'int' type for max_size, got '{type(max_size)}'")
+        if max_size is not None and max_size < 0:
+            raise ValueError(f"Invalid max_size '{max_size}'")
+
+    @property
+    def directory(self):
+        """
+
+        :return: The directory the cached coverages are stored in
+        :rtype: str
+        """
+        return self._directory
+
+    @property
+    def max_size(self):
+        """
+
+        :return: The maximum size of the cache in bytes, None if the size is unbounded
+        :rtype: int
+        """
+        return self._max_size
+
+    @property
+    def size(self):
+        """
+
+        :return: The total size of the cached coverages in bytes
+        :rtype: int
+        """
+        return sum(os.path.getsize(path) for path in self._entries())
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def from_geodataframes(
+        self,
+        demand_df,
+        supply_df,
+        demand_id_col,
+        supply_id_col,
+        demand_name="demand",
+        supply_name=None,
+        demand_col=None,
+        coverage_type="binary",
+        sparse=False,
+        n_jobs=1,
+    ):
+        """
+        Loads the coverage from the cache, or creates it using :meth:`~allagash.coverage.Coverage.from_geodataframes`
+        and adds it to the cache. The parameters are the same as :meth:`~allagash.coverage.Coverage.from_geodataframes`.
+
+        :param ~geopandas.GeoDataFrame demand_df: The GeoDataFrame containing the demand locations
+        :param ~geopandas.GeoDataFrame supply_df: The GeoDataFrame containing the supply locations
+        :param str demand_id_col: The name of the column that has unique identifiers for the demand locations
+        :param str supply_id_col: The name of the column that has unique identifiers for the supply locations
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param str demand_col: (optional) The name of the column that stores the amount of demand for the demand
+                                          locations. Required if generating partial coverage.
+        :param str coverage_type: (optional) The type of coverage this represents. If not supplied, the default is
+                                  "binary". Options are "binary" and "partial".
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :param int n_jobs: (optional) The number of processes used to compute the coverage on a cache miss. If not
+                           supplied, the default is 1.
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        Coverage._validate_from_geodataframes(
+            coverage_type,
+            demand_col,
+            demand_df,
+            demand_id_col,
+            demand_name,
+            supply_df,
+            supply_id_col,
+        )
+        key = self.key(
+            "geodataframes",
+            demand_df.geometry.to_wkb(),
+            supply_df.geometry.to_wkb(),
+            demand_df[demand_id_col],
+            supply_df[supply_id_col],
+            demand_df[demand_col] if demand_col else None,
+            coverage_type,
+        )
+        coverage = self.get(key, demand_name, supply_name, sparse)
+        if coverage is None:
+            coverage = Coverage.from_geodataframes(
+                demand_df,
+                supply_df,
+                demand_id_col,
+                supply_id_col,
+                demand_name=demand_name,
+                supply_name=supply_name,
+                demand_col=demand_col,
+                coverage_type=coverage_type,
+                sparse=sparse,
+                n_jobs=n_jobs,
+            )
+            self.put(key, coverage)
+        return coverage
+
+    def from_spatially_enabled_dataframes(
+        self,
+        demand_df,
+        supply_df,
+        demand_id_col,
+        supply_id_col,
+        demand_name="demand",
+        supply_name=None,
+        demand_col=None,
+        coverage_type="binary",
+        demand_geometry_col="SHAPE",
+        supply_geometry_col="SHAPE",
+        sparse=False,
+        n_jobs=1,
+    ):
+        """
+        Loads the coverage from the cache, or creates it using
+        :meth:`~allagash.coverage.Coverage.from_spatially_enabled_dataframes` and adds it to the cache. The parameters
+        are the same as :meth:`~allagash.coverage.Coverage.from_spatially_enabled_dataframes`.
+
+        :param ~pandas.DataFrame demand_df: The spatially enabled dataframe containing the demand locations
+        :param ~pandas.DataFrame supply_df: The spatially enabled dataframe containing the supply locations
+        :param str demand_id_col: The name of the column that has unique identifiers for the demand locations
+        :param str supply_id_col: The name of the column that has unique identifiers for the supply locations
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used'.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param str demand_col: (optional) The name of the column that stores the amount of demand for the demand
+                                          locations. Required if generating partial coverage.
+        :param str coverage_type: (optional) The type of coverage this represents. If not supplied, the default is
+                                  "binary". Options are "binary" and "partial".
+        :param str demand_geometry_col: (optional) The name of the field storing the geometry in the demand dataframe.
+                                        If not supplied, the default is "SHAPE".
+        :param str supply_geometry_col: (optional) The name of the field storing the geometry in the supply dataframe.
+                                        If not supplied, the default is "SHAPE".
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :param int n_jobs: (optional) The number of processes used to compute the coverage on a cache miss. If not
+                           supplied, the default is 1.
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        Coverage._validate_from_spatially_enabled_dataframes(
+            coverage_type,
+            demand_col,
+            demand_df,
+            demand_id_col,
+            demand_name,
+            supply_df,
+            supply_id_col,
+            demand_geometry_col,
+            supply_geometry_col,
+        )
+        key = self.key(
+            "spatially_enabled_dataframes",
+            demand_df[demand_geometry_col].map(lambda g: g.JSON),
+            supply_df[supply_geometry_col].map(lambda g: g.JSON),
+            demand_df[demand_id_col],
+            supply_df[supply_id_col],
+            demand_df[demand_col] if demand_col else None,
+            coverage_type,
+        )
+        coverage = self.get(key, demand_name, supply_name, sparse)
+        if coverage is None:
+            coverage = Coverage.from_spatially_enabled_dataframes(
+                demand_df,
+                supply_df,
+                demand_id_col,
+                supply_id_col,
+                demand_name=demand_name,
+                supply_name=supply_name,
+                demand_col=demand_col,
+                coverage_type=coverage_type,
+                demand_geometry_col=demand_geometry_col,
+                supply_geometry_col=supply_geometry_col,
+                sparse=sparse,
+                n_jobs=n_jobs,
+            )
+            self.put(key, coverage)
+        return coverage
+
+    @classmethod
+    def key(
+        cls,
+        source,
+        demand_geometries,
+        supply_geometries,
+        demand_ids,
+        supply_ids,
+        demand,
+        coverage_type,
+    ):
+        """
+        Creates the fingerprint of the inputs of a coverage. The geometries should be a serialized form, such as WKB,
+        so equal geometries always produce the same key.
+
+        :param str source: The name of the method the coverage is created with
+        :param ~pandas.Series demand_geometries: The serialized geometries of the demand locations
+        :param ~pandas.Series supply_geometries: The serialized geometries of the supply locations
+        :param ~pandas.Series demand_ids: The ids of the demand locations
+        :param ~pandas.Series supply_ids: The ids of the supply locations
+        :param ~pandas.Series demand: The amount of demand for each location, None if there is no demand column
+        :param str coverage_type: The type of coverage
+        :return: The key of the coverage
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{cls._version}|{source}|{coverage_type.lower()}".encode())
+        for values in (
+            demand_geometries,
+            supply_geometries,
+            demand_ids,
+            supply_ids,
+            demand,
+        ):
+            if values is None:
+                digest.update(b"|None")
+                continue
+            series = pd.Series(values).reset_index(drop=True)
+            digest.update(f"|{series.name}|{series.dtype}|{len(series)}".encode())
+            digest.update(pd.util.hash_pandas_object(series, index=False).values)
+        return digest.hexdigest()
+
+    def get(self, key, demand_name="demand", supply_name=None, sparse=False):
+        """
+        Loads a coverage from the cache.
+
+        :param str key: The key of the coverage, see :meth:`~allagash.cache.CoverageCache.key`
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :return: The coverage, or None if it is not in the cache
+        :rtype: ~allagash.coverage.Coverage
+        """
+        path = self._path(key)
+        try:
+            cached = Coverage.read_npz(path)
+        except FileNotFoundError:
+            return None
+        # Touch the entry so eviction removes the least recently used coverages first. Another process may have
+        # evicted it since it was read.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        matrix = cached.matrix.tocoo()
+        return Coverage._from_pairs(
+            matrix.row,
+            matrix.col,
+            matrix.data,
+            cached.demand_ids,
+            cached.supply_ids,
+            cached.demand_values,
+            cached.demand_col,
+            demand_name,
+            supply_name,
+            cached.coverage_type,
+            sparse,
+        )
+
+    def put(self, key, coverage):
+        """
+        Adds a coverage to the cache, removing the least recently used coverages if the cache is larger than max_size.
+
+        :param str key: The key of the coverage, see :meth:`~allagash.cache.CoverageCache.key`
+        :param ~allagash.coverage.Coverage coverage: The coverage to add
+        :return: None
+        """
+        if not isinstance(coverage, Coverage):
+            raise TypeError(
+                f"Expected 'Coverage' type for coverage, got '{type(coverage)}'"
+            )
+        # Write to a temporary file first so a concurrent reader never sees a partial entry
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        coverage.to_npz(temp_path)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def clear(self):
+        """
+        Removes every coverage from the cache.
+
+        :return: None
+        """
+        for path in self._entries():
+            _remove(path)
+
+    def _evict(self):
+        if self._max_size is None:
+            return
+        # Other processes may evict the same entries concurrently, entries that are already gone are skipped
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in entries:
+            if size <= self._max_size:
+                break
+            _remove(path)
+            size -= entry_size
+
+    def _entries(self):
+        return [
+            os.path.join(self._directory, name)
+            for name in os.listdir(self._directory)
+            if name.endswith(".npz")
+        ]
+
+    def _path(self, key):
+        return os.path.join(self._directory, f"{key}.npz")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
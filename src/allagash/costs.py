@@ -0,0 +1,588 @@
+import os
+import random
+import string
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from .coverage import (
+    _IdPositions,
+    _earth_radius,
+    _od_chunks,
+    _point_coordinates,
+    _unit_vectors,
+)
+
+
+class CostMatrix:
+    def __init__(
+        self,
+        matrix,
+        demand_ids,
+        supply_ids,
+        demand=None,
+        demand_col=None,
+        demand_name="demand",
+        supply_name=None,
+        k=None,
+    ):
+        """
+        The cost (for example the travel time or network distance) of reaching supply locations from each demand
+        location, used by the p-median and p-center problems. Only the stored entries of the sparse matrix are
+        candidate (demand, supply) pairs, so a cost of 0 is kept and a pair that is not stored can never be assigned.
+        Keeping only the k nearest supply locations of each demand location makes the problems grow with demand x k
+        rather than demand x supply.
+
+        .. code-block:: python
+
+            costs = CostMatrix.from_od_table("travel_times.parquet", "GEOID", "ORIG_ID", "minutes", k=10)
+            Problem.pmedian(costs, p=5)
+
+        :param ~scipy.sparse.spmatrix matrix: A sparse matrix of the costs of demand (rows) and supply (columns)
+        :param list demand_ids: The ids of the demand locations, in the order of the rows of the matrix
+        :param list supply_ids: The ids of the supply locations, in the order of the columns of the matrix
+        :param list demand: (optional) The amount of demand for each demand location. Requires demand_col.
+        :param str demand_col: (optional) The name to use for the demand values.
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param int k: (optional) The number of nearest supply locations to keep for each demand location. If not
+                      supplied, every stored pair is kept.
+        """
+        self._validate_init(
+            matrix,
+            demand_ids,
+            supply_ids,
+            demand,
+            demand_col,
+            demand_name,
+            supply_name,
+        )
+        matrix = scipy.sparse.coo_matrix(matrix)
+        self._set_pairs(
+            matrix.row,
+            matrix.col,
+            matrix.data.astype(float),
+            pd.Index(demand_ids, dtype=getattr(demand_ids, "dtype", None)),
+            pd.Index(supply_ids, dtype=getattr(supply_ids, "dtype", None)),
+            k,
+        )
+        self._demand = np.asarray(demand) if demand is not None else None
+        self._set_attributes(demand_col, demand_name, supply_name)
+
+    def _set_pairs(self, demand_idx, supply_idx, costs, demand_ids, supply_ids, k):
+        self._validate_k(k)
+        if not np.all(np.isfinite(costs)):
+            raise ValueError("Invalid costs, every stored cost must be finite")
+        demand_idx, supply_idx, costs = _nearest_pairs(demand_idx, supply_idx, costs, k)
+        # The pairs are sorted by demand location and cost, so the CSR arrays are built directly and a cost of 0 is
+        # stored like any other cost
+        indptr = np.searchsorted(demand_idx, np.arange(len(demand_ids) + 1))
+        self._matrix = scipy.sparse.csr_matrix(
+            (costs, supply_idx, indptr), shape=(len(demand_ids), len(supply_ids))
+        )
+        self._demand_ids = demand_ids
+        self._supply_ids = supply_ids
+        self._k = k
+
+    def _set_attributes(self, demand_col, demand_name, supply_name):
+        self._demand_col = demand_col
+        if not demand_name:
+            self._demand_name = "".join(random.choices(string.ascii_uppercase, k=6))
+        else:
+            self._demand_name = demand_name
+        if not supply_name:
+            self._supply_name = "".join(random.choices(string.ascii_uppercase, k=6))
+        else:
+            self._supply_name = supply_name
+
+    @staticmethod
+    def _validate_init(
+        matrix, demand_ids, supply_ids, demand, demand_col, demand_name, supply_name
+    ):
+        if not scipy.sparse.issparse(matrix):
+            raise TypeError(
+                f"Expected 'spmatrix' type for matrix, got '{type(matrix)}'"
+            )
+        if not isinstance(demand_col, str) and demand_col is not None:
+            raise TypeError(
+                f"Expected 'str' type for demand_col, got '{type(demand_col)}'"
+            )
+        if not isinstance(demand_name, str) and demand_name is not None:
+            raise TypeError(
+                f"Expected 'str' type for demand_name, got '{type(demand_name)}'"
+            )
+        if not isinstance(supply_name, str) and supply_name is not None:
+            raise TypeError(
+                f"Expected 'str' type for supply_name, got '{type(supply_name)}'"
+            )
+        if len(demand_ids) != matrix.shape[0]:
+            raise ValueError(
+                f"Expected {matrix.shape[0]} demand_ids, got {len(demand_ids)}"
+            )
+        if len(supply_ids) != matrix.shape[1]:
+            raise ValueError(
+                f"Expected {matrix.shape[1]} supply_ids, got {len(supply_ids)}"
+            )
+        if demand is not None and len(demand) != matrix.shape[0]:
+            raise ValueError(
+                f"Expected {matrix.shape[0]} demand values, got {len(demand)}"
+            )
+        if demand is not None and demand_col is None:
+            raise ValueError("'demand_col' is required when 'demand' is supplied")
+        if demand is None and demand_col is not None:
+            raise ValueError("'demand' is required when 'demand_col' is supplied")
+
+    @staticmethod
+    def _validate_k(k):
+        if k is None:
+            return
+        if not isinstance(k, int) or isinstance(k, bool):
+            raise TypeError(f"Expected 'int' type for k, got '{type(k)}'")
+        if k < 1:
+            raise ValueError(f"Invalid k '{k}'")
+
+    @property
+    def matrix(self):
+        """
+
+        :return: The costs of the kept (demand, supply) pairs as a sparse matrix of demand (rows) and supply
+                 (columns). The pairs of each demand location are ordered by cost.
+        :rtype: ~scipy.sparse.csr_matrix
+        """
+        return self._matrix
+
+    @property
+    def nnz(self):
+        """
+
+        :return: The number of kept (demand, supply) pairs
+        :rtype: int
+        """
+        return self._matrix.nnz
+
+    @property
+    def k(self):
+        """
+
+        :return: The number of nearest supply locations kept for each demand location, None if every pair was kept
+        :rtype: int or None
+        """
+        return self._k
+
+    @property
+    def demand_ids(self):
+        """
+
+        :return: The ids of the demand locations, in the order of the rows of the matrix
+        :rtype: ~pandas.Index
+        """
+        return self._demand_ids
+
+    @property
+    def supply_ids(self):
+        """
+
+        :return: The ids of the supply locations, in the order of the columns of the matrix
+        :rtype: ~pandas.Index
+        """
+        return self._supply_ids
+
+    @property
+    def demand_values(self):
+        """
+
+        :return: The amount of demand for each demand location, in the order of the rows of the matrix
+        :rtype: ~numpy.ndarray or None
+        """
+        return self._demand
+
+    @property
+    def demand_name(self):
+        """
+
+        :return: The name of the demand
+        :rtype: str
+        """
+        return self._demand_name
+
+    @property
+    def supply_name(self):
+        """
+
+        :return: The name of the supply
+        :rtype: str
+        """
+        return self._supply_name
+
+    @property
+    def demand_col(self):
+        """
+
+        :return: The name of the demand values
+        :rtype: str or None
+        """
+        return self._demand_col
+
+    def nearest(self, k):
+        """
+        Keeps only the k nearest supply locations of each demand location. Ties are broken by the order of the supply
+        locations.
+
+        :param int k: The number of nearest supply locations to keep for each demand location
+        :return: A new cost matrix with the same ids, demand and names
+        :rtype: ~allagash.costs.CostMatrix
+        """
+        self._validate_k(k)
+        if k is None:
+            raise TypeError(f"Expected 'int' type for k, got '{type(k)}'")
+        matrix = self._matrix.tocoo()
+        costs = self.__class__.__new__(self.__class__)
+        costs._set_pairs(
+            matrix.row,
+            matrix.col,
+            matrix.data,
+            self._demand_ids,
+            self._supply_ids,
+            k if self._k is None else min(k, self._k),
+        )
+        costs._demand = self._demand
+        costs._set_attributes(self._demand_col, self._demand_name, self._supply_name)
+        return costs
+
+    @classmethod
+    def _from_pairs(
+        cls,
+        demand_idx,
+        supply_idx,
+        costs,
+        demand_ids,
+        supply_ids,
+        k,
+        demand,
+        demand_col,
+        demand_name,
+        supply_name,
+    ):
+        cost_matrix = cls.__new__(cls)
+        cost_matrix._set_pairs(demand_idx, supply_idx, costs, demand_ids, supply_ids, k)
+        cost_matrix._demand = np.asarray(demand) if demand is not None else None
+        cost_matrix._set_attributes(demand_col, demand_name, supply_name)
+        return cost_matrix
+
+    @classmethod
+    def from_distance_matrix(
+        cls,
+        costs,
+        k=None,
+        demand=None,
+        demand_col=None,
+        demand_name="demand",
+        supply_name=None,
+    ):
+        """
+        Creates a new CostMatrix from a dataframe of the cost of reaching each supply location from each demand
+        location. Missing costs are not kept.
+
+        .. code-block:: python
+
+            CostMatrix.from_distance_matrix(travel_times, k=10, demand=population, demand_col="Population")
+
+        :param ~pandas.DataFrame costs: A dataframe of costs with the demand ids as the index and the supply ids as the
+                                        columns
+        :param int k: (optional) The number of nearest supply locations to keep for each demand location. If not
+                      supplied, every pair with a cost is kept.
+        :param list demand: (optional) The amount of demand for each demand location, in the order of the rows.
+                            Requires demand_col.
+        :param str demand_col: (optional) The name to use for the demand values.
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :return: The cost matrix
+        :rtype: ~allagash.costs.CostMatrix
+        """
+        if not isinstance(costs, pd.DataFrame):
+            raise TypeError(f"Expected 'Dataframe' type for costs, got '{type(costs)}'")
+        cls._validate_init(
+            scipy.sparse.csr_matrix(costs.shape),
+            costs.index,
+            costs.columns,
+            demand,
+            demand_col,
+            demand_name,
+            supply_name,
+        )
+        values = costs.to_numpy(dtype=float)
+        demand_idx, supply_idx = np.nonzero(~np.isnan(values))
+        return cls._from_pairs(
+            demand_idx,
+            supply_idx,
+            values[demand_idx, supply_idx],
+            pd.Index(costs.index),
+            pd.Index(costs.columns),
+            k,
+            demand,
+            demand_col,
+            demand_name,
+            supply_name,
+        )
+
+    @classmethod
+    def from_od_table(
+        cls,
+        source,
+        demand_id_col,
+        supply_id_col,
+        cost_col,
+        k=None,
+        max_cost=None,
+        demand_ids=None,
+        supply_ids=None,
+        demand=None,
+        demand_col=None,
+        demand_name="demand",
+        supply_name=None,
+        chunksize=1_000_000,
+    ):
+        """
+        Creates a new CostMatrix from an origin-destination table with one row per (demand, supply) pair, such as the
+        output of a routing engine. The table is read in chunks and only the k nearest supply locations of each demand
+        location are kept after each chunk, so at most demand x k pairs are in memory no matter how large the table is.
+        See :meth:`~allagash.coverage.Coverage.from_od_table` for the sources that can be read.
+
+        .. code-block:: python
+
+            CostMatrix.from_od_table("travel_times.parquet", "GEOID", "ORIG_ID", "minutes", k=10, max_cost=60)
+
+        :param source: The table to read. Either the path of a CSV or Parquet file, a dataframe, or an iterable of
+                       dataframes that are the chunks of the table. Reading Parquet files requires pyarrow.
+        :type source: str or ~pandas.DataFrame or iterable[~pandas.DataFrame]
+        :param str demand_id_col: The name of the column storing the ids of the demand locations
+        :param str supply_id_col: The name of the column storing the ids of the supply locations
+        :param str cost_col: The name of the column storing the cost of reaching the supply location from the demand
+                             location
+        :param int k: (optional) The number of nearest supply locations to keep for each demand location. If not
+                      supplied, every pair is kept.
+        :param float max_cost: (optional) The largest cost to keep. If not supplied, pairs of any cost are kept.
+        :param list demand_ids: (optional) The ids of the demand locations. If not supplied, every demand id found in
+                                the table is used, in the order they are first found.
+        :param list supply_ids: (optional) The ids of the supply locations. If not supplied, every supply id found in
+                                the table is used, in the order they are first found.
+        :param list demand: (optional) The amount of demand for each demand location, in the order of demand_ids.
+                            Requires demand_ids and demand_col.
+        :param str demand_col: (optional) The name to use for the demand values.
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param int chunksize: (optional) The number of rows to read at a time from a file. If not supplied, the default
+                              is 1,000,000.
+        :return: The cost matrix
+        :rtype: ~allagash.costs.CostMatrix
+        """
+        if not isinstance(source, (str, os.PathLike, pd.DataFrame)) and not hasattr(
+            source, "__iter__"
+        ):
+            raise TypeError(
+                f"Expected 'str', 'Dataframe' or iterable type for source, got '{type(source)}'"
+            )
+        for param, value in (
+            ("demand_id_col", demand_id_col),
+            ("supply_id_col", supply_id_col),
+            ("cost_col", cost_col),
+        ):
+            if not isinstance(value, str):
+                raise TypeError(f"Expected 'str' type for {param}, got '{type(value)}'")
+        cls._validate_k(k)
+        if max_cost is not None and (
+            not isinstance(max_cost, (int, float, np.number))
+            or isinstance(max_cost, bool)
+        ):
+            raise TypeError(
+                f"Expected 'int' or 'float' type for max_cost, got '{type(max_cost)}'"
+            )
+        if not isinstance(chunksize, int) or chunksize < 1:
+            raise ValueError(f"Invalid chunksize '{chunksize}'")
+        if demand is not None and demand_ids is None:
+            raise ValueError("'demand_ids' is required when 'demand' is supplied")
+        if (demand is None) != (demand_col is None):
+            raise ValueError("'demand' and 'demand_col' must be supplied together")
+        if demand is not None and len(demand) != len(demand_ids):
+            raise ValueError(
+                f"Expected {len(demand_ids)} demand values, got {len(demand)}"
+            )
+
+        demand_positions = _IdPositions(demand_ids, demand_id_col)
+        supply_positions = _IdPositions(supply_ids, supply_id_col)
+        demand_chunks = [np.empty(0, dtype=np.int64)]
+        supply_chunks = [np.empty(0, dtype=np.int64)]
+        cost_chunks = [np.empty(0)]
+        for chunk in _od_chunks(
+            source, [demand_id_col, supply_id_col, cost_col], chunksize
+        ):
+            # Ids are added for every row so locations without a kept pair are still part of the cost matrix
+            chunk_demand = demand_positions.get(chunk[demand_id_col])
+            chunk_supply = supply_positions.get(chunk[supply_id_col])
+            chunk_costs = chunk[cost_col].to_numpy(dtype=float)
+            keep = ~np.isnan(chunk_costs)
+            if max_cost is not None:
+                keep &= chunk_costs <= max_cost
+            demand_chunks.append(chunk_demand[keep])
+            supply_chunks.append(chunk_supply[keep])
+            cost_chunks.append(chunk_costs[keep])
+            if k is not None:
+                # Only the k cheapest pairs of each demand location are kept between chunks
+                pairs = _nearest_pairs(
+                    np.concatenate(demand_chunks),
+                    np.concatenate(supply_chunks),
+                    np.concatenate(cost_chunks),
+                    k,
+                )
+                demand_chunks, supply_chunks, cost_chunks = (
+                    [pairs[0]],
+                    [pairs[1]],
+                    [pairs[2]],
+                )
+        # The pairs are sorted and repeated pairs are removed when the cost matrix is created
+        return cls._from_pairs(
+            np.concatenate(demand_chunks),
+            np.concatenate(supply_chunks),
+            np.concatenate(cost_chunks),
+            demand_positions.ids,
+            supply_positions.ids,
+            k,
+            demand,
+            demand_col,
+            demand_name,
+            supply_name,
+        )
+
+    @classmethod
+    def from_points(
+        cls,
+        demand_df,
+        supply_df,
+        demand_id_col,
+        supply_id_col,
+        k,
+        max_cost=None,
+        demand_name="demand",
+        supply_name=None,
+        demand_col=None,
+        x_col=None,
+        y_col=None,
+        metric="euclidean",
+    ):
+        """
+        Creates a new CostMatrix of the distance from each demand point to its k nearest supply points. The nearest
+        points are found with a KD-tree, so the distance to every supply location is never computed.
+
+        .. code-block:: python
+
+            CostMatrix.from_points(demand_df, supply_df, "GEOID", "ORIG_ID", 10, demand_col="Population")
+
+        :param ~pandas.DataFrame demand_df: The dataframe containing the demand locations
+        :param ~pandas.DataFrame supply_df: The dataframe containing the supply locations
+        :param str demand_id_col: The name of the column that has unique identifiers for the demand locations
+        :param str supply_id_col: The name of the column that has unique identifiers for the supply locations
+        :param int k: The number of nearest supply locations to keep for each demand location
+        :param float max_cost: (optional) The largest distance to keep. If not supplied, the k nearest supply locations
+                               are kept at any distance.
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param str demand_col: (optional) The name of the column that stores the amount of demand for the demand
+                                          locations.
+        :param str x_col: (optional) The name of the column storing the x coordinates (longitude for "haversine"). If
+                          not supplied, the coordinates of the points in the geometry column are used.
+        :param str y_col: (optional) The name of the column storing the y coordinates (latitude for "haversine").
+                          Required if x_col is supplied.
+        :param str metric: (optional) How the distance is measured. Options are "euclidean" for projected coordinates
+                           and "haversine" for the great-circle distance in meters between longitude/latitude
+                           coordinates in degrees. If not supplied, the default is "euclidean".
+        :return: The cost matrix
+        :rtype: ~allagash.costs.CostMatrix
+        """
+        import scipy.spatial
+
+        for name, df in (("demand_df", demand_df), ("supply_df", supply_df)):
+            if not isinstance(df, pd.DataFrame):
+                raise TypeError(
+                    f"Expected 'Dataframe' type for {name}, got '{type(df)}'"
+                )
+        if demand_id_col not in demand_df.columns:
+            raise ValueError(f"'{demand_id_col}' not in dataframe")
+        if supply_id_col not in supply_df.columns:
+            raise ValueError(f"'{supply_id_col}' not in dataframe")
+        if demand_col and demand_col not in demand_df.columns:
+            raise ValueError(f"'{demand_col}' not in dataframe")
+        cls._validate_k(k)
+        if k is None:
+            raise TypeError(f"Expected 'int' type for k, got '{type(k)}'")
+        if not isinstance(metric, str):
+            raise TypeError(f"Expected 'str' type for metric, got '{type(metric)}'")
+        if metric.lower() not in ("euclidean", "haversine"):
+            raise ValueError(f"Invalid metric '{metric}'")
+        if (x_col is None) != (y_col is None):
+            raise ValueError("'x_col' and 'y_col' must be supplied together")
+
+        demand_xy = _point_coordinates(demand_df, x_col, y_col)
+        supply_xy = _point_coordinates(supply_df, x_col, y_col)
+        bound = np.inf if max_cost is None else float(max_cost)
+        if metric.lower() == "haversine":
+            # The nearest points on the unit sphere by chord length are the nearest by great-circle distance
+            demand_xy = _unit_vectors(demand_xy)
+            supply_xy = _unit_vectors(supply_xy)
+            if max_cost is not None:
+                bound = 2 * np.sin(min(bound / _earth_radius, np.pi) / 2)
+        n_nearest = max(min(k, len(supply_df)), 1)
+        distance, supply_idx = scipy.spatial.cKDTree(supply_xy).query(
+            demand_xy, k=n_nearest, distance_upper_bound=bound
+        )
+        distance = np.reshape(distance, (len(demand_df), n_nearest))
+        supply_idx = np.reshape(supply_idx, (len(demand_df), n_nearest))
+        if metric.lower() == "haversine":
+            distance = 2 * _earth_radius * np.arcsin(np.clip(distance / 2, 0, 1))
+        # Neighbors beyond max_cost are reported with an infinite distance
+        found = np.isfinite(distance)
+        demand_idx = np.repeat(np.arange(len(demand_df)), n_nearest)[found.ravel()]
+        return cls._from_pairs(
+            demand_idx,
+            supply_idx[found],
+            distance[found],
+            pd.Index(demand_df[demand_id_col].values, name=demand_id_col),
+            pd.Index(supply_df[supply_id_col].values, name=supply_id_col),
+            k,
+            demand_df[demand_col].values if demand_col else None,
+            demand_col,
+            demand_name,
+            supply_name,
+        )
+
+
+def _nearest_pairs(demand_idx, supply_idx, costs, k):
+    """
+    Sorts (demand, supply) pairs by demand location and cost, keeping the cheapest cost of repeated pairs and, if k is
+    supplied, only the k cheapest pairs of each demand location.
+
+    :param ~numpy.ndarray demand_idx: The positional index of the demand location of each pair
+    :param ~numpy.ndarray supply_idx: The positional index of the supply location of each pair
+    :param ~numpy.ndarray costs: The cost of each pair
+    :param int k: The number of pairs to keep for each demand location, None to keep every pair
+    :return: The positional indices of the demand and supply locations of the kept pairs and their cost
+    :rtype: tuple(~numpy.ndarray, ~numpy.ndarray, ~numpy.ndarray)
+    """
+    demand_idx = np.asarray(demand_idx, dtype=np.int64)
+    supply_idx = np.asarray(supply_idx, dtype=np.int64)
+    costs = np.asarray(costs, dtype=float)
+    order = np.lexsort((supply_idx, costs, demand_idx))
+    demand_idx, supply_idx, costs = demand_idx[order], supply_idx[order], costs[order]
+    # After sorting, the first of repeated pairs has the cheapest cost
+    keys = demand_idx * (int(supply_idx.max(initial=0)) + 1) + supply_idx
+    _, first = np.unique(keys, return_index=True)
+    if len(first) < len(keys):
+        first.sort()
+        demand_idx, supply_idx, costs = (
+            demand_idx[first],
+            supply_idx[first],
+            costs[first],
+        )
+    if k is not None:
+        starts = np.searchsorted(demand_idx, demand_idx, side="left")
+        keep = np.arange(len(demand_idx)) - starts < k
+        demand_idx, supply_idx, costs = demand_idx[keep], supply_idx[keep], costs[keep]
+    return demand_idx, supply_idx, costs
@@ -1,9 +1,21 @@
+import os
+import json
 import random
 import string
+import struct
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+import scipy.sparse
 
 
 class Coverage:
+    # The coverage, demand positions and supply positions a subset view selects from, see subset()
+    _view = None
+    # The coverage matrix of a coverage stored as a dataframe, created on first access
+    _dataframe_csr = None
+
     def __init__(
         self,
         dataframe,
@@ -33,8 +45,15 @@ class Coverage:
         self._validate_init(
             coverage_type, dataframe, demand_col, demand_name, supply_name
         )
-        self._demand_col = demand_col
         self._dataframe = dataframe
+        self._matrix = None
+        self._demand_ids = None
+        self._supply_ids = None
+        self._demand = None
+        self._set_attributes(demand_col, demand_name, supply_name, coverage_type)
+
+    def _set_attributes(self, demand_col, demand_name, supply_name, coverage_type):
+        self._demand_col = demand_col
         if not demand_name:
             self._demand_name = "".join(random.choices(string.ascii_uppercase, k=6))
         else:
@@ -80,11 +99,135 @@ class Coverage:
     def df(self):
         """
 
-        :return: The geodataframe the dataset is based on
+        :return: The geodataframe the dataset is based on. If the coverage is sparse, a dataframe backed by
+                 pandas sparse arrays is created on first access.
         :rtype: ~geopandas.GeoDataFrame
         """
+        if self._dataframe is None and self._view is not None and not self.is_sparse:
+            self._dataframe = self._view_dataframe()
+        if self._dataframe is None:
+            df = pd.DataFrame.sparse.from_spmatrix(
+                self.matrix,
+                index=self._demand_ids,
+                columns=pd.Index(self._supply_ids.tolist(), dtype=object),
+            )
+            if self._demand_col:
+                df.insert(0, self._demand_col, self._demand, allow_duplicates=True)
+            self._dataframe = df
         return self._dataframe
 
+    @property
+    def is_sparse(self):
+        """
+
+        :return: Whether the coverage is stored as a sparse matrix. A subset view is stored like the coverage it
+                 selects from.
+        :rtype: bool
+        """
+        coverage = self._view[0] if self._view is not None else self
+        return coverage._matrix is not None
+
+    @property
+    def matrix(self):
+        """
+
+        :return: The coverage matrix of demand (rows) and supply (columns) without the demand column. If the
+                 coverage is not sparse, the matrix is created from the dataframe.
+        :rtype: ~scipy.sparse.csr_matrix
+        """
+        if self._matrix is not None:
+            return self._matrix
+        if self._view is not None:
+            self._matrix = self._view_matrix()
+            return self._matrix
+        if self._dataframe_csr is None:
+            self._dataframe_csr = self._dataframe_matrix(slice(None), slice(None))
+        return self._dataframe_csr
+
+    def _dataframe_matrix(self, rows, columns):
+        """
+        Creates the coverage matrix of some rows and supply columns of the dataframe, copying only those entries.
+        """
+        positions = np.arange(len(self._dataframe.columns))
+        if self._demand_col:
+            positions = np.flatnonzero(self._dataframe.columns != self._demand_col)
+        df = self._dataframe.iloc[rows, positions[columns]]
+        if len(df.columns) > 0 and all(
+            isinstance(dtype, pd.SparseDtype) for dtype in df.dtypes
+        ):
+            return scipy.sparse.csr_matrix(df.sparse.to_coo())
+        return scipy.sparse.csr_matrix(df.to_numpy())
+
+    def _view_dataframe(self):
+        """
+        Selects the rows and columns of a view from the dataframe of the coverage it selects from, keeping the demand
+        column.
+        """
+        coverage, rows, columns = self._view
+        df = coverage._dataframe
+        demand_col = coverage._demand_col
+        positions = np.arange(len(df.columns))
+        if demand_col:
+            positions = np.flatnonzero(df.columns != demand_col)
+        if columns is not None:
+            positions = positions[columns]
+        if demand_col:
+            positions = np.sort(
+                np.concatenate([np.flatnonzero(df.columns == demand_col), positions])
+            )
+        return df.iloc[slice(None) if rows is None else rows, positions]
+
+    def _view_matrix(self):
+        coverage, rows, columns = self._view
+        if coverage._matrix is None:
+            return coverage._dataframe_matrix(
+                slice(None) if rows is None else rows,
+                slice(None) if columns is None else columns,
+            )
+        matrix = coverage._matrix
+        if rows is not None:
+            matrix = matrix[rows]
+        if columns is not None:
+            matrix = matrix[:, columns]
+        return scipy.sparse.csr_matrix(matrix)
+
+    @property
+    def demand_ids(self):
+        """
+
+        :return: The ids of the demand locations, in the order of the rows of the matrix
+        :rtype: ~pandas.Index
+        """
+        if self._demand_ids is not None:
+            return self._demand_ids
+        return self._dataframe.index
+
+    @property
+    def supply_ids(self):
+        """
+
+        :return: The ids of the supply locations, in the order of the columns of the matrix
+        :rtype: ~pandas.Index
+        """
+        if self._supply_ids is not None:
+            return self._supply_ids
+        if self._demand_col:
+            return self._dataframe.columns.drop(self._demand_col)
+        return self._dataframe.columns
+
+    @property
+    def demand_values(self):
+        """
+
+        :return: The amount of demand for each demand location, in the order of the rows of the matrix
+        :rtype: ~numpy.ndarray or None
+        """
+        if not self._demand_col:
+            return None
+        if self._demand is not None:
+            return self._demand
+        return self._dataframe[self._demand_col].to_numpy()
+
     @property
     def demand_name(self):
         """
@@ -121,6 +264,553 @@ class Coverage:
         """
         return self._demand_col
 
+    def subset(self, supply_ids=None, demand_ids=None):
+        """
+        Creates a view of the coverage restricted to some supply and/or demand locations, such as only the candidate
+        sites within one county. Creating the view does not copy the coverage matrix, it keeps this coverage along with
+        the positions of the selected locations. The matrix of the view is extracted when it is first used, copying
+        only the selected entries. A view of a view selects from the original coverage.
+
+        The view keeps the names of this coverage, so it can be passed to the factory methods of
+        :class:`~allagash.problem.Problem` in place of this coverage (but not along with it).
+
+        .. code-block:: python
+
+            county_sites = coverage.subset(supply_ids=sites_df.loc[sites_df["County"] == "Kent", "Site_Id"])
+            Problem.mclp(county_sites, max_supply={county_sites: 5})
+
+        :param list supply_ids: (optional) The ids of the supply locations to keep. If not supplied, all supply
+                                locations are kept.
+        :param list demand_ids: (optional) The ids of the demand locations to keep. If not supplied, all demand
+                                locations are kept.
+        :return: The view, with the locations in the order of this coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        coverage, rows, columns = self._view or (self, None, None)
+        if demand_ids is not None:
+            positions = self._subset_positions(self.demand_ids, demand_ids, "demand")
+            rows = positions if rows is None else rows[positions]
+        if supply_ids is not None:
+            positions = self._subset_positions(self.supply_ids, supply_ids, "supply")
+            columns = positions if columns is None else columns[positions]
+        view = type(self).__new__(type(self))
+        view._dataframe = None
+        view._matrix = None
+        view._view = (coverage, rows, columns)
+        view._demand_ids = coverage.demand_ids
+        view._supply_ids = coverage.supply_ids
+        view._demand = coverage.demand_values
+        if rows is not None:
+            view._demand_ids = view._demand_ids[rows]
+            if view._demand is not None:
+                view._demand = view._demand[rows]
+        if columns is not None:
+            view._supply_ids = view._supply_ids[columns]
+        view._set_attributes(
+            coverage.demand_col,
+            coverage.demand_name,
+            coverage.supply_name,
+            coverage.coverage_type,
+        )
+        return view
+
+    def _subset_positions(self, ids, subset_ids, kind):
+        if isinstance(subset_ids, (str, bytes)) or not hasattr(subset_ids, "__iter__"):
+            raise TypeError(
+                f"Expected list-like type for {kind}_ids, got '{type(subset_ids)}'"
+            )
+        positions = ids.get_indexer(pd.Index(subset_ids).unique())
+        if np.any(positions < 0):
+            name = self._demand_name if kind == "demand" else self._supply_name
+            raise ValueError(f"Unknown {kind} ids for {kind} named '{name}'")
+        return np.sort(positions)
+
+    def union(self, other, supply_name=None):
+        """
+        Creates a coverage where a supply location covers a demand location if it covers it in this coverage or in
+        the other coverage, such as within a 10 minute drive or a 1 km walk. The coverages are aligned by their ids and
+        the new coverage has the demand and supply locations of both, in the order of this coverage followed by the
+        locations only in the other coverage. Partial coverage keeps the larger amount covered.
+
+        .. code-block:: python
+
+            drive_or_walk = drive_coverage.union(walk_coverage)
+
+        :param ~allagash.coverage.Coverage other: The other coverage
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, the name of the supply of
+                                this coverage is used.
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        return self._combine(other, "union", supply_name)
+
+    def intersection(self, other, supply_name=None):
+        """
+        Creates a coverage where a supply location covers a demand location if it covers it in this coverage and in
+        the other coverage. The coverages are aligned by their ids and the new coverage only has the demand and supply
+        locations of both, in the order of this coverage. Partial coverage keeps the smaller amount covered.
+
+        .. code-block:: python
+
+            drive_and_walk = drive_coverage.intersection(walk_coverage)
+
+        :param ~allagash.coverage.Coverage other: The other coverage
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, the name of the supply of
+                                this coverage is used.
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        return self._combine(other, "intersection", supply_name)
+
+    def difference(self, other, supply_name=None):
+        """
+        Creates a coverage where a supply location covers a demand location if it covers it in this coverage but not
+        in the other coverage. The coverages are aligned by their ids and the new coverage has the demand and supply
+        locations of this coverage, locations only in the other coverage are ignored.
+
+        .. code-block:: python
+
+            drive_only = drive_coverage.difference(walk_coverage)
+
+        :param ~allagash.coverage.Coverage other: The other coverage
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, the name of the supply of
+                                this coverage is used.
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        return self._combine(other, "difference", supply_name)
+
+    def _combine(self, other, operation, supply_name):
+        self._validate_combine([self, other], "other", supply_name)
+        how = {"union": "outer", "intersection": "inner", "difference": "left"}
+        demand_ids = _join_ids(self.demand_ids, other.demand_ids, how[operation])
+        supply_ids = _join_ids(self.supply_ids, other.supply_ids, how[operation])
+        matrix = self._aligned_matrix(demand_ids, supply_ids)
+        other_matrix = other._aligned_matrix(demand_ids, supply_ids)
+        if operation == "union":
+            matrix = matrix.maximum(other_matrix)
+        elif operation == "intersection":
+            matrix = matrix.minimum(other_matrix)
+        else:
+            matrix = matrix - matrix.multiply(other_matrix.astype(bool))
+        return self._combined_coverage(
+            [self, other],
+            scipy.sparse.csr_matrix(matrix),
+            demand_ids,
+            supply_ids,
+            self._demand_name,
+            supply_name or self._supply_name,
+        )
+
+    @classmethod
+    def concat(cls, coverages, axis="supply", demand_name=None, supply_name=None):
+        """
+        Combines the supply locations (axis "supply") or the demand locations (axis "demand") of several coverages into
+        one coverage, such as the existing facilities and the candidate sites. The other locations are aligned by their
+        ids, the new coverage has the locations of every coverage in the order they are found. The ids of the combined
+        locations must be unique across the coverages.
+
+        .. code-block:: python
+
+            Coverage.concat([existing_coverage, candidate_coverage], axis="supply", supply_name="Sites")
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to combine
+        :param str axis: (optional) The locations to combine, "supply" or "demand". If not supplied, the default is
+                         "supply".
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, the name of the demand of the
+                                first coverage is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, the name of the supply of the
+                                first coverage is used.
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        if not isinstance(coverages, list):
+            raise TypeError(
+                f"Expected 'list' type for coverages, got '{type(coverages)}'"
+            )
+        if len(coverages) == 0:
+            raise ValueError("Expected at least 1 coverage")
+        if axis not in ("demand", "supply"):
+            raise ValueError(f"Invalid axis '{axis}'")
+        if not isinstance(demand_name, str) and demand_name is not None:
+            raise TypeError(
+                f"Expected 'str' type for demand_name, got '{type(demand_name)}'"
+            )
+        cls._validate_combine(coverages, "coverages", supply_name)
+        first, others = coverages[0], coverages[1:]
+        if axis == "supply":
+            demand_ids = first.demand_ids
+            for coverage in others:
+                demand_ids = _join_ids(demand_ids, coverage.demand_ids, "outer")
+            supply_ids = first.supply_ids.append([c.supply_ids for c in others])
+            if supply_ids.has_duplicates:
+                raise ValueError("The supply ids of the coverages must be unique")
+            matrix = scipy.sparse.hstack(
+                [c._aligned_matrix(demand_ids, c.supply_ids) for c in coverages],
+                format="csr",
+            )
+        else:
+            supply_ids = first.supply_ids
+            for coverage in others:
+                supply_ids = _join_ids(supply_ids, coverage.supply_ids, "outer")
+            demand_ids = first.demand_ids.append([c.demand_ids for c in others])
+            if demand_ids.has_duplicates:
+                raise ValueError("The demand ids of the coverages must be unique")
+            matrix = scipy.sparse.vstack(
+                [c._aligned_matrix(c.demand_ids, supply_ids) for c in coverages],
+                format="csr",
+            )
+        return first._combined_coverage(
+            coverages,
+            matrix,
+            demand_ids,
+            supply_ids,
+            demand_name or first.demand_name,
+            supply_name or first.supply_name,
+        )
+
+    @staticmethod
+    def _validate_combine(coverages, param, supply_name):
+        for coverage in coverages:
+            if not isinstance(coverage, Coverage):
+                raise TypeError(
+                    f"Expected 'Coverage' type for {param}, got '{type(coverage)}'"
+                )
+        if not isinstance(supply_name, str) and supply_name is not None:
+            raise TypeError(
+                f"Expected 'str' type for supply_name, got '{type(supply_name)}'"
+            )
+        coverage_type = coverages[0].coverage_type
+        for coverage in coverages[1:]:
+            if coverage.coverage_type != coverage_type:
+                raise ValueError(
+                    f"Expected '{coverage_type}' coverage, got '{coverage.coverage_type}'"
+                )
+
+    def _aligned_matrix(self, demand_ids, supply_ids):
+        """
+        Creates the coverage matrix with rows and columns for the given ids. Locations of this coverage that are not
+        in the ids are dropped and the rows and columns of the other ids are empty.
+        """
+        matrix = self.matrix
+        if self.demand_ids.equals(demand_ids) and self.supply_ids.equals(supply_ids):
+            return matrix
+        matrix = matrix.tocoo()
+        rows = demand_ids.get_indexer(self.demand_ids)[matrix.row]
+        columns = supply_ids.get_indexer(self.supply_ids)[matrix.col]
+        keep = (rows >= 0) & (columns >= 0)
+        return scipy.sparse.csr_matrix(
+            (matrix.data[keep], (rows[keep], columns[keep])),
+            shape=(len(demand_ids), len(supply_ids)),
+        )
+
+    def _combined_coverage(
+        self, coverages, matrix, demand_ids, supply_ids, demand_name, supply_name
+    ):
+        """
+        Creates the coverage combining several coverages. The demand values of a demand location are taken from the
+        coverages that have it, which must agree.
+        """
+        matrix.eliminate_zeros()
+        demand_col = next((c.demand_col for c in coverages if c.demand_col), None)
+        demand = None
+        if demand_col:
+            values = pd.concat(
+                [
+                    pd.Series(c.demand_values, index=c.demand_ids)
+                    for c in coverages
+                    if c.demand_col
+                ]
+            )
+            repeated = values[values.index.duplicated(keep=False)]
+            if (repeated.groupby(level=0).nunique() > 1).any():
+                raise ValueError("The demand values of the coverages do not match")
+            values = values[~values.index.duplicated()].reindex(demand_ids)
+            if values.isna().any():
+                raise ValueError(
+                    f"Missing demand values for demand named '{demand_name}'"
+                )
+            demand = values.to_numpy()
+        return type(self).from_sparse_matrix(
+            matrix,
+            demand_ids,
+            supply_ids,
+            demand=demand,
+            demand_col=demand_col,
+            demand_name=demand_name,
+            supply_name=supply_name,
+            coverage_type=self._coverage_type,
+        )
+
+    @classmethod
+    def from_sparse_matrix(
+        cls,
+        matrix,
+        demand_ids,
+        supply_ids,
+        demand=None,
+        demand_col=None,
+        demand_name="demand",
+        supply_name=None,
+        coverage_type="binary",
+    ):
+        """
+        Creates a new Coverage from a sparse matrix of demand (rows) and supply (columns). Only the non-zero entries of
+        the matrix are stored so large coverages that are mostly empty use a fraction of the memory of a dataframe.
+
+        .. code-block:: python
+
+            Coverage.from_sparse_matrix(matrix, [1, 2, 3], ["A", "B"], demand=[10, 20, 30], demand_col="Population")
+
+        :param ~scipy.sparse.spmatrix matrix: A sparse matrix of demand (rows) and supply (columns). Non-zero entries
+                                              represent coverage.
+        :param list demand_ids: The ids of the demand locations, in the order of the rows of the matrix
+        :param list supply_ids: The ids of the supply locations, in the order of the columns of the matrix
+        :param list demand: (optional) The amount of demand for each demand location. Requires demand_col.
+        :param str demand_col: (optional) The name to use for the demand values.
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param str coverage_type: (optional) The type of coverage this represents. If not supplied, the default is
+                                  "binary". Options are "binary" and "partial".
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        cls._validate_from_sparse_matrix(
+            coverage_type,
+            matrix,
+            demand_ids,
+            supply_ids,
+            demand,
+            demand_col,
+            demand_name,
+            supply_name,
+        )
+        coverage = cls.__new__(cls)
+        coverage._dataframe = None
+        coverage._matrix = scipy.sparse.csr_matrix(matrix)
+        coverage._demand_ids = pd.Index(
+            demand_ids, dtype=getattr(demand_ids, "dtype", None)
+        )
+        coverage._supply_ids = pd.Index(
+            supply_ids, dtype=getattr(supply_ids, "dtype", None)
+        )
+        coverage._demand = np.asarray(demand) if demand is not None else None
+        coverage._set_attributes(demand_col, demand_name, supply_name, coverage_type)
+        return coverage
+
+    def to_npz(self, path):
+        """
+        Writes the coverage to an uncompressed NPZ file that stores the coverage matrix as CSR arrays along with the
+        ids, demand values and names. The file can be read using :meth:`~allagash.coverage.Coverage.read_npz`.
+
+        :param str path: The path of the file to write
+        :return: None
+        """
+        matrix = self.matrix
+        metadata = {
+            "demand_id_col": self.demand_ids.name,
+            "supply_id_col": self.supply_ids.name,
+            "demand_col": self._demand_col,
+            "demand_name": self._demand_name,
+            "supply_name": self._supply_name,
+            "coverage_type": self._coverage_type,
+        }
+        arrays = {
+            "data": matrix.data,
+            "indices": matrix.indices,
+            "indptr": matrix.indptr,
+            "shape": np.array(matrix.shape),
+            "metadata": np.array(json.dumps(metadata)),
+        }
+        for name, ids in (
+            ("demand_ids", self.demand_ids),
+            ("supply_ids", self.supply_ids),
+        ):
+            arrays[name], types = self._id_array(ids)
+            if types is not None:
+                arrays[f"{name}_types"] = types
+        if self.demand_values is not None:
+            arrays["demand"] = self.demand_values
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def read_npz(cls, path, mmap=False):
+        """
+        Reads a coverage written by :meth:`~allagash.coverage.Coverage.to_npz`. The coverage is always sparse.
+
+        When mmap is True the arrays are memory-mapped instead of read, so large coverages open instantly and the
+        pages are shared by every process that maps the same file rather than copied into each of them.
+
+        .. code-block:: python
+
+            coverage.to_npz("coverage.npz")
+            coverage = Coverage.read_npz("coverage.npz", mmap=True)
+
+        :param str path: The path of the file to read
+        :param bool mmap: (optional) Whether to memory-map the arrays (read-only). If not supplied, the default is
+                          False.
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        if not isinstance(mmap, bool):
+            raise TypeError(f"Expected 'bool' type for mmap, got '{type(mmap)}'")
+        arrays = cls._map_npz(path) if mmap else cls._load_npz(path)
+        metadata = json.loads(arrays["metadata"].item())
+        coverage = cls.__new__(cls)
+        coverage._dataframe = None
+        coverage._matrix = scipy.sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(arrays["shape"].tolist()),
+            copy=False,
+        )
+        coverage._demand_ids = cls._read_ids(
+            arrays, "demand_ids", metadata["demand_id_col"]
+        )
+        coverage._supply_ids = cls._read_ids(
+            arrays, "supply_ids", metadata["supply_id_col"]
+        )
+        coverage._demand = arrays.get("demand")
+        coverage._set_attributes(
+            metadata["demand_col"],
+            metadata["demand_name"],
+            metadata["supply_name"],
+            metadata["coverage_type"],
+        )
+        return coverage
+
+    @staticmethod
+    def _load_npz(path):
+        with np.load(path, allow_pickle=False) as npz:
+            return {name: npz[name] for name in npz.files}
+
+    @staticmethod
+    def _map_npz(path):
+        # np.load cannot memory-map the members of an NPZ file, but they are stored uncompressed so each array can be
+        # mapped at the offset of its data within the zip file
+        arrays = {}
+        with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+            for info in archive.infolist():
+                if info.compress_type != zipfile.ZIP_STORED:
+                    raise ValueError("Compressed NPZ files cannot be memory-mapped")
+                f.seek(info.header_offset)
+                name_length, extra_length = struct.unpack("<26xHH", f.read(30))
+                f.seek(name_length + extra_length, 1)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                name = info.filename[: -len(".npy")]
+                if len(shape) == 0 or 0 in shape or dtype.hasobject:
+                    f.seek(info.header_offset + 30 + name_length + extra_length)
+                    arrays[name] = np.lib.format.read_array(f, allow_pickle=False)
+                else:
+                    arrays[name] = np.memmap(
+                        path,
+                        dtype=dtype,
+                        mode="r",
+                        offset=f.tell(),
+                        shape=shape,
+                        order="F" if fortran_order else "C",
+                    )
+        return arrays
+
+    # The types of ids that can be stored in an NPZ file without pickling, see _id_array()
+    _id_types = (str, int, float)
+
+    @classmethod
+    def _id_array(cls, ids):
+        """
+        Creates the array of ids to store in an NPZ file. Object arrays would have to be pickled, so ids of a single
+        type are stored as numbers or strings. Ids of mixed types are stored as strings along with the position of the
+        type of each id in _id_types, so they can be rebuilt exactly.
+        """
+        values = ids.to_numpy()
+        if values.dtype != object:
+            return values, None
+        values = values.tolist()
+        types = []
+        for value in values:
+            if isinstance(value, str):
+                types.append(0)
+            elif isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+                types.append(1)
+            elif isinstance(value, (float, np.floating)):
+                types.append(2)
+            else:
+                raise ValueError(
+                    f"Expected 'str', 'int' or 'float' ids, got '{type(value)}'"
+                )
+        types = np.array(types, dtype=np.int8)
+        if len(types) == 0 or np.all(types == types[0]):
+            return np.array(values), None
+        return np.array([str(v) for v in values]), types
+
+    @classmethod
+    def _read_ids(cls, arrays, name, id_col):
+        types = arrays.get(f"{name}_types")
+        if types is None:
+            return pd.Index(arrays[name], name=id_col)
+        return pd.Index(
+            [
+                cls._id_types[t](v)
+                for t, v in zip(types.tolist(), arrays[name].tolist())
+            ],
+            dtype=object,
+            name=id_col,
+        )
+
+    @classmethod
+    def _from_pairs(
+        cls,
+        demand_idx,
+        supply_idx,
+        values,
+        demand_ids,
+        supply_ids,
+        demand,
+        demand_col,
+        demand_name,
+        supply_name,
+        coverage_type,
+        sparse,
+    ):
+        """
+        Creates a new Coverage from the positions and values of the covered (demand, supply) pairs.
+        """
+        shape = (len(demand_ids), len(supply_ids))
+        if sparse:
+            matrix = scipy.sparse.csr_matrix(
+                (values, (demand_idx, supply_idx)), shape=shape
+            )
+            return cls.from_sparse_matrix(
+                matrix,
+                demand_ids,
+                supply_ids,
+                demand=demand if demand_col else None,
+                demand_col=demand_col,
+                demand_name=demand_name,
+                supply_name=supply_name,
+                coverage_type=coverage_type,
+            )
+        matrix = np.zeros(shape, dtype=values.dtype)
+        matrix[demand_idx, supply_idx] = values
+        df = pd.DataFrame(
+            matrix,
+            index=demand_ids,
+            columns=pd.Index(supply_ids.tolist(), dtype=object),
+        )
+        if demand_col:
+            df.insert(0, demand_col, demand, allow_duplicates=True)
+        return Coverage(
+            df,
+            demand_col=demand_col,
+            demand_name=demand_name,
+            supply_name=supply_name,
+            coverage_type=coverage_type,
+        )
+
     @classmethod
     def from_geodataframes(
         cls,
@@ -132,6 +822,8 @@ class Coverage:
         supply_name=None,
         demand_col=None,
         coverage_type="binary",
+        sparse=False,
+        n_jobs=1,
     ):
         """
         Creates a new Coverage from two GeoDataFrames representing the demand and supply locations. The coverage
@@ -147,6 +839,11 @@ class Coverage:
                                           locations. Required if generating partial coverage.
         :param str coverage_type: (optional) The type of coverage this represents. If not supplied, the default is
                                   "binary". Options are "binary" and "partial".
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :param int n_jobs: (optional) The number of processes used to compute the coverage. The demand locations are
+                           split into chunks that are processed in parallel. -1 uses all available CPUs. If not
+                           supplied, the default is 1 and the coverage is computed in this process.
 
         :return: The coverage
         :rtype: ~allagash.coverage.Coverage
@@ -161,45 +858,141 @@ class Coverage:
             supply_id_col,
         )
 
-        data = []
-        if coverage_type.lower() == "binary":
-            for index, row in demand_df.iterrows():
-                contains = supply_df.geometry.contains(
-                    row[demand_df._geometry_column_name]
-                ).tolist()
-                if demand_col:
-                    contains.insert(0, row[demand_col])
-                # Add the id column to the end, it will be used as index and removed later
-                contains.append(row[demand_id_col])
-                data.append(contains)
-        elif coverage_type.lower() == "partial":
-            for index, row in demand_df.iterrows():
-                demand_area = row[demand_df._geometry_column_name].area
-                intersection_area = supply_df.geometry.intersection(
-                    row[demand_df._geometry_column_name]
-                ).geometry.area
-                partial_coverage = (
-                    (intersection_area / demand_area) * row[demand_col]
-                ).tolist()
-                if demand_col:
-                    partial_coverage.insert(0, row[demand_col])
-                partial_coverage.insert(0, row[demand_id_col])
-                data.append(partial_coverage)
+        cls._validate_n_jobs(n_jobs)
+        demand = demand_df[demand_col].values if demand_col else None
+        n_jobs = cls._resolve_n_jobs(n_jobs, len(demand_df))
+        if n_jobs == 1:
+            demand_idx, supply_idx, values = _geodataframe_pairs(
+                demand_df.geometry, supply_df.geometry, demand, coverage_type.lower()
+            )
         else:
-            raise ValueError(f"Invalid coverage type '{coverage_type}'")
-        columns = supply_df[supply_id_col].tolist()
-        if demand_col:
-            columns.insert(0, demand_col)
-        # id column will be used as index when dataframe is created
-        columns.append(demand_id_col)
-        # Set index after to avoid issue with multiindex being created
-        df = pd.DataFrame.from_records(data, columns=columns).set_index(demand_id_col)
-        return Coverage(
-            df,
-            demand_col=demand_col,
-            demand_name=demand_name,
-            supply_name=supply_name,
-            coverage_type=coverage_type,
+            # Geometries are sent to the worker processes as WKB, the supply locations once per process
+            demand_idx, supply_idx, values = _parallel_pairs(
+                _init_geodataframe_worker,
+                supply_df.geometry.to_wkb().values,
+                _geodataframe_chunk_pairs,
+                demand_df.geometry.to_wkb().values,
+                demand,
+                coverage_type.lower(),
+                n_jobs,
+            )
+        return cls._from_pairs(
+            demand_idx,
+            supply_idx,
+            values,
+            pd.Index(demand_df[demand_id_col].values, name=demand_id_col),
+            pd.Index(supply_df[supply_id_col].values, name=supply_id_col),
+            demand,
+            demand_col,
+            demand_name,
+            supply_name,
+            coverage_type,
+            sparse,
+        )
+
+    @classmethod
+    def from_nested_geodataframes(
+        cls,
+        demand_df,
+        supply_df,
+        demand_id_col,
+        supply_id_col,
+        threshold_col,
+        demand_name="demand",
+        supply_name=None,
+        demand_col=None,
+        coverage_type="binary",
+        sparse=False,
+    ):
+        """
+        Creates a Coverage for each threshold of nested service areas, such as 5, 10, 15 and 20 minute drive times,
+        from one spatial join. The supply dataframe has one row per supply location and threshold. The service areas of
+        a supply location are expected to be nested, each one containing the ones of smaller thresholds.
+
+        Only the largest service area of each supply location is joined with the demand locations. The pairs covered
+        at one threshold are the only ones tested against the next smaller threshold, so every threshold after the
+        largest only checks the pairs it could cover.
+
+        .. code-block:: python
+
+            coverages = Coverage.from_nested_geodataframes(demand_df, drive_times_df, "GEOID", "ORIG_ID", "Minutes")
+            coverages[10]
+
+        :param ~geopandas.GeoDataFrame demand_df: The GeoDataFrame containing the demand locations
+        :param ~geopandas.GeoDataFrame supply_df: The GeoDataFrame containing the service areas of the supply locations
+        :param str demand_id_col: The name of the column that has unique identifiers for the demand locations
+        :param str supply_id_col: The name of the column that has the identifiers of the supply locations. Each
+                                  supply location has one row per threshold.
+        :param str threshold_col: The name of the column that stores the threshold of each service area
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param str demand_col: (optional) The name of the column that stores the amount of demand for the demand
+                                          locations. Required if generating partial coverage.
+        :param str coverage_type: (optional) The type of coverage this represents. If not supplied, the default is
+                                  "binary". Options are "binary" and "partial".
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :return: The coverage of each threshold, keyed by the threshold in ascending order
+        :rtype: dict[float,~allagash.coverage.Coverage]
+        """
+        cls._validate_from_geodataframes(
+            coverage_type,
+            demand_col,
+            demand_df,
+            demand_id_col,
+            demand_name,
+            supply_df,
+            supply_id_col,
+        )
+        if not isinstance(threshold_col, str):
+            raise TypeError(
+                f"Expected 'str' type for threshold_col, got '{type(threshold_col)}'"
+            )
+        if threshold_col not in supply_df.columns:
+            raise ValueError(f"'{threshold_col}' not in dataframe")
+        if supply_df.duplicated([supply_id_col, threshold_col]).any():
+            raise ValueError(
+                f"Expected one row per '{supply_id_col}' and '{threshold_col}'"
+            )
+        demand = demand_df[demand_col].values if demand_col else None
+        supply_ids = pd.Index(pd.unique(supply_df[supply_id_col]), name=supply_id_col)
+        layers = _nested_pairs(
+            demand_df.geometry.values,
+            supply_df.geometry.values,
+            supply_ids.get_indexer(supply_df[supply_id_col]),
+            supply_df[threshold_col].to_numpy(),
+            demand,
+            coverage_type.lower(),
+        )
+        return {
+            threshold: cls._from_pairs(
+                demand_idx,
+                supply_idx,
+                values,
+                pd.Index(demand_df[demand_id_col].values, name=demand_id_col),
+                supply_ids,
+                demand,
+                demand_col,
+                demand_name,
+                supply_name,
+                coverage_type,
+                sparse,
+            )
+            for threshold, (demand_idx, supply_idx, values) in sorted(layers.items())
+        }
+
+    @staticmethod
+    def _concatenate_pairs(demand_idx, supply_idx, values, dtype):
+        if not demand_idx:
+            return (
+                np.array([], dtype=int),
+                np.array([], dtype=int),
+                np.array([], dtype=dtype),
+            )
+        return (
+            np.concatenate(demand_idx),
+            np.concatenate(supply_idx),
+            np.concatenate(values).astype(dtype),
         )
 
     @classmethod
@@ -215,6 +1008,8 @@ class Coverage:
         coverage_type="binary",
         demand_geometry_col="SHAPE",
         supply_geometry_col="SHAPE",
+        sparse=False,
+        n_jobs=1,
     ):
         """
         Creates a new Coverage from two spatially enabled (arcgis) dataframes representing the demand and supply locations.
@@ -234,6 +1029,11 @@ class Coverage:
                                         If not supplied, the default is "SHAPE".
         :param str supply_geometry_col: (optional) The name of the field storing the geometry in the supply dataframe.
                                         If not supplied, the default is "SHAPE".
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :param int n_jobs: (optional) The number of processes used to compute the coverage. The demand locations are
+                           split into chunks that are processed in parallel. -1 uses all available CPUs. If not
+                           supplied, the default is 1 and the coverage is computed in this process.
         :return: The coverage
         :rtype: ~allagash.coverage.Coverage
         """
@@ -249,51 +1049,407 @@ class Coverage:
             demand_geometry_col,
             supply_geometry_col,
         )
-        data = []
-        if coverage_type.lower() == "binary":
-            for index, row in demand_df.iterrows():
-                contains = (
-                    supply_df[supply_geometry_col]
-                    .geom.contains(row[demand_geometry_col])
-                    .tolist()
-                )
-                if demand_col:
-                    contains.insert(0, row[demand_col])
-                # Add the id column to the end, it will be used as index and removed later
-                contains.append(row[demand_id_col])
-                data.append(contains)
-        elif coverage_type.lower() == "partial":
-            for index, row in demand_df.iterrows():
-                partial_coverage = []
-                demand_area = row[demand_geometry_col].area
-                # Cannot vectorize this because if the intersection returns an empty polygon with rings
-                # The conversion to shapely fails when trying to get the area
-                for _, s_row in supply_df.iterrows():
-                    intersection = s_row[supply_geometry_col].intersect(
-                        row[demand_geometry_col]
-                    )
-                    area = intersection.area if not intersection.is_empty else 0
-                    partial_coverage.append((area / demand_area) * row[demand_col])
-                if demand_col:
-                    partial_coverage.insert(0, row[demand_col])
-                # Add the id column to the end, it will be used as index and removed later
-                partial_coverage.append(row[demand_id_col])
-                data.append(partial_coverage)
+        cls._validate_n_jobs(n_jobs)
+        demand = demand_df[demand_col].values if demand_col else None
+        demand_geometries = demand_df[demand_geometry_col].reset_index(drop=True)
+        supply_geometries = supply_df[supply_geometry_col].reset_index(drop=True)
+        n_jobs = cls._resolve_n_jobs(n_jobs, len(demand_df))
+        if n_jobs == 1:
+            demand_idx, supply_idx, values = _spatially_enabled_pairs(
+                demand_geometries, supply_geometries, demand, coverage_type.lower()
+            )
         else:
-            raise ValueError(f"Invalid coverage type '{coverage_type}'")
-        columns = supply_df[supply_id_col].tolist()
-        if demand_col:
-            columns.insert(0, demand_col)
-        columns.append(demand_id_col)
-        df = pd.DataFrame.from_records(data, columns=columns).set_index(demand_id_col)
-        return Coverage(
-            df,
-            demand_col=demand_col,
-            demand_name=demand_name,
-            supply_name=supply_name,
-            coverage_type=coverage_type,
+            # The arcgis geometries are pickled as is, converting them to WKB would drop the spatial reference
+            demand_idx, supply_idx, values = _parallel_pairs(
+                _init_spatially_enabled_worker,
+                supply_geometries,
+                _spatially_enabled_chunk_pairs,
+                demand_geometries,
+                demand,
+                coverage_type.lower(),
+                n_jobs,
+            )
+        return cls._from_pairs(
+            demand_idx,
+            supply_idx,
+            values,
+            pd.Index(demand_df[demand_id_col].values, name=demand_id_col),
+            pd.Index(supply_df[supply_id_col].values, name=supply_id_col),
+            demand,
+            demand_col,
+            demand_name,
+            supply_name,
+            coverage_type,
+            sparse,
+        )
+
+    @classmethod
+    def from_points_within_radius(
+        cls,
+        demand_df,
+        supply_df,
+        demand_id_col,
+        supply_id_col,
+        radius,
+        demand_name="demand",
+        supply_name=None,
+        demand_col=None,
+        x_col=None,
+        y_col=None,
+        metric="euclidean",
+        sparse=False,
+    ):
+        """
+        Creates a new binary Coverage from two dataframes of points. A demand location is covered by a supply location
+        if the distance between them is at most the radius. The pairs are found with a KD-tree, so the supply locations
+        do not have to be buffered into service area polygons first.
+
+        .. code-block:: python
+
+            Coverage.from_points_within_radius(demand_df, supply_df, "GEOID", "ORIG_ID", 5000, metric="haversine")
+
+        :param ~pandas.DataFrame demand_df: The dataframe containing the demand locations
+        :param ~pandas.DataFrame supply_df: The dataframe containing the supply locations
+        :param str demand_id_col: The name of the column that has unique identifiers for the demand locations
+        :param str supply_id_col: The name of the column that has unique identifiers for the supply locations
+        :param radius: The largest distance from a supply location that is covered, or a list of them. With the
+                       "haversine" metric it is in meters, otherwise it is in the units of the coordinates. The pairs
+                       within every radius are found from one query of the largest radius.
+        :type radius: float or list[float]
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param str demand_col: (optional) The name of the column that stores the amount of demand for the demand
+                                          locations.
+        :param str x_col: (optional) The name of the column storing the x coordinates (longitude for "haversine"). If
+                          not supplied, the coordinates of the points in the geometry column are used.
+        :param str y_col: (optional) The name of the column storing the y coordinates (latitude for "haversine").
+                          Required if x_col is supplied.
+        :param str metric: (optional) How the distance is measured. Options are "euclidean" for projected coordinates
+                           and "haversine" for the great-circle distance between longitude/latitude coordinates in
+                           degrees. If not supplied, the default is "euclidean".
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :return: The coverage, or a list with the coverage of each radius if a list of radii was supplied
+        :rtype: ~allagash.coverage.Coverage or list[~allagash.coverage.Coverage]
+        """
+        cls._validate_from_geodataframes(
+            "binary",
+            demand_col,
+            demand_df,
+            demand_id_col,
+            demand_name,
+            supply_df,
+            supply_id_col,
+        )
+        radii = radius if isinstance(radius, list) else [radius]
+        for r in radii:
+            cls._validate_radius(r, metric, x_col, y_col, demand_df, supply_df)
+        # The pairs within the largest radius are found once, the smaller radii only filter their distances
+        demand_idx, supply_idx, distance = _radius_pairs(
+            _point_coordinates(demand_df, x_col, y_col),
+            _point_coordinates(supply_df, x_col, y_col),
+            max(radii),
+            metric.lower(),
+        )
+        coverages = []
+        for r in radii:
+            covered = distance <= r
+            coverages.append(
+                cls._from_pairs(
+                    demand_idx[covered],
+                    supply_idx[covered],
+                    np.ones(int(covered.sum()), dtype=bool),
+                    pd.Index(demand_df[demand_id_col].values, name=demand_id_col),
+                    pd.Index(supply_df[supply_id_col].values, name=supply_id_col),
+                    demand_df[demand_col].values if demand_col else None,
+                    demand_col,
+                    demand_name,
+                    supply_name,
+                    "binary",
+                    sparse,
+                )
+            )
+        return coverages if isinstance(radius, list) else coverages[0]
+
+    @classmethod
+    def from_distance_matrix(
+        cls,
+        costs,
+        threshold,
+        demand_name="demand",
+        supply_name=None,
+        demand=None,
+        demand_col=None,
+        sparse=False,
+    ):
+        """
+        Creates a new binary Coverage from a matrix of the cost (for example the travel time or network distance) of
+        reaching each supply location from each demand location. A demand location is covered by a supply location if
+        the cost is at most the threshold. Missing costs are never covered.
+
+        .. code-block:: python
+
+            Coverage.from_distance_matrix(travel_times, 15, demand=population, demand_col="Population")
+
+        :param ~pandas.DataFrame costs: A dataframe of costs with the demand ids as the index and the supply ids as the
+                                        columns
+        :param float threshold: The largest cost that is covered
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param list demand: (optional) The amount of demand for each demand location, in the order of the rows.
+                            Requires demand_col.
+        :param str demand_col: (optional) The name to use for the demand values.
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :return: The coverage
+        :rtype: ~allagash.coverage.Coverage
+        """
+        if not isinstance(costs, pd.DataFrame):
+            raise TypeError(f"Expected 'Dataframe' type for costs, got '{type(costs)}'")
+        cls._validate_threshold(threshold, "threshold")
+        cls._validate_from_sparse_matrix(
+            "binary",
+            scipy.sparse.csr_matrix(costs.shape),
+            costs.index,
+            costs.columns,
+            demand,
+            demand_col,
+            demand_name,
+            supply_name,
+        )
+        with np.errstate(invalid="ignore"):
+            demand_idx, supply_idx = np.nonzero(
+                costs.to_numpy(dtype=float) <= threshold
+            )
+        return cls._from_pairs(
+            demand_idx,
+            supply_idx,
+            np.ones(len(demand_idx), dtype=bool),
+            pd.Index(costs.index),
+            pd.Index(costs.columns),
+            np.asarray(demand) if demand is not None else None,
+            demand_col,
+            demand_name,
+            supply_name,
+            "binary",
+            sparse,
+        )
+
+    @classmethod
+    def from_od_table(
+        cls,
+        source,
+        demand_id_col,
+        supply_id_col,
+        cost_col,
+        threshold,
+        demand_ids=None,
+        supply_ids=None,
+        demand=None,
+        demand_col=None,
+        demand_name="demand",
+        supply_name=None,
+        chunksize=1_000_000,
+        sparse=False,
+    ):
+        """
+        Creates new binary Coverages from an origin-destination table with one row per (demand, supply) pair, such as
+        the output of a routing engine. The table is read in chunks and only the rows with a cost at most the threshold
+        are kept, so the full table is never in memory. When a list of thresholds is supplied, one coverage is created
+        for each threshold from the same pass over the table.
+
+        .. code-block:: python
+
+            coverages = Coverage.from_od_table(
+                "travel_times.parquet", "GEOID", "ORIG_ID", "minutes", [5, 10, 15], sparse=True
+            )
+
+        :param source: The table to read. Either the path of a CSV or Parquet file, a dataframe, or an iterable of
+                       dataframes that are the chunks of the table. Reading Parquet files requires pyarrow.
+        :type source: str or ~pandas.DataFrame or iterable[~pandas.DataFrame]
+        :param str demand_id_col: The name of the column storing the ids of the demand locations
+        :param str supply_id_col: The name of the column storing the ids of the supply locations
+        :param str cost_col: The name of the column storing the cost of reaching the supply location from the demand
+                             location
+        :param threshold: The largest cost that is covered, or a list of them
+        :type threshold: float or list[float]
+        :param list demand_ids: (optional) The ids of the demand locations. If not supplied, every demand id found in
+                                the table is used, in the order they are first found.
+        :param list supply_ids: (optional) The ids of the supply locations. If not supplied, every supply id found in
+                                the table is used, in the order they are first found.
+        :param list demand: (optional) The amount of demand for each demand location, in the order of demand_ids.
+                            Requires demand_ids and demand_col.
+        :param str demand_col: (optional) The name to use for the demand values.
+        :param str demand_name: (optional) The name of the demand to use. If not supplied, 'demand' is used.
+        :param str supply_name: (optional) The name of the supply to use. If not supplied, a random name is generated.
+        :param int chunksize: (optional) The number of rows to read at a time from a file. If not supplied, the default
+                              is 1,000,000.
+        :param bool sparse: (optional) Whether to store the coverage as a sparse matrix. If not supplied, the default
+                            is False.
+        :return: The coverage, or a list with the coverage of each threshold if a list of thresholds was supplied
+        :rtype: ~allagash.coverage.Coverage or list[~allagash.coverage.Coverage]
+        """
+        if not isinstance(source, (str, os.PathLike, pd.DataFrame)) and not hasattr(
+            source, "__iter__"
+        ):
+            raise TypeError(
+                f"Expected 'str', 'Dataframe' or iterable type for source, got '{type(source)}'"
+            )
+        thresholds = threshold if isinstance(threshold, list) else [threshold]
+        for t in thresholds:
+            cls._validate_threshold(t, "threshold")
+        for param, value in (
+            ("demand_id_col", demand_id_col),
+            ("supply_id_col", supply_id_col),
+            ("cost_col", cost_col),
+        ):
+            if not isinstance(value, str):
+                raise TypeError(f"Expected 'str' type for {param}, got '{type(value)}'")
+        if not isinstance(chunksize, int) or chunksize < 1:
+            raise ValueError(f"Invalid chunksize '{chunksize}'")
+        if demand is not None and demand_ids is None:
+            raise ValueError("'demand_ids' is required when 'demand' is supplied")
+        if (demand is None) != (demand_col is None):
+            raise ValueError("'demand' and 'demand_col' must be supplied together")
+        if demand is not None and len(demand) != len(demand_ids):
+            raise ValueError(
+                f"Expected {len(demand_ids)} demand values, got {len(demand)}"
+            )
+
+        demand_positions = _IdPositions(demand_ids, demand_id_col)
+        supply_positions = _IdPositions(supply_ids, supply_id_col)
+        largest = max(thresholds)
+        demand_idx, supply_idx, costs = [], [], []
+        for chunk in _od_chunks(
+            source, [demand_id_col, supply_id_col, cost_col], chunksize
+        ):
+            # Ids are added for every row so locations that are never covered are still part of the coverage
+            chunk_demand = demand_positions.get(chunk[demand_id_col])
+            chunk_supply = supply_positions.get(chunk[supply_id_col])
+            chunk_costs = chunk[cost_col].to_numpy(dtype=float)
+            with np.errstate(invalid="ignore"):
+                keep = np.flatnonzero(chunk_costs <= largest)
+            demand_idx.append(chunk_demand[keep])
+            supply_idx.append(chunk_supply[keep])
+            costs.append(chunk_costs[keep])
+        demand_idx, supply_idx, costs = cls._concatenate_pairs(
+            demand_idx, supply_idx, costs, float
         )
 
+        coverages = []
+        for t in thresholds:
+            covered = costs <= t
+            coverages.append(
+                cls._from_pairs(
+                    demand_idx[covered],
+                    supply_idx[covered],
+                    np.ones(int(covered.sum()), dtype=bool),
+                    demand_positions.ids,
+                    supply_positions.ids,
+                    np.asarray(demand) if demand is not None else None,
+                    demand_col,
+                    demand_name,
+                    supply_name,
+                    "binary",
+                    sparse,
+                )
+            )
+        return coverages if isinstance(threshold, list) else coverages[0]
+
+    @staticmethod
+    def _validate_threshold(threshold, param):
+        if not isinstance(threshold, (int, float, np.number)) or isinstance(
+            threshold, bool
+        ):
+            raise TypeError(
+                f"Expected 'int' or 'float' type for {param}, got '{type(threshold)}'"
+            )
+        if threshold < 0:
+            raise ValueError(f"Invalid {param} '{threshold}'")
+
+    @classmethod
+    def _validate_radius(cls, radius, metric, x_col, y_col, demand_df, supply_df):
+        cls._validate_threshold(radius, "radius")
+        if not isinstance(metric, str):
+            raise TypeError(f"Expected 'str' type for metric, got '{type(metric)}'")
+        if metric.lower() not in ("euclidean", "haversine"):
+            raise ValueError(f"Invalid metric '{metric}'")
+        if (x_col is None) != (y_col is None):
+            raise ValueError("'x_col' and 'y_col' must be supplied together")
+        for col in (x_col, y_col):
+            if col is not None and (
+                col not in demand_df.columns or col not in supply_df.columns
+            ):
+                raise ValueError(f"'{col}' not in dataframe")
+
+    @staticmethod
+    def _validate_n_jobs(n_jobs):
+        if not isinstance(n_jobs, int) or isinstance(n_jobs, bool):
+            raise TypeError(f"Expected 'int' type for n_jobs, got '{type(n_jobs)}'")
+        if n_jobs == 0 or n_jobs < -1:
+            raise ValueError(f"Invalid n_jobs '{n_jobs}'")
+
+    @staticmethod
+    def _resolve_n_jobs(n_jobs, n_demand):
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        return max(1, min(n_jobs, n_demand))
+
+    @classmethod
+    def _validate_from_sparse_matrix(
+        cls,
+        coverage_type,
+        matrix,
+        demand_ids,
+        supply_ids,
+        demand,
+        demand_col,
+        demand_name,
+        supply_name,
+    ):
+        if not scipy.sparse.issparse(matrix):
+            raise TypeError(
+                f"Expected 'spmatrix' type for matrix, got '{type(matrix)}'"
+            )
+        if not isinstance(demand_col, str) and demand_col is not None:
+            raise TypeError(
+                f"Expected 'str' type for demand_col, got '{type(demand_col)}'"
+            )
+        if not isinstance(demand_name, str) and demand_name is not None:
+            raise TypeError(
+                f"Expected 'str' type for demand_name, got '{type(demand_name)}'"
+            )
+        if not isinstance(supply_name, str) and supply_name is not None:
+            raise TypeError(
+                f"Expected 'str' type for supply_name, got '{type(supply_name)}'"
+            )
+        if not isinstance(coverage_type, str):
+            raise TypeError(
+                f"Expected 'str' type for coverage_type, got '{type(coverage_type)}'"
+            )
+        if len(demand_ids) != matrix.shape[0]:
+            raise ValueError(
+                f"Expected {matrix.shape[0]} demand_ids, got {len(demand_ids)}"
+            )
+        if len(supply_ids) != matrix.shape[1]:
+            raise ValueError(
+                f"Expected {matrix.shape[1]} supply_ids, got {len(supply_ids)}"
+            )
+        if demand is not None and len(demand) != matrix.shape[0]:
+            raise ValueError(
+                f"Expected {matrix.shape[0]} demand values, got {len(demand)}"
+            )
+        if demand is not None and demand_col is None:
+            raise ValueError("'demand_col' is required when 'demand' is supplied")
+        if demand is None and demand_col is not None:
+            raise ValueError("'demand' is required when 'demand_col' is supplied")
+        if coverage_type.lower() not in ("binary", "partial"):
+            raise ValueError(f"Invalid coverage type '{coverage_type}'")
+        if coverage_type.lower() == "partial" and demand_col is None:
+            raise ValueError(
+                "'demand_col' is required when generating partial coverage"
+            )
+
     @classmethod
     def _validate_from_geodataframes(
         cls,
@@ -391,3 +1547,375 @@ class Coverage:
             raise ValueError(f"Invalid coverage type '{coverage_type}'")
         if coverage_type.lower() == "partial" and demand_col is None:
             raise ValueError("demand_col is required when generating partial coverage")
+
+
+# The state of a worker process, set once by the pool initializer so the supply locations are only sent and indexed
+# once per process rather than once per chunk
+_worker_state = {}
+
+
+def _parallel_pairs(
+    initializer,
+    supply,
+    chunk_function,
+    demand_geometries,
+    demand,
+    coverage_type,
+    n_jobs,
+):
+    """
+    Computes the covered (demand, supply) pairs in a pool of processes. The demand locations are split into
+    contiguous chunks and the results are concatenated in the original demand order.
+
+    :param callable initializer: The function that sets up the supply locations in each worker process
+    :param supply: The supply locations passed to the initializer
+    :param callable chunk_function: The function that computes the pairs of a chunk of demand locations
+    :param demand_geometries: The geometries of the demand locations, supporting positional slicing
+    :param ~numpy.ndarray demand: The amount of demand at each location, None if there is no demand column
+    :param str coverage_type: The type of coverage, "binary" or "partial"
+    :param int n_jobs: The number of processes to use
+    :return: The positional indices of the demand rows, the supply rows and the value of each pair
+    :rtype: tuple(~numpy.ndarray, ~numpy.ndarray, ~numpy.ndarray)
+    """
+    # Several chunks per process balance the load when some demand locations are much more expensive than others
+    bounds = np.linspace(0, len(demand_geometries), n_jobs * 4 + 1).astype(int)
+    bounds = np.unique(bounds)
+    starts, ends = bounds[:-1], bounds[1:]
+    chunks = [demand_geometries[start:end] for start, end in zip(starts, ends)]
+    chunk_demand = [
+        None if demand is None else demand[start:end]
+        for start, end in zip(starts, ends)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=n_jobs, initializer=initializer, initargs=(supply,)
+    ) as executor:
+        results = list(
+            executor.map(
+                chunk_function,
+                chunks,
+                chunk_demand,
+                [coverage_type] * len(chunks),
+            )
+        )
+    demand_idx = [r[0] + start for r, start in zip(results, starts)]
+    supply_idx = [r[1] for r in results]
+    values = [r[2] for r in results]
+    return Coverage._concatenate_pairs(
+        demand_idx, supply_idx, values, bool if coverage_type == "binary" else float
+    )
+
+
+def _geodataframe_pairs(demand_geometries, supply_geometries, demand, coverage_type):
+    """
+    Computes the covered (demand, supply) pairs of two GeoSeries.
+
+    :param ~geopandas.GeoSeries demand_geometries: The geometries of the demand locations
+    :param ~geopandas.GeoSeries supply_geometries: The geometries of the supply locations
+    :param ~numpy.ndarray demand: The amount of demand at each location, None if there is no demand column
+    :param str coverage_type: The type of coverage, "binary" or "partial"
+    :return: The positional indices of the demand rows, the supply rows and the value of each pair
+    :rtype: tuple(~numpy.ndarray, ~numpy.ndarray, ~numpy.ndarray)
+    """
+    if coverage_type == "binary":
+        # 'within' is the inverse of 'contains', the input (demand) geometries are tested against the tree
+        demand_idx, supply_idx = supply_geometries.sindex.query(
+            demand_geometries.values, predicate="within"
+        )
+        return demand_idx, supply_idx, np.ones(len(demand_idx), dtype=bool)
+    # Only the pairs found by the spatial index can overlap, their intersections are computed in one vectorized call
+    demand_idx, supply_idx = supply_geometries.sindex.query(
+        demand_geometries.values, predicate="intersects"
+    )
+    demand_array = demand_geometries.values
+    intersection_area = (
+        demand_array[demand_idx].intersection(supply_geometries.values[supply_idx]).area
+    )
+    partial_coverage = (
+        intersection_area / demand_array.area[demand_idx] * demand[demand_idx]
+    ).astype(float)
+    covered = np.flatnonzero(partial_coverage)
+    return demand_idx[covered], supply_idx[covered], partial_coverage[covered]
+
+
+def _init_geodataframe_worker(supply_wkb):
+    import geopandas
+
+    _worker_state["supply"] = geopandas.GeoSeries.from_wkb(supply_wkb)
+
+
+def _geodataframe_chunk_pairs(demand_wkb, demand, coverage_type):
+    import geopandas
+
+    return _geodataframe_pairs(
+        geopandas.GeoSeries.from_wkb(demand_wkb),
+        _worker_state["supply"],
+        demand,
+        coverage_type,
+    )
+
+
+def _spatially_enabled_pairs(
+    demand_geometries, supply_geometries, demand, coverage_type
+):
+    """
+    Computes the covered (demand, supply) pairs of two series of arcgis geometries.
+
+    :param ~pandas.Series demand_geometries: The geometries of the demand locations
+    :param ~pandas.Series supply_geometries: The geometries of the supply locations
+    :param ~numpy.ndarray demand: The amount of demand at each location, None if there is no demand column
+    :param str coverage_type: The type of coverage, "binary" or "partial"
+    :return: The positional indices of the demand rows, the supply rows and the value of each pair
+    :rtype: tuple(~numpy.ndarray, ~numpy.ndarray, ~numpy.ndarray)
+    """
+    demand_idx, supply_idx, values = [], [], []
+    if coverage_type == "binary":
+        for i, geometry in enumerate(demand_geometries):
+            contains = np.asarray(supply_geometries.geom.contains(geometry), dtype=bool)
+            covered = np.flatnonzero(contains)
+            demand_idx.append(np.full(len(covered), i))
+            supply_idx.append(covered)
+            values.append(contains[covered])
+        dtype = bool
+    else:
+        # Only supply locations whose extent overlaps the extent of the demand location can cover part of it
+        supply_extents = np.array(
+            [supply_geometry.extent for supply_geometry in supply_geometries],
+            dtype=float,
+        ).reshape(-1, 4)
+        for i, geometry in enumerate(demand_geometries):
+            xmin, ymin, xmax, ymax = geometry.extent
+            candidates = np.flatnonzero(
+                (supply_extents[:, 0] < xmax)
+                & (supply_extents[:, 2] > xmin)
+                & (supply_extents[:, 1] < ymax)
+                & (supply_extents[:, 3] > ymin)
+            )
+            partial_coverage = []
+            demand_area = geometry.area
+            # Cannot vectorize this because if the intersection returns an empty polygon with rings
+            # The conversion to shapely fails when trying to get the area
+            for j in candidates.tolist():
+                intersection = supply_geometries.iloc[j].intersect(geometry)
+                area = intersection.area if not intersection.is_empty else 0
+                partial_coverage.append((area / demand_area) * demand[i])
+            partial_coverage = np.asarray(partial_coverage, dtype=float)
+            covered = np.flatnonzero(partial_coverage)
+            demand_idx.append(np.full(len(covered), i))
+            supply_idx.append(candidates[covered])
+            values.append(partial_coverage[covered])
+        dtype = float
+    return Coverage._concatenate_pairs(demand_idx, supply_idx, values, dtype)
+
+
+def _init_spatially_enabled_worker(supply_geometries):
+    _worker_state["supply"] = supply_geometries
+
+
+def _spatially_enabled_chunk_pairs(demand_geometries, demand, coverage_type):
+    return _spatially_enabled_pairs(
+        demand_geometries.reset_index(drop=True),
+        _worker_state["supply"],
+        demand,
+        coverage_type,
+    )
+
+
+# The mean radius of the earth in meters
+_earth_radius = 6371008.8
+
+
+def _point_coordinates(df, x_col, y_col):
+    """
+    Gets the coordinates of the points of a dataframe as an array of (x, y) rows, from the coordinate columns or from
+    the geometry column of a GeoDataFrame.
+    """
+    if x_col is not None:
+        return df[[x_col, y_col]].to_numpy(dtype=float)
+    geometry = df.geometry
+    return np.column_stack([geometry.x.to_numpy(), geometry.y.to_numpy()])
+
+
+def _radius_pairs(demand_xy, supply_xy, radius, metric):
+    """
+    Finds the (demand, supply) pairs that are at most the radius apart using KD-trees.
+
+    :param ~numpy.ndarray demand_xy: The (x, y) coordinates of the demand locations
+    :param ~numpy.ndarray supply_xy: The (x, y) coordinates of the supply locations
+    :param float radius: The largest distance between a pair
+    :param str metric: "euclidean" or "haversine". Haversine coordinates are longitude/latitude in degrees and the
+                       radius is in meters.
+    :return: The positional indices of the demand and supply locations of each pair and their distance, ordered by
+             demand location
+    :rtype: tuple(~numpy.ndarray, ~numpy.ndarray, ~numpy.ndarray)
+    """
+    import scipy.spatial
+
+    if metric == "haversine":
+        # Points on the unit sphere are within the great-circle distance d when their chord is within 2*sin(d/2R)
+        demand_xy = _unit_vectors(demand_xy)
+        supply_xy = _unit_vectors(supply_xy)
+        radius = 2 * np.sin(min(radius / _earth_radius, np.pi) / 2)
+    pairs = scipy.spatial.cKDTree(demand_xy).sparse_distance_matrix(
+        scipy.spatial.cKDTree(supply_xy), radius, output_type="ndarray"
+    )
+    pairs.sort(order=["i", "j"])
+    distance = pairs["v"]
+    if metric == "haversine":
+        distance = 2 * _earth_radius * np.arcsin(np.clip(distance / 2, 0, 1))
+    return pairs["i"], pairs["j"], distance
+
+
+def _unit_vectors(lon_lat):
+    lon, lat = np.radians(lon_lat[:, 0]), np.radians(lon_lat[:, 1])
+    return np.column_stack(
+        [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)]
+    )
+
+
+class _IdPositions:
+    """
+    Maps ids to their position. If the ids are not known in advance, new ids are added in the order they are found.
+    """
+
+    def __init__(self, ids, name):
+        self._fixed = ids is not None
+        self._name = name
+        self._ids = pd.Index(ids if ids is not None else [], name=name)
+
+    @property
+    def ids(self):
+        return self._ids
+
+    def get(self, values):
+        # Each chunk repeats the same ids many times, so only the unique ids are looked up
+        codes, uniques = pd.factorize(values)
+        positions = self._ids.get_indexer(uniques)
+        missing = positions < 0
+        if missing.any():
+            if self._fixed:
+                raise ValueError(f"Unknown ids in '{self._name}'")
+            new = pd.Index(uniques[missing], name=self._name)
+            self._ids = new if len(self._ids) == 0 else self._ids.append(new)
+            positions[missing] = np.arange(len(self._ids) - len(new), len(self._ids))
+        return positions[codes]
+
+
+def _od_chunks(source, columns, chunksize):
+    """
+    Reads an origin-destination table in chunks.
+
+    :param source: The path of a CSV or Parquet file, a dataframe or an iterable of dataframes
+    :param list[str] columns: The columns to read
+    :param int chunksize: The number of rows to read at a time from a file
+    :return: A generator of dataframes
+    :rtype: generator[~pandas.DataFrame]
+    """
+    if isinstance(source, pd.DataFrame):
+        table = source[columns]
+        for start in range(0, len(table), chunksize):
+            yield table.iloc[start : start + chunksize]
+    elif isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if path.lower().endswith((".parquet", ".pq")):
+            import pyarrow.parquet
+
+            parquet_file = pyarrow.parquet.ParquetFile(path)
+            for batch in parquet_file.iter_batches(
+                batch_size=chunksize, columns=columns
+            ):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+    else:
+        for chunk in source:
+            if not isinstance(chunk, pd.DataFrame):
+                raise TypeError(
+                    f"Expected 'Dataframe' type for each chunk, got '{type(chunk)}'"
+                )
+            yield chunk[columns]
+
+
+def _nested_pairs(
+    demand_geometries,
+    supply_geometries,
+    supply_positions,
+    thresholds,
+    demand,
+    coverage_type,
+):
+    """
+    Computes the covered (demand, supply) pairs of each threshold of nested service areas. The largest service area
+    of each supply location is joined with the demand locations using a spatial index, then each smaller threshold
+    only tests the pairs covered by the next larger service area of the same supply location.
+
+    :param ~geopandas.array.GeometryArray demand_geometries: The geometries of the demand locations
+    :param ~geopandas.array.GeometryArray supply_geometries: The service areas
+    :param ~numpy.ndarray supply_positions: The position of the supply location of each service area
+    :param ~numpy.ndarray thresholds: The threshold of each service area
+    :param ~numpy.ndarray demand: The amount of demand at each location, None if there is no demand column
+    :param str coverage_type: The type of coverage, "binary" or "partial"
+    :return: The positional indices of the demand rows, the supply locations and the value of each pair, keyed by
+             threshold
+    :rtype: dict
+    """
+    import geopandas
+
+    n_supply = supply_positions.max() + 1 if len(supply_positions) else 0
+    order = np.argsort(thresholds, kind="stable")[::-1]
+    layers = {}
+    demand_idx = supply_idx = None
+    for threshold in pd.unique(thresholds[order]):
+        rows = np.flatnonzero(thresholds == threshold)
+        # The service area of each supply location at this threshold, missing if it has none
+        area_rows = np.full(n_supply, -1)
+        area_rows[supply_positions[rows]] = rows
+        if demand_idx is None:
+            # The largest service area of each supply location is the first one found in descending order
+            largest = np.full(n_supply, -1)
+            for k in order[::-1]:
+                largest[supply_positions[k]] = k
+            candidates = largest[largest >= 0]
+            predicate = "within" if coverage_type == "binary" else "intersects"
+            demand_idx, candidate_idx = geopandas.GeoSeries(
+                supply_geometries[candidates]
+            ).sindex.query(demand_geometries, predicate=predicate)
+            supply_idx = supply_positions[candidates[candidate_idx]]
+        # Supply locations without a service area at this threshold keep their pairs for the next smaller one
+        present = area_rows[supply_idx] >= 0
+        tested_demand_idx, tested_supply_idx = demand_idx[present], supply_idx[present]
+        areas = supply_geometries[area_rows[tested_supply_idx]]
+        if coverage_type == "binary":
+            covered = np.asarray(demand_geometries[tested_demand_idx].within(areas))
+            values = np.ones(int(covered.sum()), dtype=bool)
+        else:
+            intersection_area = (
+                demand_geometries[tested_demand_idx].intersection(areas).area
+            )
+            partial_coverage = (
+                intersection_area
+                / demand_geometries.area[tested_demand_idx]
+                * demand[tested_demand_idx]
+            ).astype(float)
+            covered = partial_coverage != 0
+            values = partial_coverage[covered]
+        layers[threshold] = (
+            tested_demand_idx[covered],
+            tested_supply_idx[covered],
+            values,
+        )
+        keep = ~present
+        keep[present] = covered
+        demand_idx, supply_idx = demand_idx[keep], supply_idx[keep]
+    return layers
+
+
+def _join_ids(ids, other_ids, how):
+    """
+    Joins two sets of ids, keeping the order of the first set. An outer join appends the ids that are only in the other
+    set, an inner join keeps the ids that are in both and a left join keeps the first set.
+    """
+    if how == "outer":
+        return ids.append(other_ids[~other_ids.isin(ids)])
+    if how == "inner":
+        return ids[ids.isin(other_ids)]
+    return ids
@@ -0,0 +1,858 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from .coverage import Coverage
+
+
+class MatrixModel:
+    _delineator = "$"
+    _illegal_chars = "-+[] ->/"
+    _trans = str.maketrans(_illegal_chars, "_" * len(_illegal_chars))
+
+    def __init__(
+        self,
+        name,
+        sense,
+        objective,
+        matrix,
+        row_lower,
+        row_upper,
+        col_names,
+        row_names,
+        col_lower=None,
+        col_upper=None,
+        integer=None,
+    ):
+        """
+        A linear programming problem stored as arrays rather than as PuLP expression objects. The constraint matrix
+        of the covering problems is built directly from the coverage matrices, so only one entry is stored per
+        covered (demand, supply) pair. This is not intended to be created on it's own but rather from one of the
+        factory methods :meth:`~allagash.model.MatrixModel.lscp`, :meth:`~allagash.model.MatrixModel.mclp` or
+        :meth:`~allagash.model.MatrixModel.bclp`.
+
+        .. code-block:: python
+
+            MatrixModel.mclp(coverage, max_supply={coverage: 5}).write_mps("mclp.mps")
+
+        :param str name: The name of the problem
+        :param str sense: The sense of the objective. Options are "minimize" and "maximize".
+        :param ~numpy.ndarray objective: The objective coefficient of each variable (column)
+        :param ~scipy.sparse.spmatrix matrix: The constraint matrix of constraints (rows) and variables (columns)
+        :param ~numpy.ndarray row_lower: The lower bound of each constraint, -inf if there is none
+        :param ~numpy.ndarray row_upper: The upper bound of each constraint, inf if there is none
+        :param list[str] col_names: The name of each variable
+        :param list[str] row_names: The name of each constraint
+        :param ~numpy.ndarray col_lower: (optional) The lower bound of each variable. If not supplied, 0 is used.
+        :param ~numpy.ndarray col_upper: (optional) The upper bound of each variable. If not supplied, 1 is used.
+        :param ~numpy.ndarray integer: (optional) Whether each variable is an integer. If not supplied, all variables
+                                       are integers.
+        """
+        self._validate(sense, matrix, objective, row_lower, row_upper)
+        n_rows, n_cols = matrix.shape
+        self._name = name
+        self._sense = sense.lower()
+        self._objective = np.asarray(objective, dtype=float)
+        self._matrix = scipy.sparse.csr_matrix(matrix, dtype=float)
+        self._row_lower = np.asarray(row_lower, dtype=float)
+        self._row_upper = np.asarray(row_upper, dtype=float)
+        self._col_names = list(col_names)
+        self._row_names = list(row_names)
+        self._col_lower = (
+            np.zeros(n_cols) if col_lower is None else np.asarray(col_lower, float)
+        )
+        self._col_upper = (
+            np.ones(n_cols) if col_upper is None else np.asarray(col_upper, float)
+        )
+        self._integer = (
+            np.ones(n_cols, dtype=bool)
+            if integer is None
+            else np.asarray(integer, bool)
+        )
+        self._demand_columns = {}
+        self._supply_columns = {}
+        self._assignment_columns = {}
+
+    @staticmethod
+    def _validate(sense, matrix, objective, row_lower, row_upper):
+        if not isinstance(sense, str):
+            raise TypeError(f"Expected 'str' type for sense, got '{type(sense)}'")
+        if sense.lower() not in ("minimize", "maximize"):
+            raise ValueError(f"Invalid sense '{sense}'")
+        if not scipy.sparse.issparse(matrix):
+            raise TypeError(
+                f"Expected 'spmatrix' type for matrix, got '{type(matrix)}'"
+            )
+        if len(objective) != matrix.shape[1]:
+            raise ValueError(
+                f"Expected {matrix.shape[1]} objective coefficients, got {len(objective)}"
+            )
+        if len(row_lower) != matrix.shape[0] or len(row_upper) != matrix.shape[0]:
+            raise ValueError(f"Expected {matrix.shape[0]} row bounds")
+
+    @property
+    def name(self):
+        """
+
+        :return: The name of the problem
+        :rtype: str
+        """
+        return self._name
+
+    @property
+    def sense(self):
+        """
+
+        :return: The sense of the objective, "minimize" or "maximize"
+        :rtype: str
+        """
+        return self._sense
+
+    @property
+    def objective(self):
+        """
+
+        :return: The objective coefficient of each variable
+        :rtype: ~numpy.ndarray
+        """
+        return self._objective
+
+    @property
+    def matrix(self):
+        """
+
+        :return: The constraint matrix of constraints (rows) and variables (columns)
+        :rtype: ~scipy.sparse.csr_matrix
+        """
+        return self._matrix
+
+    @property
+    def row_lower(self):
+        """
+
+        :return: The lower bound of each constraint
+        :rtype: ~numpy.ndarray
+        """
+        return self._row_lower
+
+    @property
+    def row_upper(self):
+        """
+
+        :return: The upper bound of each constraint
+        :rtype: ~numpy.ndarray
+        """
+        return self._row_upper
+
+    @property
+    def col_lower(self):
+        """
+
+        :return: The lower bound of each variable
+        :rtype: ~numpy.ndarray
+        """
+        return self._col_lower
+
+    @property
+    def col_upper(self):
+        """
+
+        :return: The upper bound of each variable
+        :rtype: ~numpy.ndarray
+        """
+        return self._col_upper
+
+    @property
+    def integer(self):
+        """
+
+        :return: Whether each variable is an integer
+        :rtype: ~numpy.ndarray
+        """
+        return self._integer
+
+    @property
+    def col_names(self):
+        """
+
+        :return: The name of each variable
+        :rtype: list[str]
+        """
+        return self._col_names
+
+    @property
+    def row_names(self):
+        """
+
+        :return: The name of each constraint
+        :rtype: list[str]
+        """
+        return self._row_names
+
+    @property
+    def demand_columns(self):
+        """
+
+        :return: The ids of the demand locations and the slice of their variables (columns), keyed by the demand name.
+                 Empty if the model was not created from coverages or has no demand variables.
+        :rtype: dict[str,tuple(~pandas.Index,slice)]
+        """
+        return self._demand_columns
+
+    @property
+    def supply_columns(self):
+        """
+
+        :return: The ids of the supply locations and the slice of their variables (columns), keyed by the supply name.
+                 Empty if the model was not created from coverages.
+        :rtype: dict[str,tuple(~pandas.Index,slice)]
+        """
+        return self._supply_columns
+
+    @property
+    def assignment_columns(self):
+        """
+
+        :return: The demand and supply ids of each assignment variable (column) of a capacitated, p-median or p-center
+                 model and the slice of the variables, keyed by the supply name. Empty for the other models.
+        :rtype: dict[str,tuple(~pandas.Index,~pandas.Index,slice)]
+        """
+        return self._assignment_columns
+
+    @classmethod
+    def lscp(cls, coverages):
+        """
+        Creates a new :class:`~allagash.model.MatrixModel` representing the Location Covering Set Problem
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :return: The created model
+        :rtype: ~allagash.model.MatrixModel
+        """
+        return cls._from_coverages("LSCP", coverages)
+
+    @classmethod
+    def mclp(cls, coverages, max_supply):
+        """
+        Creates a new :class:`~allagash.model.MatrixModel` representing the Maximum Covering Location Problem
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow
+        :return: The created model
+        :rtype: ~allagash.model.MatrixModel
+        """
+        return cls._from_coverages("MCLP", coverages, max_supply)
+
+    @classmethod
+    def bclp(cls, coverages, max_supply):
+        """
+        Creates a new :class:`~allagash.model.MatrixModel` representing the Backup Covering Location Problem
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow
+        :return: The created model
+        :rtype: ~allagash.model.MatrixModel
+        """
+        return cls._from_coverages("BCLP", coverages, max_supply)
+
+    @classmethod
+    def cmclp(cls, coverages, max_supply, capacity):
+        """
+        Creates a new :class:`~allagash.model.MatrixModel` representing the Capacitated Maximum Covering Location
+        Problem, see :meth:`~allagash.problem.Problem.cmclp`
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow
+        :param dict[~allagash.coverage.Coverage,list] capacity: The amount of demand each supply location can serve
+        :return: The created model
+        :rtype: ~allagash.model.MatrixModel
+        """
+        return cls._from_capacitated("CMCLP", coverages, capacity, max_supply)
+
+    @classmethod
+    def clscp(cls, coverages, capacity):
+        """
+        Creates a new :class:`~allagash.model.MatrixModel` representing the Capacitated Location Set Covering Problem,
+        see :meth:`~allagash.problem.Problem.clscp`
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :param dict[~allagash.coverage.Coverage,list] capacity: The amount of demand each supply location can serve
+        :return: The created model
+        :rtype: ~allagash.model.MatrixModel
+        """
+        return cls._from_capacitated("CLSCP", coverages, capacity)
+
+    @classmethod
+    def pmedian(cls, costs, p):
+        """
+        Creates a new :class:`~allagash.model.MatrixModel` representing the p-median problem, see
+        :meth:`~allagash.problem.Problem.pmedian`
+
+        :param ~allagash.costs.CostMatrix costs: The costs of the (demand, supply) pairs that can be assigned
+        :param int p: The number of supply locations to select
+        :return: The created model
+        :rtype: ~allagash.model.MatrixModel
+        """
+        return cls._from_costs("PMEDIAN", costs, p)
+
+    @classmethod
+    def pcenter(cls, costs, p):
+        """
+        Creates a new :class:`~allagash.model.MatrixModel` representing the p-center problem, see
+        :meth:`~allagash.problem.Problem.pcenter`
+
+        :param ~allagash.costs.CostMatrix costs: The costs of the (demand, supply) pairs that can be assigned
+        :param int p: The number of supply locations to select
+        :return: The created model
+        :rtype: ~allagash.model.MatrixModel
+        """
+        return cls._from_costs("PCENTER", costs, p)
+
+    @classmethod
+    def _from_coverages(cls, name, coverages, max_supply=None):  # noqa: C901
+        # The variables and constraints match the ones created by the Problem generators. LSCP only uses the supply
+        # variables, MCLP and BCLP add a variable for each demand location and a constraint limiting the supply.
+        if isinstance(coverages, Coverage):
+            coverages = [coverages]
+        with_demand = name != "LSCP"
+        demand_ids = cls._ids_by_name(coverages, "demand")
+        supply_ids = cls._ids_by_name(coverages, "supply")
+
+        # Each demand location has one constraint and, for MCLP/BCLP, one variable in the same position
+        demand_offsets = {}
+        offset = 0
+        for demand_name, ids in demand_ids.items():
+            demand_offsets[demand_name] = offset
+            offset += len(ids)
+        n_demand = offset
+        supply_offsets = {}
+        offset = n_demand if with_demand else 0
+        for supply_name, ids in supply_ids.items():
+            supply_offsets[supply_name] = offset
+            offset += len(ids)
+        n_cols = offset
+        n_rows = n_demand + (len(coverages) if with_demand else 0)
+
+        rows, cols, data = [], [], []
+        for c in coverages:
+            demand_positions = demand_offsets[c.demand_name] + demand_ids[
+                c.demand_name
+            ].get_indexer(c.demand_ids)
+            supply_positions = supply_offsets[c.supply_name] + supply_ids[
+                c.supply_name
+            ].get_indexer(c.supply_ids)
+            covered_rows, covered_cols = c.matrix.nonzero()
+            rows.append(demand_positions[covered_rows])
+            cols.append(supply_positions[covered_cols])
+            data.append(np.ones(len(covered_rows)))
+
+        objective = np.zeros(n_cols)
+        row_lower = np.zeros(n_rows)
+        row_upper = np.full(n_rows, np.inf)
+        col_names = []
+        row_names = []
+        if with_demand:
+            # -y_i + sum(x_j) >= 0 for MCLP, -y_i + sum(x_j) >= 1 for BCLP
+            rows.append(np.arange(n_demand))
+            cols.append(np.arange(n_demand))
+            data.append(np.full(n_demand, -1.0))
+            row_lower[:n_demand] = 1 if name == "BCLP" else 0
+            # The first coverage a demand location is found in supplies the demand value
+            assigned = np.zeros(n_cols, dtype=bool)
+            for c in coverages:
+                positions = demand_offsets[c.demand_name] + demand_ids[
+                    c.demand_name
+                ].get_indexer(c.demand_ids)
+                unset = ~assigned[positions]
+                objective[positions[unset]] = c.demand_values[unset]
+                assigned[positions[unset]] = True
+            for demand_name, ids in demand_ids.items():
+                col_names.extend(f"{demand_name}{cls._delineator}{i}" for i in ids)
+                row_names.extend(f"D{i}" for i in ids)
+            for k, c in enumerate(coverages):
+                positions = supply_offsets[c.supply_name] + supply_ids[
+                    c.supply_name
+                ].get_indexer(c.supply_ids)
+                rows.append(np.full(len(positions), n_demand + k))
+                cols.append(positions)
+                data.append(np.ones(len(positions)))
+                row_lower[n_demand + k] = -np.inf
+                row_upper[n_demand + k] = max_supply[c]
+                row_names.append(f"Num{cls._delineator}{c.supply_name}")
+        else:
+            row_lower[:] = 1
+            objective[:] = 1
+            for demand_name, ids in demand_ids.items():
+                row_names.extend(f"D{demand_name}{i}" for i in ids)
+        for supply_name, ids in supply_ids.items():
+            col_names.extend(f"{supply_name}{cls._delineator}{i}" for i in ids)
+
+        # Duplicate entries are summed, the same as adding a variable to a pulp expression twice
+        matrix = scipy.sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_rows, n_cols),
+        )
+        model = MatrixModel(
+            name,
+            "minimize" if name == "LSCP" else "maximize",
+            objective,
+            matrix,
+            row_lower,
+            row_upper,
+            [n.translate(cls._trans) for n in col_names],
+            [n.translate(cls._trans) for n in row_names],
+        )
+        if with_demand:
+            model._demand_columns = {
+                demand_name: (ids, slice(offset, offset + len(ids)))
+                for (demand_name, ids), offset in zip(
+                    demand_ids.items(), demand_offsets.values()
+                )
+            }
+        model._supply_columns = {
+            supply_name: (ids, slice(offset, offset + len(ids)))
+            for (supply_name, ids), offset in zip(
+                supply_ids.items(), supply_offsets.values()
+            )
+        }
+        return model
+
+    @classmethod
+    def _from_capacitated(  # noqa: C901
+        cls, name, coverages, capacity, max_supply=None
+    ):
+        # The variables are the demand variables (CMCLP only), the supply variables and one continuous assignment
+        # variable for each covered (demand, supply) pair, so the model grows with the number of covered pairs. The
+        # share of the demand of a location assigned to each supply location sums to its demand variable (CMCLP) or
+        # to 1 (CLSCP), and the demand assigned to a supply location is at most its capacity if it is selected.
+        if isinstance(coverages, Coverage):
+            coverages = [coverages]
+        with_demand = name == "CMCLP"
+        demand_ids = cls._ids_by_name(coverages, "demand")
+        supply_ids = cls._ids_by_name(coverages, "supply")
+
+        demand_offsets = {}
+        offset = 0
+        for demand_name, ids in demand_ids.items():
+            demand_offsets[demand_name] = offset
+            offset += len(ids)
+        n_demand = offset
+        supply_offsets = {}
+        supply_start = offset = n_demand if with_demand else 0
+        for supply_name, ids in supply_ids.items():
+            supply_offsets[supply_name] = offset
+            offset += len(ids)
+        n_supply = offset - supply_start
+
+        # The first coverage a location is found in supplies its demand and capacity
+        weights = np.zeros(n_demand)
+        capacities = np.zeros(n_supply)
+        weight_set = np.zeros(n_demand, dtype=bool)
+        capacity_set = np.zeros(n_supply, dtype=bool)
+        pair_demand, pair_supply = [], []
+        for c in coverages:
+            demand_positions = demand_offsets[c.demand_name] + demand_ids[
+                c.demand_name
+            ].get_indexer(c.demand_ids)
+            supply_positions = (
+                supply_offsets[c.supply_name]
+                - supply_start
+                + supply_ids[c.supply_name].get_indexer(c.supply_ids)
+            )
+            unset = ~weight_set[demand_positions]
+            weights[demand_positions[unset]] = c.demand_values[unset]
+            weight_set[demand_positions] = True
+            unset = ~capacity_set[supply_positions]
+            capacities[supply_positions[unset]] = cls._capacity_values(c, capacity[c])[
+                unset
+            ]
+            capacity_set[supply_positions] = True
+            covered_rows, covered_cols = c.matrix.nonzero()
+            pair_demand.append(demand_positions[covered_rows])
+            pair_supply.append(supply_positions[covered_cols])
+
+        # A pair covered by more than one coverage has one assignment variable. The pairs are ordered by supply
+        # location, so the assignments of each supply name are one block of columns.
+        keys = np.unique(
+            np.concatenate(pair_supply).astype(np.int64) * max(n_demand, 1)
+            + np.concatenate(pair_demand)
+        )
+        pair_supply = keys // max(n_demand, 1)
+        pair_demand = keys % max(n_demand, 1)
+        n_pairs = len(keys)
+        assignment_start = supply_start + n_supply
+        assignment_cols = assignment_start + np.arange(n_pairs)
+        n_cols = assignment_start + n_pairs
+
+        # Demand rows, capacity rows, then rows linking the assignments of locations without demand to the supply
+        # variable (they use no capacity), then the maximum number of supply locations of each coverage (CMCLP)
+        unweighted = np.flatnonzero(weights[pair_demand] == 0)
+        link_start = n_demand + n_supply
+        budget_start = link_start + len(unweighted)
+        n_rows = budget_start + (len(coverages) if with_demand else 0)
+        weighted = weights[pair_demand] != 0
+        rows = [
+            pair_demand,
+            n_demand + pair_supply[weighted],
+            n_demand + np.arange(n_supply),
+            link_start + np.arange(len(unweighted)),
+            link_start + np.arange(len(unweighted)),
+        ]
+        cols = [
+            assignment_cols,
+            assignment_cols[weighted],
+            supply_start + np.arange(n_supply),
+            assignment_cols[unweighted],
+            supply_start + pair_supply[unweighted],
+        ]
+        data = [
+            np.ones(n_pairs),
+            weights[pair_demand[weighted]],
+            -capacities,
+            np.ones(len(unweighted)),
+            np.full(len(unweighted), -1.0),
+        ]
+        row_lower = np.full(n_rows, -np.inf)
+        row_upper = np.zeros(n_rows)
+        row_lower[:n_demand] = 0 if with_demand else 1
+        row_upper[:n_demand] = 0 if with_demand else 1
+        objective = np.zeros(n_cols)
+        if with_demand:
+            rows.append(np.arange(n_demand))
+            cols.append(np.arange(n_demand))
+            data.append(np.full(n_demand, -1.0))
+            objective[:n_demand] = weights
+            for k, c in enumerate(coverages):
+                positions = supply_offsets[c.supply_name] + supply_ids[
+                    c.supply_name
+                ].get_indexer(c.supply_ids)
+                rows.append(np.full(len(positions), budget_start + k))
+                cols.append(positions)
+                data.append(np.ones(len(positions)))
+                row_upper[budget_start + k] = max_supply[c]
+        else:
+            objective[supply_start:assignment_start] = 1
+
+        demand_labels = [
+            f"{demand_name}{cls._delineator}{i}"
+            for demand_name, ids in demand_ids.items()
+            for i in ids
+        ]
+        supply_labels = [
+            f"{supply_name}{cls._delineator}{i}"
+            for supply_name, ids in supply_ids.items()
+            for i in ids
+        ]
+        assignment_labels = [
+            f"{supply_labels[j]}{cls._delineator}{demand_labels[i]}"
+            for j, i in zip(pair_supply.tolist(), pair_demand.tolist())
+        ]
+        col_names = (
+            (demand_labels if with_demand else []) + supply_labels + assignment_labels
+        )
+        row_names = (
+            [
+                f"D{demand_name}{i}"
+                for demand_name, ids in demand_ids.items()
+                for i in ids
+            ]
+            + [f"Cap{cls._delineator}{label}" for label in supply_labels]
+            + [f"Link{cls._delineator}{assignment_labels[k]}" for k in unweighted]
+            + (
+                [f"Num{cls._delineator}{c.supply_name}" for c in coverages]
+                if with_demand
+                else []
+            )
+        )
+
+        matrix = scipy.sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_rows, n_cols),
+        )
+        integer = np.zeros(n_cols, dtype=bool)
+        integer[:assignment_start] = True
+        model = MatrixModel(
+            name,
+            "maximize" if with_demand else "minimize",
+            objective,
+            matrix,
+            row_lower,
+            row_upper,
+            [n.translate(cls._trans) for n in col_names],
+            [n.translate(cls._trans) for n in row_names],
+            integer=integer,
+        )
+        if with_demand:
+            model._demand_columns = {
+                demand_name: (ids, slice(offset, offset + len(ids)))
+                for (demand_name, ids), offset in zip(
+                    demand_ids.items(), demand_offsets.values()
+                )
+            }
+        model._supply_columns = {
+            supply_name: (ids, slice(offset, offset + len(ids)))
+            for (supply_name, ids), offset in zip(
+                supply_ids.items(), supply_offsets.values()
+            )
+        }
+        demand_id_list = list(demand_ids.values())
+        all_demand_ids = demand_id_list[0].append(demand_id_list[1:])
+        for supply_name, ids in supply_ids.items():
+            local = supply_offsets[supply_name] - supply_start
+            start, end = np.searchsorted(pair_supply, [local, local + len(ids)])
+            model._assignment_columns[supply_name] = (
+                all_demand_ids[pair_demand[start:end]],
+                ids[pair_supply[start:end] - local],
+                slice(assignment_start + start, assignment_start + end),
+            )
+        return model
+
+    @classmethod
+    def _from_costs(cls, name, costs, p):
+        # The variables are the supply variables and one continuous assignment variable for each kept (demand, supply)
+        # pair of the cost matrix, followed by the largest cost for the p-center. Each demand location is assigned to
+        # selected supply locations only, so the model grows with the number of kept pairs rather than demand x supply.
+        n_demand, n_supply = costs.matrix.shape
+        # The pairs are ordered by supply location, like the assignments of the capacitated models
+        pairs = costs.matrix.tocsc()
+        pair_supply = np.repeat(np.arange(n_supply), np.diff(pairs.indptr))
+        pair_demand = pairs.indices.astype(np.int64)
+        pair_costs = pairs.data
+        n_pairs = len(pair_costs)
+        with_center = name == "PCENTER"
+        assignment_cols = n_supply + np.arange(n_pairs)
+        n_cols = n_supply + n_pairs + (1 if with_center else 0)
+
+        # Demand rows, rows linking each assignment to its supply variable, the number of supply locations, then the
+        # rows bounding the cost of each demand location by the largest cost (p-center)
+        link_start = n_demand
+        num_row = link_start + n_pairs
+        n_rows = num_row + 1 + (n_demand if with_center else 0)
+        rows = [
+            pair_demand,
+            link_start + np.arange(n_pairs),
+            link_start + np.arange(n_pairs),
+            np.full(n_supply, num_row),
+        ]
+        cols = [
+            assignment_cols,
+            assignment_cols,
+            pair_supply,
+            np.arange(n_supply),
+        ]
+        data = [
+            np.ones(n_pairs),
+            np.ones(n_pairs),
+            np.full(n_pairs, -1.0),
+            np.ones(n_supply),
+        ]
+        row_lower = np.full(n_rows, -np.inf)
+        row_upper = np.zeros(n_rows)
+        row_lower[:n_demand] = 1
+        row_upper[:n_demand] = 1
+        row_lower[num_row] = p
+        row_upper[num_row] = p
+        objective = np.zeros(n_cols)
+        if with_center:
+            rows += [num_row + 1 + pair_demand, num_row + 1 + np.arange(n_demand)]
+            cols += [assignment_cols, np.full(n_demand, n_cols - 1)]
+            data += [pair_costs, np.full(n_demand, -1.0)]
+            objective[-1] = 1
+        else:
+            weights = (
+                np.ones(n_demand)
+                if costs.demand_values is None
+                else np.asarray(costs.demand_values, dtype=float)
+            )
+            objective[assignment_cols] = weights[pair_demand] * pair_costs
+
+        demand_labels = [
+            f"{costs.demand_name}{cls._delineator}{i}" for i in costs.demand_ids
+        ]
+        supply_labels = [
+            f"{costs.supply_name}{cls._delineator}{i}" for i in costs.supply_ids
+        ]
+        assignment_labels = [
+            f"{supply_labels[j]}{cls._delineator}{demand_labels[i]}"
+            for j, i in zip(pair_supply.tolist(), pair_demand.tolist())
+        ]
+        col_names = (
+            supply_labels + assignment_labels + (["MaxCost"] if with_center else [])
+        )
+        row_names = (
+            [f"D{costs.demand_name}{i}" for i in costs.demand_ids]
+            + [f"Link{cls._delineator}{label}" for label in assignment_labels]
+            + [f"Num{cls._delineator}{costs.supply_name}"]
+            + (
+                [f"Max{cls._delineator}{label}" for label in demand_labels]
+                if with_center
+                else []
+            )
+        )
+
+        matrix = scipy.sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_rows, n_cols),
+        )
+        col_upper = np.ones(n_cols)
+        integer = np.zeros(n_cols, dtype=bool)
+        integer[:n_supply] = True
+        if with_center:
+            col_upper[-1] = np.inf
+        model = MatrixModel(
+            name,
+            "minimize",
+            objective,
+            matrix,
+            row_lower,
+            row_upper,
+            [n.translate(cls._trans) for n in col_names],
+            [n.translate(cls._trans) for n in row_names],
+            col_upper=col_upper,
+            integer=integer,
+        )
+        model._supply_columns = {
+            costs.supply_name: (costs.supply_ids, slice(0, n_supply))
+        }
+        model._assignment_columns[costs.supply_name] = (
+            costs.demand_ids[pair_demand],
+            costs.supply_ids[pair_supply],
+            slice(n_supply, n_supply + n_pairs),
+        )
+        return model
+
+    @staticmethod
+    def _capacity_values(coverage, values):
+        """
+        Gets the capacity of each supply location of a coverage, in the order of its supply ids. A series is matched
+        to the supply ids by its index, other values by position.
+        """
+        if isinstance(values, pd.Series):
+            values = values.reindex(coverage.supply_ids)
+            if values.isna().any():
+                raise ValueError(
+                    f"Missing capacity for supply named '{coverage.supply_name}'"
+                )
+        values = np.asarray(values, dtype=float)
+        if values.shape != (len(coverage.supply_ids),):
+            raise ValueError(
+                f"Expected {len(coverage.supply_ids)} capacity values for supply named '{coverage.supply_name}', "
+                f"got {values.size}"
+            )
+        if not np.all(np.isfinite(values)) or np.any(values < 0):
+            raise ValueError(
+                f"Invalid capacity for supply named '{coverage.supply_name}'"
+            )
+        return values
+
+    @staticmethod
+    def _ids_by_name(coverages, kind):
+        """
+        Collects the ids of the demand or supply locations of each demand or supply name, in the order they are first
+        found in the coverages. Each id has one variable.
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to collect the ids from
+        :param str kind: "demand" or "supply"
+        :return: The ids of the locations, keyed by the demand or supply name
+        :rtype: dict[str,~pandas.Index]
+        """
+        ids = {}
+        for c in coverages:
+            name = getattr(c, f"{kind}_name")
+            coverage_ids = getattr(c, f"{kind}_ids")
+            if name in ids:
+                ids[name] = ids[name].append(coverage_ids).unique()
+            else:
+                ids[name] = coverage_ids.unique()
+        return ids
+
+    def write_mps(self, path, objsense=False):
+        """
+        Writes the model to a free format MPS file that can be read by most solvers. The file is written straight from
+        the arrays of the model without creating any PuLP objects.
+
+        Not all solvers read the OBJSENSE section, so by default maximization problems are written the same way PuLP
+        writes them: the objective coefficients are negated and the problem is minimized.
+
+        :param str path: The path of the file to write
+        :param bool objsense: (optional) Whether to write an OBJSENSE section for maximization problems instead of
+                              negating the objective. If not supplied, the default is False.
+        :return: None
+        """
+        matrix = self._matrix.tocsc()
+        matrix.sort_indices()
+        objective = self._objective
+        if self._sense == "maximize" and not objsense:
+            objective = -objective
+        with open(path, "w") as f:
+            f.write(f"*SENSE:{self._sense.capitalize()}\n")
+            f.write(f"NAME {self._name}\n")
+            if self._sense == "maximize" and objsense:
+                f.write("OBJSENSE\n    MAX\n")
+            f.write("ROWS\n N  OBJ\n")
+            f.writelines(
+                f" {t}  {n}\n" for t, n in zip(self._row_types(), self._row_names)
+            )
+
+            f.write("COLUMNS\n")
+            is_integer = False
+            for j, name in enumerate(self._col_names):
+                if self._integer[j] != is_integer:
+                    is_integer = self._integer[j]
+                    marker = "'INTORG'" if is_integer else "'INTEND'"
+                    f.write(f"    MARKER  'MARKER'  {marker}\n")
+                start, end = matrix.indptr[j], matrix.indptr[j + 1]
+                if objective[j] != 0 or start == end:
+                    f.write(f"    {name}  OBJ  {objective[j]:.12g}\n")
+                f.writelines(
+                    f"    {name}  {self._row_names[i]}  {v:.12g}\n"
+                    for i, v in zip(
+                        matrix.indices[start:end].tolist(),
+                        matrix.data[start:end].tolist(),
+                    )
+                )
+            if is_integer:
+                f.write("    MARKER  'MARKER'  'INTEND'\n")
+
+            f.write("RHS\n")
+            rhs = np.where(
+                np.isfinite(self._row_lower), self._row_lower, self._row_upper
+            )
+            f.writelines(
+                f"    RHS  {self._row_names[i]}  {rhs[i]:.12g}\n"
+                for i in np.flatnonzero(rhs).tolist()
+            )
+            ranged = np.flatnonzero(
+                np.isfinite(self._row_lower)
+                & np.isfinite(self._row_upper)
+                & (self._row_lower != self._row_upper)
+            )
+            if len(ranged):
+                f.write("RANGES\n")
+                f.writelines(
+                    f"    RNG  {self._row_names[i]}  "
+                    f"{self._row_upper[i] - self._row_lower[i]:.12g}\n"
+                    for i in ranged.tolist()
+                )
+
+            f.write("BOUNDS\n")
+            for name, lower, upper in zip(
+                self._col_names, self._col_lower.tolist(), self._col_upper.tolist()
+            ):
+                if lower == upper:
+                    f.write(f" FX BND  {name}  {lower:.12g}\n")
+                    continue
+                if lower == -np.inf:
+                    f.write(f" MI BND  {name}\n")
+                elif lower != 0:
+                    f.write(f" LO BND  {name}  {lower:.12g}\n")
+                if upper != np.inf:
+                    f.write(f" UP BND  {name}  {upper:.12g}\n")
+            f.write("ENDATA\n")
+
+    def _row_types(self):
+        lower_finite = np.isfinite(self._row_lower)
+        upper_finite = np.isfinite(self._row_upper)
+        types = np.full(len(self._row_lower), "N")
+        types[lower_finite] = "G"
+        types[upper_finite & ~lower_finite] = "L"
+        types[lower_finite & upper_finite & (self._row_lower == self._row_upper)] = "E"
+        return types.tolist()
@@ -0,0 +1,303 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from .coverage import Coverage
+from .model import MatrixModel
+
+
+class Presolve:
+    # Markers for demand locations that have no representative in the reduced coverages
+    _covered_by_fixed = -1
+    _not_coverable = -2
+
+    def __init__(self, coverages, problem_type, max_supply=None):
+        """
+        Reduces the coverages of a problem before the model is generated. This is not intended to be created on it's own
+        but rather by passing presolve=True to one of the factory methods of :class:`~allagash.problem.Problem`.
+
+        The reductions are repeated until none of them apply:
+
+        * Supply locations covering a subset of the demand covered by another location with the same budget are
+          removed (LSCP and MCLP). Only one of a set of identical locations is kept.
+        * Supply locations that are the only location covering a demand location are selected, and the demand they
+          cover is removed (LSCP).
+        * Demand locations covered by the same supply locations are merged into one, summing their demand (MCLP and
+          BCLP).
+        * Demand locations that can not be covered are removed (MCLP).
+
+        The solution of the reduced problem is mapped back to the ids of the original coverages.
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to reduce
+        :param str problem_type: The type of problem. Options are "lscp", "mclp" and "bclp".
+        :param dict[~allagash.coverage.Coverage,int] max_supply: (optional) The maximum number of supply locations to
+                                                                 allow. Required for MCLP and BCLP.
+        """
+        if isinstance(coverages, Coverage):
+            coverages = [coverages]
+        self._problem_type = problem_type.lower()
+        if self._problem_type == "lscp":
+            model = MatrixModel.lscp(coverages)
+            n_demand = model.matrix.shape[0]
+            matrix = model.matrix
+            weights = np.ones(n_demand)
+        else:
+            model = getattr(MatrixModel, self._problem_type)(coverages, max_supply)
+            n_demand = sum(len(ids) for ids, _ in model.demand_columns.values())
+            matrix = model.matrix[:n_demand, n_demand:]
+            weights = model.objective[:n_demand]
+        self._demand_name = coverages[0].demand_name
+        self._demand_ids = MatrixModel._ids_by_name(coverages, "demand")[
+            self._demand_name
+        ]
+        self._supply_ids = MatrixModel._ids_by_name(coverages, "supply")
+        self._demand_col = next(
+            (c.demand_col for c in coverages if c.demand_col is not None), None
+        )
+
+        # The supply locations of each name are one block of columns
+        column_offset = n_demand if self._problem_type != "lscp" else 0
+        groups = np.zeros(matrix.shape[1], dtype=int)
+        self._blocks = {}
+        for k, (name, (_, block)) in enumerate(model.supply_columns.items()):
+            block = slice(block.start - column_offset, block.stop - column_offset)
+            groups[block] = k
+            self._blocks[name] = block
+        if self._problem_type == "lscp":
+            # Every supply location costs the same, so locations with different names can dominate each other
+            groups[:] = 0
+
+        self._reduce(
+            scipy.sparse.csr_matrix(matrix != 0, dtype=np.int64), weights, groups
+        )
+        self._coverages = {
+            name: self._reduced_coverage(name) for name in self._supply_ids
+        }
+        self._max_supply = {}
+        if max_supply is not None:
+            self.set_max_supply(max_supply)
+
+    def _reduce(self, matrix, weights, groups):
+        n_rows, n_cols = matrix.shape
+        rows = np.ones(n_rows, dtype=bool)
+        columns = np.ones(n_cols, dtype=bool)
+        fixed = np.zeros(n_cols, dtype=bool)
+        # The demand location each demand location was merged into, or one of the markers
+        row_map = np.arange(n_rows)
+        weights = np.asarray(weights, dtype=float).copy()
+
+        changed = True
+        while changed:
+            changed = False
+            if self._problem_type in ("lscp", "mclp"):
+                dominated = self._dominated_columns(
+                    matrix[rows][:, columns], groups[columns]
+                )
+                if len(dominated):
+                    columns[np.flatnonzero(columns)[dominated]] = False
+                    changed = True
+            if self._problem_type == "lscp":
+                sub = matrix[rows][:, columns]
+                singletons = np.flatnonzero(np.diff(sub.indptr) == 1)
+                forced = np.unique(sub.indices[sub.indptr[singletons]])
+                if len(forced):
+                    forced_columns = np.flatnonzero(columns)[forced]
+                    fixed[forced_columns] = True
+                    columns[forced_columns] = False
+                    covered = np.flatnonzero(rows)[
+                        matrix[rows][:, forced_columns].getnnz(axis=1) > 0
+                    ]
+                    rows[covered] = False
+                    row_map[np.isin(row_map, covered)] = self._covered_by_fixed
+                    changed = True
+            if self._problem_type == "mclp":
+                empty = np.flatnonzero(rows)[
+                    matrix[rows][:, columns].getnnz(axis=1) == 0
+                ]
+                if len(empty):
+                    rows[empty] = False
+                    row_map[np.isin(row_map, empty)] = self._not_coverable
+                    changed = True
+            merged = self._merge_rows(matrix[rows][:, columns], np.flatnonzero(rows))
+            if len(merged):
+                np.add.at(weights, merged[:, 1], weights[merged[:, 0]])
+                rows[merged[:, 0]] = False
+                lookup = np.arange(n_rows)
+                lookup[merged[:, 0]] = merged[:, 1]
+                positive = row_map >= 0
+                row_map[positive] = lookup[row_map[positive]]
+                changed = True
+
+        self._matrix = matrix[rows][:, columns]
+        self._rows = rows
+        self._columns = columns
+        self._fixed = fixed
+        self._row_map = row_map
+        self._weights = weights
+
+    @staticmethod
+    def _dominated_columns(matrix, groups):
+        """
+        Finds the columns whose rows are a subset of the rows of another column in the same group. Of identical
+        columns, the first one is kept.
+        """
+        sizes = np.asarray(matrix.sum(axis=0)).ravel()
+        overlap = (matrix.T @ matrix).tocoo()
+        j, k, shared = overlap.row, overlap.col, overlap.data
+        dominated = (
+            (j != k)
+            & (shared == sizes[j])
+            & ((sizes[k] > sizes[j]) | (k < j))
+            & (groups[j] == groups[k])
+        )
+        empty = np.flatnonzero(sizes == 0)
+        return np.union1d(np.unique(j[dominated]), empty)
+
+    @staticmethod
+    def _merge_rows(matrix, positions):
+        """
+        Finds the rows covered by the same columns. Returns pairs of (row, representative) positions, where the
+        representative is the first of the identical rows.
+        """
+        matrix.sort_indices()
+        keys = [
+            matrix.indices[start:end].tobytes()
+            for start, end in zip(matrix.indptr[:-1], matrix.indptr[1:])
+        ]
+        codes, _ = pd.factorize(pd.Series(keys, dtype=object))
+        _, first = np.unique(codes, return_index=True)
+        representatives = first[codes]
+        duplicates = np.flatnonzero(representatives != np.arange(len(codes)))
+        return np.column_stack(
+            [positions[duplicates], positions[representatives[duplicates]]]
+        ).astype(int)
+
+    def _reduced_coverage(self, supply_name):
+        block = self._blocks[supply_name]
+        in_block = np.zeros(len(self._columns), dtype=bool)
+        in_block[block] = True
+        kept = in_block[self._columns]
+        supply_ids = self._supply_ids[supply_name][self._columns[block]]
+        with_demand = self._problem_type != "lscp" and self._demand_col is not None
+        return Coverage.from_sparse_matrix(
+            self._matrix[:, kept],
+            self._demand_ids[self._rows],
+            supply_ids,
+            demand=self._weights[self._rows] if with_demand else None,
+            demand_col=self._demand_col if with_demand else None,
+            demand_name=self._demand_name,
+            supply_name=supply_name,
+        )
+
+    @property
+    def problem_type(self):
+        """
+
+        :return: The type of problem that was reduced
+        :rtype: str
+        """
+        return self._problem_type
+
+    @property
+    def coverages(self):
+        """
+
+        :return: The reduced coverages, one for each supply name
+        :rtype: list[~allagash.coverage.Coverage]
+        """
+        return list(self._coverages.values())
+
+    @property
+    def max_supply(self):
+        """
+
+        :return: The maximum number of supply locations of each reduced coverage. Empty for LSCP.
+        :rtype: dict[~allagash.coverage.Coverage,int]
+        """
+        return self._max_supply
+
+    @property
+    def fixed_supply(self):
+        """
+
+        :return: The ids of the supply locations that are always selected, keyed by supply name
+        :rtype: dict[str,~pandas.Index]
+        """
+        return {
+            name: self._supply_ids[name][self._fixed[block]]
+            for name, block in self._blocks.items()
+        }
+
+    @property
+    def removed_supply(self):
+        """
+
+        :return: The ids of the supply locations that were removed because another location dominates them, keyed by
+                 supply name
+        :rtype: dict[str,~pandas.Index]
+        """
+        return {
+            name: self._supply_ids[name][~self._columns[block] & ~self._fixed[block]]
+            for name, block in self._blocks.items()
+        }
+
+    @property
+    def shape(self):
+        """
+
+        :return: The number of demand (rows) and supply (columns) locations left after the reductions
+        :rtype: tuple(int,int)
+        """
+        return self._matrix.shape
+
+    def coverage(self, supply_name):
+        """
+
+        :param str supply_name: The supply name of the coverage
+        :return: The reduced coverage of the supply name
+        :rtype: ~allagash.coverage.Coverage
+        """
+        if supply_name not in self._coverages:
+            raise ValueError(f"Unable to find supply named '{supply_name}'")
+        return self._coverages[supply_name]
+
+    def set_max_supply(self, max_supply):
+        """
+        Sets the maximum number of supply locations of the reduced coverages from the ones of the original coverages.
+        The reductions do not depend on the maximum number of supply locations, so they remain valid.
+
+        :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow for
+                                                                 the original coverages
+        :return: None
+        """
+        for c, v in max_supply.items():
+            reduced = self.coverage(c.supply_name)
+            self._max_supply[reduced] = v
+
+    def expand(self, kind, name, ids, values):
+        """
+        Maps the solution values of the reduced coverages back to the locations of the original coverages. Fixed supply
+        locations are selected and removed ones are not. Merged demand locations take the value of the location they
+        were merged into.
+
+        :param str kind: "demand" or "supply"
+        :param str name: The demand or supply name
+        :param ~pandas.Index ids: The ids of the locations of the reduced coverages
+        :param ~numpy.ndarray values: The solution value of each location
+        :return: The ids of the original locations and their solution values
+        :rtype: tuple(~pandas.Index,~numpy.ndarray)
+        """
+        if kind == "supply":
+            original = self._supply_ids[name]
+            expanded = self._fixed[self._blocks[name]].astype(float)
+        else:
+            original = self._demand_ids
+            row_values = np.zeros(len(self._rows))
+            expanded = np.where(self._row_map == self._covered_by_fixed, 1.0, 0.0)
+        positions = original.get_indexer(ids)
+        if kind == "supply":
+            expanded[positions] = values
+        else:
+            row_values[positions] = values
+            merged = self._row_map >= 0
+            expanded[merged] = row_values[self._row_map[merged]]
+        return original, expanded
@@ -1,11 +1,19 @@
+import itertools
 import operator
-import pulp
+import numpy as np
+import pandas as pd
+from .costs import CostMatrix
 from .coverage import Coverage
-from pandas.api.types import is_string_dtype
+from .model import MatrixModel
+from .presolve import Presolve
+from .solvers import MatrixSolver
+from .stats import ProblemStats
 
 
 class Problem:
-    _problem_types = ["lscp", "mclp", "bclp"]
+    _problem_types = ["lscp", "mclp", "bclp", "cmclp", "clscp", "pmedian", "pcenter"]
+    # The problems whose pulp problem is generated from the matrix model
+    _model_problem_types = ["cmclp", "clscp", "pmedian", "pcenter"]
     _delineator = "$"
 
     def __init__(self, pulp_problem, coverages, problem_type):
@@ -30,8 +38,60 @@ class Problem:
         else:
             self._coverages = coverages
         self._problem_type = problem_type.lower()
+        self._max_supply = None
+        self._capacity = None
+        self._matrix_model = None
+        self._solution = None
+        self._variables = None
+        self._presolve = None
+        self._stats = ProblemStats()
+
+    @classmethod
+    def _from_coverages(
+        cls,
+        coverages,
+        problem_type,
+        max_supply=None,
+        presolve=False,
+        stats=None,
+        capacity=None,
+    ):
+        """
+        Creates a new problem from validated coverages. Neither the pulp problem nor the matrix model is generated
+        until it is first used, so writing the matrix model never creates any pulp objects.
+        """
+        if not isinstance(presolve, bool):
+            raise TypeError(
+                f"Expected 'bool' type for presolve, got '{type(presolve)}'"
+            )
+        problem = cls.__new__(cls)
+        problem._pulp_problem = None
+        problem._coverages = coverages
+        problem._problem_type = problem_type
+        problem._max_supply = max_supply
+        problem._capacity = capacity
+        problem._matrix_model = None
+        problem._solution = None
+        problem._variables = None
+        problem._stats = stats or ProblemStats()
+        problem._presolve = None
+        if presolve:
+            with problem._stats._phase("presolve"):
+                problem._presolve = Presolve(coverages, problem_type, max_supply)
+        return problem
+
+    def _model_coverages(self):
+        """
+        Gets the coverages and maximum number of supply locations the model is generated from, which are the reduced
+        ones if the problem was presolved.
+        """
+        if self._presolve is not None:
+            return self._presolve.coverages, self._presolve.max_supply
+        return self._coverages, self._max_supply
 
     def _validate(self, problem, coverages, problem_type):
+        import pulp
+
         if not isinstance(problem, pulp.LpProblem):
             raise TypeError(
                 f"Expected 'LpProblem' type for problem, got '{type(problem)}'"
@@ -51,17 +111,79 @@ class Problem:
     def pulp_problem(self):
         """
 
-        :return: The pulp problem
+        :return: The pulp problem. If the problem was created from one of the factory methods, it is generated
+                 on first access.
         :rtype: ~pulp.LpProblem
         """
+        if (
+            self._pulp_problem is None
+            and self._problem_type in self._model_problem_types
+        ):
+            model = self.matrix_model
+            with self._stats._phase("generate"):
+                self._pulp_problem = self._generate_model_problem(model)
+        if self._pulp_problem is None:
+            coverages, max_supply = self._model_coverages()
+            with self._stats._phase("generate"):
+                if self._problem_type == "lscp":
+                    self._pulp_problem = self._generate_lscp_problem(coverages)
+                elif self._problem_type == "bclp":
+                    self._pulp_problem = self._generate_bclp_problem(
+                        coverages, max_supply
+                    )
+                else:
+                    self._pulp_problem = self._generate_mclp_problem(
+                        coverages, max_supply
+                    )
+                constraints = self._pulp_problem.constraints.values()
+                self._stats._set_size(
+                    self._pulp_problem.numVariables(),
+                    len(constraints),
+                    sum(len(c) for c in constraints),
+                )
         return self._pulp_problem
 
+    @property
+    def matrix_model(self):
+        """
+
+        :return: The problem stored as arrays built directly from the coverage matrices. It is generated on first
+                 access without creating the pulp problem.
+        :rtype: ~allagash.model.MatrixModel
+        """
+        if self._matrix_model is None:
+            coverages, max_supply = self._model_coverages()
+            if self._problem_type not in ("lscp", "clscp") and self._max_supply is None:
+                raise ValueError(
+                    "The matrix model can only be generated for problems created from a factory method"
+                )
+            with self._stats._phase("matrix_model"):
+                if self._problem_type == "lscp":
+                    self._matrix_model = MatrixModel.lscp(coverages)
+                elif self._problem_type == "cmclp":
+                    self._matrix_model = MatrixModel.cmclp(
+                        coverages, max_supply, self._capacity
+                    )
+                elif self._problem_type == "clscp":
+                    self._matrix_model = MatrixModel.clscp(coverages, self._capacity)
+                elif self._problem_type in ("pmedian", "pcenter"):
+                    self._matrix_model = getattr(MatrixModel, self._problem_type)(
+                        coverages[0], max_supply[coverages[0]]
+                    )
+                elif self._problem_type == "bclp":
+                    self._matrix_model = MatrixModel.bclp(coverages, max_supply)
+                else:
+                    self._matrix_model = MatrixModel.mclp(coverages, max_supply)
+                matrix = self._matrix_model.matrix
+                self._stats._set_size(matrix.shape[1], matrix.shape[0], matrix.nnz)
+        return self._matrix_model
+
     @property
     def coverages(self):
         """
 
-        :return: The coverage used to create the problem
-        :rtype: list[~allagash.coverage.Coverage]
+        :return: The coverage used to create the problem, or the cost matrix of a p-median or p-center problem
+        :rtype: list[~allagash.coverage.Coverage] or list[~allagash.costs.CostMatrix]
         """
         return self._coverages
 
@@ -74,76 +196,115 @@ class Problem:
         """
         return self._problem_type
 
+    @property
+    def presolve(self):
+        """
+
+        :return: The reductions applied to the coverages before the model was generated. None if the problem was not
+                 created with presolve=True.
+        :rtype: ~allagash.presolve.Presolve
+        """
+        return self._presolve
+
+    @property
+    def stats(self):
+        """
+
+        :return: The time spent in each phase of building and solving the problem and the size of the model
+        :rtype: ~allagash.stats.ProblemStats
+        """
+        return self._stats
+
+    @property
+    def solution(self):
+        """
+
+        :return: The solution found by a :class:`~allagash.solvers.MatrixSolver`, such as
+                 :class:`~allagash.solvers.HighsSolver` or a :class:`~allagash.solvers.HeuristicSolver`, including the
+                 bound and optimality gap. None if the problem was solved with a pulp solver.
+        :rtype: ~allagash.solvers.MatrixSolution
+        """
+        return self._solution
+
     def solve(self, solver):
         """
 
-        :param ~pulp.solvers.LpSolver solver: The solver to use for this problem
+        :param solver: The solver to use for this problem. Either a pulp solver or a
+                       :class:`~allagash.solvers.MatrixSolver` that solves the problem directly from the coverage
+                       matrices without generating the pulp problem, such as :class:`~allagash.solvers.HighsSolver` or
+                       :class:`~allagash.solvers.GreedySolver`.
+        :type solver: ~pulp.solvers.LpSolver or ~allagash.solvers.MatrixSolver
         :return: The solution for this problem
         :rtype: ~allagash.problem.Problem
         """
-        if not isinstance(solver, pulp.LpSolver):
-            raise TypeError(
-                f"Expected 'LpSolver' type for solver, got '{type(solver)}'"
-            )
-        self._pulp_problem.solve(solver)
-        if self._pulp_problem.status == 0:
+        if isinstance(solver, MatrixSolver):
+            model = self.matrix_model
+            with self._stats._phase("solve"):
+                self._solution = solver.solve(model, self._problem_type)
+            status = self._solution.status
+        else:
+            # pulp is only imported when it is used, matrix solvers never load it
+            import pulp
+
+            if not isinstance(solver, pulp.LpSolver):
+                raise TypeError(
+                    f"Expected 'LpSolver' or 'MatrixSolver' type for solver, got '{type(solver)}'"
+                )
+            self._solution = None
+            problem = self.pulp_problem
+            with self._stats._phase("solve"):
+                problem.solve(solver)
+            status = problem.status
+        if status == 0:
             raise NotSolvedException("Unable to solve the problem")
-        elif self._pulp_problem.status == -1:
+        elif status == -1:
             raise InfeasibleException("Infeasible problem")
-        elif self._pulp_problem.status == -2:
+        elif status == -2:
             raise UnboundedException("Unbounded problem")
-        elif self._pulp_problem.status == -3:
+        elif status == -3:
             raise UndefinedException("Undefined problem")
         return self
 
-    @classmethod
-    def lscp(cls, coverages):
+    def write_mps(self, path, objsense=False):
         """
-        Creates a new :class:`~allagash.problem.Problem` object representing the Location Covering Set Problem
+        Writes the problem to a free format MPS file straight from the coverage matrices, without creating the pulp
+        problem. See :meth:`~allagash.model.MatrixModel.write_mps`.
 
-        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
-        :return: The created problem
-        :rtype: ~allagash.problem.Problem
+        :param str path: The path of the file to write
+        :param bool objsense: (optional) Whether to write an OBJSENSE section for maximization problems instead of
+                              negating the objective. If not supplied, the default is False.
+        :return: None
         """
-        if not isinstance(coverages, (Coverage, list)):
-            raise TypeError(
-                f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
-            )
-        if isinstance(coverages, Coverage):
-            coverages = [coverages]
-        if not all([c.coverage_type == coverages[0].coverage_type for c in coverages]):
-            raise ValueError(
-                "Invalid coverages. Coverages must have the same coverage type."
-            )
-        if coverages[0].coverage_type != "binary":
-            raise ValueError("LSCP can only be generated from binary coverage.")
-        if not all(x.demand_name == coverages[0].demand_name for x in coverages):
-            raise ValueError("All Coverages must have the same 'demand_name'")
-        prob = cls._generate_lscp_problem(coverages)
-        return Problem(prob, coverages, problem_type="lscp")
+        model = self.matrix_model
+        with self._stats._phase("write_mps"):
+            model.write_mps(path, objsense=objsense)
 
-    @classmethod
-    def bclp(cls, coverages, max_supply):
+    def set_max_supply(self, max_supply):
         """
-        Creates a new :class:`~allagash.problem.Problem` object representing the Backup Covering Location Problem
+        Changes the maximum number of supply locations of a MCLP or BCLP problem without generating the problem again.
+        Only the right-hand side of the 'Num' constraints is changed, so sweeping a budget builds the model once.
 
-        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
-        :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow
-        :return: The created problem
+        If the problem was solved before, the previous selection is set as the initial value of the variables. Solvers
+        created with warm starts enabled use it as a MIP start. When the new budget is smaller than the number of
+        selected supply locations, only the selected locations covering the most demand are kept.
+
+        .. code-block:: python
+
+            problem = Problem.mclp(coverage, max_supply={coverage: 1})
+            solver = pulp.PULP_CBC_CMD(msg=False, warmStart=True)
+            for k in range(1, 201):
+                problem.set_max_supply({coverage: k})
+                problem.solve(solver)
+
+        :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow for
+                                                                 each coverage that changes
+        :return: The problem
         :rtype: ~allagash.problem.Problem
         """
-        if not isinstance(coverages, (Coverage, list)):
-            raise TypeError(
-                f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
-            )
-        if isinstance(coverages, Coverage):
-            coverages = [coverages]
-        if not all([c.coverage_type == coverages[0].coverage_type for c in coverages]):
+        if self._problem_type not in ("mclp", "bclp"):
             raise ValueError(
-                "Invalid coverages. Coverages must have the same coverage type."
+                f"max_supply can not be set for '{self._problem_type}' problems"
             )
-        if coverages[0].coverage_type != "binary":
-            raise ValueError("BCLP can only be generated from binary coverage.")
         if not isinstance(max_supply, dict):
             raise TypeError(
                 f"Expected 'dict' type for max_supply, got '{type(max_supply)}'"
@@ -153,67 +314,442 @@ class Problem:
                 raise TypeError(
                     f"Expected 'Coverage' type as key in max_supply, got '{type(k)}'"
                 )
-            if k.demand_col is None:
-                raise TypeError("Coverages used in BCLP must have 'demand_col'")
+            if not any(k is c for c in self._coverages):
+                raise ValueError(
+                    f"Coverage with supply named '{k.supply_name}' is not part of the problem"
+                )
             if not isinstance(v, int):
                 raise TypeError(
                     f"Expected 'int' type as value in max_supply, got '{type(v)}'"
                 )
-        if not all(x.demand_name == coverages[0].demand_name for x in coverages):
-            raise ValueError("All Coverages must have the same 'demand_name'")
-        prob = cls._generate_bclp_problem(coverages, max_supply)
-        return Problem(prob, coverages, problem_type="bclp")
+        if self._max_supply is not None:
+            self._max_supply = {**self._max_supply, **max_supply}
+        if self._presolve is not None:
+            self._presolve.set_max_supply(max_supply)
+        self._matrix_model = None
+        self._solution = None
+        if self._pulp_problem is None:
+            return self
+        for c, v in max_supply.items():
+            self._num_constraint(c).changeRHS(v)
+        if self._pulp_problem.status == 1:
+            self._set_initial_values()
+        import pulp
+
+        # The previous solution is no longer the solution of the changed problem
+        self._pulp_problem.status = pulp.LpStatusNotSolved
+        return self
+
+    def _num_constraint(self, coverage):
+        import pulp
+
+        # pulp replaces illegal characters in the constraint names
+        name = f"Num{self._delineator}{coverage.supply_name}"
+        return self._pulp_problem.constraints[name.translate(pulp.LpElement.trans)]
+
+    def _set_initial_values(self):
+        """
+        Sets the initial value of every variable from the current solution, deselecting supply locations that exceed
+        the maximum number of supply locations so the initial values stay feasible.
+        """
+        import pulp
+
+        variables = self._pulp_problem.variablesDict()
+
+        def variable(name, index):
+            return variables.get(
+                f"{name}{self._delineator}{index}".translate(pulp.LpElement.trans)
+            )
+
+        covered = {}
+        for c in self._model_coverages()[0]:
+            budget = max(-int(round(self._num_constraint(c).constant)), 0)
+            supply_vars = [variable(c.supply_name, s) for s in c.supply_ids]
+            selected = np.array(
+                [v is not None and (v.varValue or 0) > 0.5 for v in supply_vars]
+            )
+            if selected.sum() > budget:
+                # Keep the selected locations that cover the most demand
+                weights = c.matrix.T.dot(c.demand_values.astype(float))
+                positions = np.flatnonzero(selected)
+                keep = positions[np.argsort(-weights[positions], kind="stable")]
+                selected[:] = False
+                selected[keep[:budget]] = True
+            for v, value in zip(supply_vars, selected.tolist()):
+                if v is not None:
+                    v.setInitialValue(int(value))
+            counts = c.matrix.astype(bool).dot(selected.astype(int))
+            demand_covered = covered.setdefault(c.demand_name, {})
+            for index, count in zip(c.demand_ids, counts.tolist()):
+                demand_covered[index] = demand_covered.get(index, 0) + count
+
+        # MCLP demand is covered once, BCLP demand is covered when a backup location is also selected
+        required = 1 if self._problem_type == "mclp" else 2
+        for demand_name, counts in covered.items():
+            for index, count in counts.items():
+                v = variable(demand_name, index)
+                if v is not None:
+                    v.setInitialValue(int(count >= required))
 
     @classmethod
-    def mclp(cls, coverages, max_supply):
+    def lscp(cls, coverages, presolve=False):
+        """
+        Creates a new :class:`~allagash.problem.Problem` object representing the Location Covering Set Problem
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :param bool presolve: (optional) Whether to reduce the coverages before the model is generated, see
+                              :class:`~allagash.presolve.Presolve`. The selected locations are always returned for the
+                              original coverages. If not supplied, the default is False.
+        :return: The created problem
+        :rtype: ~allagash.problem.Problem
+        """
+        stats = ProblemStats()
+        with stats._phase("validate"):
+            if not isinstance(coverages, (Coverage, list)):
+                raise TypeError(
+                    f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
+                )
+            if isinstance(coverages, Coverage):
+                coverages = [coverages]
+            if not all(
+                [c.coverage_type == coverages[0].coverage_type for c in coverages]
+            ):
+                raise ValueError(
+                    "Invalid coverages. Coverages must have the same coverage type."
+                )
+            if coverages[0].coverage_type != "binary":
+                raise ValueError("LSCP can only be generated from binary coverage.")
+            if not all(x.demand_name == coverages[0].demand_name for x in coverages):
+                raise ValueError("All Coverages must have the same 'demand_name'")
+        return Problem._from_coverages(
+            coverages, "lscp", presolve=presolve, stats=stats
+        )
+
+    @classmethod
+    def bclp(cls, coverages, max_supply, presolve=False):
+        """
+        Creates a new :class:`~allagash.problem.Problem` object representing the Backup Covering Location Problem
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow
+        :param bool presolve: (optional) Whether to reduce the coverages before the model is generated, see
+                              :class:`~allagash.presolve.Presolve`. The selected locations are always returned for the
+                              original coverages. If not supplied, the default is False.
+        :return: The created problem
+        :rtype: ~allagash.problem.Problem
+        """
+        stats = ProblemStats()
+        with stats._phase("validate"):
+            if not isinstance(coverages, (Coverage, list)):
+                raise TypeError(
+                    f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
+                )
+            if isinstance(coverages, Coverage):
+                coverages = [coverages]
+            if not all(
+                [c.coverage_type == coverages[0].coverage_type for c in coverages]
+            ):
+                raise ValueError(
+                    "Invalid coverages. Coverages must have the same coverage type."
+                )
+            if coverages[0].coverage_type != "binary":
+                raise ValueError("BCLP can only be generated from binary coverage.")
+            if not isinstance(max_supply, dict):
+                raise TypeError(
+                    f"Expected 'dict' type for max_supply, got '{type(max_supply)}'"
+                )
+            for k, v in max_supply.items():
+                if not isinstance(k, Coverage):
+                    raise TypeError(
+                        f"Expected 'Coverage' type as key in max_supply, got '{type(k)}'"
+                    )
+                if k.demand_col is None:
+                    raise TypeError("Coverages used in BCLP must have 'demand_col'")
+                if not isinstance(v, int):
+                    raise TypeError(
+                        f"Expected 'int' type as value in max_supply, got '{type(v)}'"
+                    )
+            if not all(x.demand_name == coverages[0].demand_name for x in coverages):
+                raise ValueError("All Coverages must have the same 'demand_name'")
+        return Problem._from_coverages(
+            coverages, "bclp", max_supply, presolve, stats=stats
+        )
+
+    @classmethod
+    def mclp(cls, coverages, max_supply, presolve=False):
         """
         Creates a new :class:`~allagash.problem.Problem` object representing the Maximum Covering Location Problem
 
         :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
         :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow
+        :param bool presolve: (optional) Whether to reduce the coverages before the model is generated, see
+                              :class:`~allagash.presolve.Presolve`. The selected locations are always returned for the
+                              original coverages. If not supplied, the default is False.
+        :return: The created problem
+        :rtype: ~allagash.problem.Problem
+        """
+        stats = ProblemStats()
+        with stats._phase("validate"):
+            if not isinstance(coverages, (Coverage, list)):
+                raise TypeError(
+                    f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
+                )
+            if isinstance(coverages, Coverage):
+                coverages = [coverages]
+            if not all(
+                [c.coverage_type == coverages[0].coverage_type for c in coverages]
+            ):
+                raise ValueError(
+                    "Invalid coverages. Coverages must have the same coverage type."
+                )
+            if coverages[0].coverage_type != "binary":
+                raise ValueError("MCLP can only be generated from binary coverage.")
+            if not isinstance(max_supply, dict):
+                raise TypeError(
+                    f"Expected 'dict' type for max_supply, got '{type(max_supply)}'"
+                )
+            for k, v in max_supply.items():
+                if not isinstance(k, Coverage):
+                    raise TypeError(
+                        f"Expected 'Coverage' type as key in max_supply, got '{type(k)}'"
+                    )
+                if k.demand_col is None:
+                    raise TypeError("Coverages used in MCLP must have 'demand_col'")
+                if not isinstance(v, int):
+                    raise TypeError(
+                        f"Expected 'int' type as value in max_supply, got '{type(v)}'"
+                    )
+            if not all(x.demand_name == coverages[0].demand_name for x in coverages):
+                raise ValueError("All Coverages must have the same 'demand_name'")
+        return Problem._from_coverages(
+            coverages, "mclp", max_supply, presolve, stats=stats
+        )
+
+    @classmethod
+    def cmclp(cls, coverages, max_supply, capacity):
+        """
+        Creates a new :class:`~allagash.problem.Problem` object representing the Capacitated Maximum Covering Location
+        Problem. Each supply location can serve at most its capacity of demand, so popular locations are not
+        overloaded. A demand location counts as covered when all of its demand is assigned to selected supply locations
+        covering it, and its demand can be split between them.
+
+        The model has one continuous assignment variable for each covered (demand, supply) pair of the coverages, so
+        its size grows with the number of non-zero entries of the coverage matrices rather than with
+        demand x supply. See :meth:`~allagash.problem.Problem.assignments` for the assigned demand.
+
+        .. code-block:: python
+
+            capacity = supply_df.set_index("Supply_Id")["Beds"]
+            Problem.cmclp(coverage, max_supply={coverage: 5}, capacity={coverage: capacity})
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :param dict[~allagash.coverage.Coverage,int] max_supply: The maximum number of supply locations to allow
+        :param dict[~allagash.coverage.Coverage,list] capacity: The amount of demand each supply location can serve,
+                                                                keyed by coverage. A series is matched to the supply
+                                                                ids by its index, other values by position.
+        :return: The created problem
+        :rtype: ~allagash.problem.Problem
+        """
+        stats = ProblemStats()
+        with stats._phase("validate"):
+            if not isinstance(coverages, (Coverage, list)):
+                raise TypeError(
+                    f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
+                )
+            if isinstance(coverages, Coverage):
+                coverages = [coverages]
+            if not all(c.coverage_type == "binary" for c in coverages):
+                raise ValueError("CMCLP can only be generated from binary coverage.")
+            if not isinstance(max_supply, dict):
+                raise TypeError(
+                    f"Expected 'dict' type for max_supply, got '{type(max_supply)}'"
+                )
+            for k, v in max_supply.items():
+                if not isinstance(k, Coverage):
+                    raise TypeError(
+                        f"Expected 'Coverage' type as key in max_supply, got '{type(k)}'"
+                    )
+                if not isinstance(v, int):
+                    raise TypeError(
+                        f"Expected 'int' type as value in max_supply, got '{type(v)}'"
+                    )
+            cls._validate_capacity(coverages, capacity, "CMCLP")
+        return Problem._from_coverages(
+            coverages, "cmclp", max_supply, stats=stats, capacity=capacity
+        )
+
+    @classmethod
+    def clscp(cls, coverages, capacity):
+        """
+        Creates a new :class:`~allagash.problem.Problem` object representing the Capacitated Location Set Covering
+        Problem. The fewest supply locations are selected so that all of the demand of every demand location is
+        assigned to selected supply locations covering it, without exceeding their capacity.
+
+        The model has one continuous assignment variable for each covered (demand, supply) pair of the coverages, see
+        :meth:`~allagash.problem.Problem.cmclp`.
+
+        :param list[~allagash.coverage.Coverage] coverages: The coverages to be used to create the problem
+        :param dict[~allagash.coverage.Coverage,list] capacity: The amount of demand each supply location can serve,
+                                                                keyed by coverage. A series is matched to the supply
+                                                                ids by its index, other values by position.
         :return: The created problem
         :rtype: ~allagash.problem.Problem
         """
-        if not isinstance(coverages, (Coverage, list)):
+        stats = ProblemStats()
+        with stats._phase("validate"):
+            if not isinstance(coverages, (Coverage, list)):
+                raise TypeError(
+                    f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
+                )
+            if isinstance(coverages, Coverage):
+                coverages = [coverages]
+            if not all(c.coverage_type == "binary" for c in coverages):
+                raise ValueError("CLSCP can only be generated from binary coverage.")
+            cls._validate_capacity(coverages, capacity, "CLSCP")
+        return Problem._from_coverages(
+            coverages, "clscp", stats=stats, capacity=capacity
+        )
+
+    @classmethod
+    def pmedian(cls, costs, p):
+        """
+        Creates a new :class:`~allagash.problem.Problem` object representing the p-median problem. Exactly p supply
+        locations are selected so that the total cost of serving every demand location from its nearest selected
+        location, weighted by the demand if the cost matrix has demand values, is as small as possible.
+
+        Only the pairs kept in the cost matrix can be assigned, so the model has one variable for each kept pair. When
+        the cost matrix keeps the k nearest supply locations of each demand location, the model grows with demand x k
+        instead of demand x supply. The solution is feasible for the full problem, and it is optimal whenever every
+        demand location of the optimal solution is served by one of its k nearest locations. If no selection of p
+        locations includes one of the k nearest locations of every demand location the problem is infeasible and a
+        larger k is needed. See :meth:`~allagash.problem.Problem.assignments` for the location serving each demand
+        location.
+
+        .. code-block:: python
+
+            costs = CostMatrix.from_points(demand_df, supply_df, "GEOID", "ORIG_ID", 10, demand_col="Population")
+            Problem.pmedian(costs, p=5)
+
+        :param ~allagash.costs.CostMatrix costs: The costs of the (demand, supply) pairs that can be assigned
+        :param int p: The number of supply locations to select
+        :return: The created problem
+        :rtype: ~allagash.problem.Problem
+        """
+        stats = ProblemStats()
+        with stats._phase("validate"):
+            cls._validate_costs(costs, p)
+        return Problem._from_coverages([costs], "pmedian", {costs: p}, stats=stats)
+
+    @classmethod
+    def pcenter(cls, costs, p):
+        """
+        Creates a new :class:`~allagash.problem.Problem` object representing the p-center problem. Exactly p supply
+        locations are selected so that the largest cost of serving a demand location from its nearest selected location
+        is as small as possible. The demand values are not used.
+
+        Like :meth:`~allagash.problem.Problem.pmedian`, the model only has variables for the pairs kept in the cost
+        matrix, plus one variable for the largest cost.
+
+        :param ~allagash.costs.CostMatrix costs: The costs of the (demand, supply) pairs that can be assigned
+        :param int p: The number of supply locations to select
+        :return: The created problem
+        :rtype: ~allagash.problem.Problem
+        """
+        stats = ProblemStats()
+        with stats._phase("validate"):
+            cls._validate_costs(costs, p)
+        return Problem._from_coverages([costs], "pcenter", {costs: p}, stats=stats)
+
+    @staticmethod
+    def _validate_costs(costs, p):
+        if not isinstance(costs, CostMatrix):
             raise TypeError(
-                f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
+                f"Expected 'CostMatrix' type for costs, got '{type(costs)}'"
             )
-        if isinstance(coverages, Coverage):
-            coverages = [coverages]
-        if not all([c.coverage_type == coverages[0].coverage_type for c in coverages]):
+        if not isinstance(p, int) or isinstance(p, bool):
+            raise TypeError(f"Expected 'int' type for p, got '{type(p)}'")
+        if p < 1 or p > len(costs.supply_ids):
+            raise ValueError(f"Invalid p '{p}'")
+        unassigned = int(np.count_nonzero(np.diff(costs.matrix.indptr) == 0))
+        if unassigned:
             raise ValueError(
-                "Invalid coverages. Coverages must have the same coverage type."
+                f"Every demand location must have a cost, {unassigned} demand locations have none"
             )
-        if coverages[0].coverage_type != "binary":
-            raise ValueError("MCLP can only be generated from binary coverage.")
-        if not isinstance(max_supply, dict):
+
+    @staticmethod
+    def _validate_capacity(coverages, capacity, problem_type):
+        if not isinstance(capacity, dict):
             raise TypeError(
-                f"Expected 'dict' type for max_supply, got '{type(max_supply)}'"
+                f"Expected 'dict' type for capacity, got '{type(capacity)}'"
             )
-        for k, v in max_supply.items():
-            if not isinstance(k, Coverage):
-                raise TypeError(
-                    f"Expected 'Coverage' type as key in max_supply, got '{type(k)}'"
-                )
-            if k.demand_col is None:
-                raise TypeError("Coverages used in MCLP must have 'demand_col'")
-            if not isinstance(v, int):
+        for c in coverages:
+            if c.demand_col is None:
                 raise TypeError(
-                    f"Expected 'int' type as value in max_supply, got '{type(v)}'"
+                    f"Coverages used in {problem_type} must have 'demand_col'"
                 )
+            if c not in capacity:
+                raise ValueError(f"Missing capacity for supply named '{c.supply_name}'")
+            MatrixModel._capacity_values(c, capacity[c])
         if not all(x.demand_name == coverages[0].demand_name for x in coverages):
             raise ValueError("All Coverages must have the same 'demand_name'")
 
-        prob = cls._generate_mclp_problem(coverages, max_supply)
-        return Problem(prob, coverages, problem_type="mclp")
+    @staticmethod
+    def _generate_model_problem(model):
+        """
+        Generates the pulp problem of a matrix model, with one variable for each column and one constraint for each
+        row of the model.
+        """
+        import pulp
+
+        # pulp uses None for a variable without a bound
+        variables = [
+            pulp.LpVariable(
+                name,
+                lower if np.isfinite(lower) else None,
+                upper if np.isfinite(upper) else None,
+                pulp.LpInteger if integer else pulp.LpContinuous,
+            )
+            for name, lower, upper, integer in zip(
+                model.col_names,
+                model.col_lower.tolist(),
+                model.col_upper.tolist(),
+                model.integer.tolist(),
+            )
+        ]
+        sense = pulp.LpMaximize if model.sense == "maximize" else pulp.LpMinimize
+        prob = pulp.LpProblem(model.name, sense)
+        prob += pulp.LpAffineExpression(
+            (variables[j], model.objective[j])
+            for j in np.flatnonzero(model.objective).tolist()
+        )
+        matrix = model.matrix
+        for i, name in enumerate(model.row_names):
+            start, end = matrix.indptr[i], matrix.indptr[i + 1]
+            terms = [
+                (variables[j], v)
+                for j, v in zip(
+                    matrix.indices[start:end].tolist(), matrix.data[start:end].tolist()
+                )
+            ]
+            lower, upper = model.row_lower[i], model.row_upper[i]
+            if lower == upper:
+                constraint = pulp.LpConstraint(terms, pulp.LpConstraintEQ, rhs=lower)
+            elif np.isfinite(lower):
+                constraint = pulp.LpConstraint(terms, pulp.LpConstraintGE, rhs=lower)
+            else:
+                constraint = pulp.LpConstraint(terms, pulp.LpConstraintLE, rhs=upper)
+            prob += constraint, name
+        return prob
 
     @staticmethod
     def _generate_lscp_problem(coverages):  # noqa: C901
+        import pulp
+
         demand_vars = {}
         for c in coverages:
             if c.demand_name not in demand_vars:
                 demand_vars[c.demand_name] = {}
-            for index, _ in c.df.iterrows():
+            for index in c.demand_ids:
                 name = f"{c.demand_name}{Problem._delineator}{index}"
                 demand_vars[c.demand_name][index] = pulp.LpVariable(
                     name, 0, 1, pulp.LpInteger
@@ -221,13 +757,9 @@ class Problem:
 
         supply_vars = {}
         for c in coverages:
-            if c.demand_col:
-                df = c.df.drop(columns=c.demand_col)
-            else:
-                df = c.df
             if c.supply_name not in supply_vars:
                 supply_vars[c.supply_name] = {}
-            for s in df.columns.to_list():
+            for s in c.supply_ids:
                 name = f"{c.supply_name}{Problem._delineator}{s}"
                 supply_vars[c.supply_name][s] = pulp.LpVariable(
                     name, 0, 1, pulp.LpInteger
@@ -243,39 +775,30 @@ class Problem:
         for c in coverages:
             if c.demand_name not in sums:
                 sums[c.demand_name] = {}
-            if c.demand_col:
-                df = c.df.drop(columns=c.demand_col)
-            else:
-                df = c.df
-            for index, demand in df.iterrows():
+            for index, terms in Problem._covering_terms(c, supply_vars[c.supply_name]):
                 if index not in sums[c.demand_name]:
-                    sums[c.demand_name][index] = []
-                cov = demand.T
-                for i, value in cov.iteritems():
-                    if value is True:
-                        sums[c.demand_name][index].append(supply_vars[c.supply_name][i])
-
-        for c in coverages:
-            for k, v in demand_vars[c.demand_name].items():
-                if not to_sum:
-                    sums[c.demand_name][v] = [
-                        pulp.LpVariable(
-                            f"__dummy{Problem._delineator}{v}", 0, 0, pulp.LpInteger
-                        )
-                    ]
+                    sums[c.demand_name][index] = pulp.LpConstraint(
+                        terms, pulp.LpConstraintGE, rhs=1
+                    )
+                else:
+                    sums[c.demand_name][index].addInPlace(
+                        pulp.LpAffineExpression(terms)
+                    )
 
         for demand_name, v in sums.items():
-            for i, to_sum in v.items():
-                prob += pulp.lpSum(to_sum) >= 1, f"D{demand_name}{i}"
+            for i, constraint in v.items():
+                prob += constraint, f"D{demand_name}{i}"
         return prob
 
     @staticmethod
     def _generate_bclp_problem(coverages, max_supply):  # noqa: C901
+        import pulp
+
         demand_vars = {}
         for c in coverages:
             if c.demand_name not in demand_vars:
                 demand_vars[c.demand_name] = {}
-            for index, _ in c.df.iterrows():
+            for index in c.demand_ids:
                 name = f"{c.demand_name}{Problem._delineator}{index}"
                 demand_vars[c.demand_name][index] = pulp.LpVariable(
                     name, 0, 1, pulp.LpInteger
@@ -283,13 +806,9 @@ class Problem:
 
         supply_vars = {}
         for c in coverages:
-            if c.demand_col:
-                df = c.df.drop(columns=c.demand_col)
-            else:
-                df = c.df
             if c.supply_name not in supply_vars:
                 supply_vars[c.supply_name] = {}
-            for s in df.columns.to_list():
+            for s in c.supply_ids:
                 name = f"{c.supply_name}{Problem._delineator}{s}"
                 supply_vars[c.supply_name][s] = pulp.LpVariable(
                     name, 0, 1, pulp.LpInteger
@@ -299,42 +818,33 @@ class Problem:
         prob = pulp.LpProblem("BCLP", pulp.LpMaximize)
         demands = {}
         for c in coverages:
-            for _, demand_var in demand_vars[c.demand_name].items():
-                d = demand_var.name.split(Problem._delineator)[1]
-                if d not in demands:
-                    if is_string_dtype(coverages[0].df.index.dtype):
-                        query = f"{coverages[0].df.index.name} == '{d}'"
-                    else:
-                        query = f"{coverages[0].df.index.name} == {d}"
-                    v = c.df.query(query)[c.demand_col].tolist()[0]
-                    demands[d] = v * demand_var
-        to_sum = []
-        for k, v in demands.items():
-            to_sum.append(v)
-        prob += pulp.lpSum(to_sum)
+            for index, v in zip(c.demand_ids, c.demand_values.tolist()):
+                if index not in demands:
+                    demands[index] = (demand_vars[c.demand_name][index], v)
+        prob += pulp.LpAffineExpression(
+            (var, v) for var, v in demands.values() if v != 0
+        )
 
         # coverage constraints
         sums = {}
         for c in coverages:
             if c.demand_name not in sums:
                 sums[c.demand_name] = {}
-            if c.demand_col:
-                df = c.df.drop(columns=c.demand_col)
-            else:
-                df = c.df
-            for index, demand in df.iterrows():
+            for index, terms in Problem._covering_terms(c, supply_vars[c.supply_name]):
                 if index not in sums[c.demand_name]:
-                    sums[c.demand_name][index] = [
-                        -demand_vars[c.demand_name][index],
-                        -1,
-                    ]
-                cov = demand.T
-                for i, value in cov.iteritems():
-                    if value is True:
-                        sums[c.demand_name][index].append(supply_vars[c.supply_name][i])
+                    demand_term = (demand_vars[c.demand_name][index], -1)
+                    sums[c.demand_name][index] = pulp.LpConstraint(
+                        itertools.chain([demand_term], terms),
+                        pulp.LpConstraintGE,
+                        rhs=1,
+                    )
+                else:
+                    sums[c.demand_name][index].addInPlace(
+                        pulp.LpAffineExpression(terms)
+                    )
         for k, v in sums.items():
-            for index, to_sum in v.items():
-                prob += pulp.lpSum(to_sum) >= 0, f"D{index}"
+            for index, constraint in v.items():
+                prob += constraint, f"D{index}"
 
         # Number of supply locations
         for c in coverages:
@@ -349,11 +859,13 @@ class Problem:
 
     @staticmethod
     def _generate_mclp_problem(coverages, max_supply):  # noqa: C901
+        import pulp
+
         demand_vars = {}
         for c in coverages:
             if c.demand_name not in demand_vars:
                 demand_vars[c.demand_name] = {}
-            for index, _ in c.df.iterrows():
+            for index in c.demand_ids:
                 name = f"{c.demand_name}{Problem._delineator}{index}"
                 demand_vars[c.demand_name][index] = pulp.LpVariable(
                     name, 0, 1, pulp.LpInteger
@@ -361,13 +873,9 @@ class Problem:
 
         supply_vars = {}
         for c in coverages:
-            if c.demand_col:
-                df = c.df.drop(columns=c.demand_col)
-            else:
-                df = c.df
             if c.supply_name not in supply_vars:
                 supply_vars[c.supply_name] = {}
-            for s in df.columns.to_list():
+            for s in c.supply_ids:
                 name = f"{c.supply_name}{Problem._delineator}{s}"
                 supply_vars[c.supply_name][s] = pulp.LpVariable(
                     name, 0, 1, pulp.LpInteger
@@ -377,39 +885,33 @@ class Problem:
         prob = pulp.LpProblem("MCLP", pulp.LpMaximize)
         demands = {}
         for c in coverages:
-            for _, demand_var in demand_vars[c.demand_name].items():
-                d = demand_var.name.split(Problem._delineator)[1]
-                if d not in demands:
-                    if is_string_dtype(coverages[0].df.index.dtype):
-                        query = f"{coverages[0].df.index.name} == '{d}'"
-                    else:
-                        query = f"{coverages[0].df.index.name} == {d}"
-                    v = c.df.query(query)[c.demand_col].tolist()[0]
-                    demands[d] = v * demand_var
-        to_sum = []
-        for k, v in demands.items():
-            to_sum.append(v)
-        prob += pulp.lpSum(to_sum)
+            for index, v in zip(c.demand_ids, c.demand_values.tolist()):
+                if index not in demands:
+                    demands[index] = (demand_vars[c.demand_name][index], v)
+        prob += pulp.LpAffineExpression(
+            (var, v) for var, v in demands.values() if v != 0
+        )
 
         # coverage constraints
         sums = {}
         for c in coverages:
             if c.demand_name not in sums:
                 sums[c.demand_name] = {}
-            if c.demand_col:
-                df = c.df.drop(columns=c.demand_col)
-            else:
-                df = c.df
-            for index, demand in df.iterrows():
+            for index, terms in Problem._covering_terms(c, supply_vars[c.supply_name]):
                 if index not in sums[c.demand_name]:
-                    sums[c.demand_name][index] = [-demand_vars[c.demand_name][index]]
-                cov = demand.T
-                for i, value in cov.iteritems():
-                    if value is True:
-                        sums[c.demand_name][index].append(supply_vars[c.supply_name][i])
+                    demand_term = (demand_vars[c.demand_name][index], -1)
+                    sums[c.demand_name][index] = pulp.LpConstraint(
+                        itertools.chain([demand_term], terms),
+                        pulp.LpConstraintGE,
+                        rhs=0,
+                    )
+                else:
+                    sums[c.demand_name][index].addInPlace(
+                        pulp.LpAffineExpression(terms)
+                    )
         for k, v in sums.items():
-            for index, to_sum in v.items():
-                prob += pulp.lpSum(to_sum) >= 0, f"D{index}"
+            for index, constraint in v.items():
+                prob += constraint, f"D{index}"
 
         # Number of supply locations
         for c in coverages:
@@ -422,21 +924,108 @@ class Problem:
             )
         return prob
 
+    @staticmethod
+    def _covering_terms(coverage, supply_vars):
+        """
+        Finds the supply variables covering each demand location. The terms are read from the non-zero entries of
+        the coverage matrix in one pass so the work is linear in the number of covered pairs.
+
+        :param ~allagash.coverage.Coverage coverage: The coverage to read the terms from
+        :param dict supply_vars: The supply variables of the coverage, keyed by supply id
+        :return: A generator of (demand id, iterator of (variable, 1) terms) tuples in the order of the demand
+                 locations
+        :rtype: generator
+        """
+        variables = np.empty(len(coverage.supply_ids), dtype=object)
+        variables[:] = [supply_vars[s] for s in coverage.supply_ids]
+        # The coverage matrix is row-major so the pairs are already grouped by demand location
+        rows, cols = coverage.matrix.nonzero()
+        terms = variables[cols]
+        bounds = np.searchsorted(rows, np.arange(len(coverage.demand_ids) + 1))
+        for index, start, end in zip(coverage.demand_ids, bounds[:-1], bounds[1:]):
+            yield index, zip(terms[start:end], itertools.repeat(1))
+
+    def _is_solved(self):
+        if self._solution is not None:
+            return self._solution.status == 1
+        return self._pulp_problem is not None and self._pulp_problem.status == 1
+
+    def _location_values(self, kind, name):
+        """
+        Gets the ids of the demand or supply locations with the given name and the solution value of their variables.
+        The solutions of matrix solvers are read from the columns of the matrix model, the pulp variables of each name are
+        found once and kept, so repeated calls do not search every variable of the problem. If the problem was
+        presolved, the values are mapped back to the locations of the original coverages.
+        """
+        if self._solution is not None:
+            model = self.matrix_model
+            columns = model.demand_columns if kind == "demand" else model.supply_columns
+            if name not in columns:
+                raise ValueError(f"Unable to find {kind} named '{name}'")
+            ids, block = columns[name]
+            values = self._solution.column_values[block]
+        else:
+            if self._variables is None:
+                with self._stats._phase("read_solution"):
+                    self._variables = self._map_variables()
+            if (kind, name) not in self._variables:
+                raise ValueError(f"Unable to find {kind} named '{name}'")
+            ids, variables = self._variables[(kind, name)]
+            values = np.array([v.varValue for v in variables], dtype=float)
+        if self._presolve is not None:
+            return self._presolve.expand(kind, name, ids, values)
+        return ids, values
+
+    def _map_variables(self):
+        """
+        Maps the ids of the demand and supply locations of each name to their pulp variables.
+        """
+        import pulp
+
+        variables = self._pulp_problem.variablesDict()
+        coverages = self._model_coverages()[0]
+        mapping = {}
+        for kind in ("demand", "supply"):
+            for name, ids in MatrixModel._ids_by_name(coverages, kind).items():
+                found = [
+                    variables.get(
+                        f"{name}{self._delineator}{i}".translate(pulp.LpElement.trans)
+                    )
+                    for i in ids
+                ]
+                exists = np.array([v is not None for v in found], dtype=bool)
+                # Presolve can remove every location of a name
+                if exists.any() or len(ids) == 0:
+                    mapping[(kind, name)] = (
+                        ids[exists],
+                        [v for v in found if v is not None],
+                    )
+        return mapping
+
+    @staticmethod
+    def _original_ids(ids):
+        # The supply ids of dense coverages are stored as the (object) columns of the dataframe
+        if ids.dtype == object:
+            return pd.Index(ids.tolist(), name=ids.name)
+        return ids
+
     def selected_supply(self, coverage, operation=operator.eq, value=1):
         """
-        Gets the list of the supply locations that were selected when the optimization problem was solved.
+        Gets the supply locations that were selected when the optimization problem was solved.
 
-        :param ~allagash.coverage.Coverage coverage: The coverage that selected locations may be found in.
-        :param function operation: The operation to use when determining whether a location was selected
+        :param coverage: The coverage or cost matrix that selected locations may be found in.
+        :type coverage: ~allagash.coverage.Coverage or ~allagash.costs.CostMatrix
+        :param function operation: The operation to use when determining whether a location was selected. It is
+                                   applied to the array of variable values.
         :param int value: The value to apply the operation to
-        :return: The list of location ids of the selected locations
-        :rtype: list
+        :return: The ids of the selected locations, with the dtype of the supply ids of the coverage
+        :rtype: ~pandas.Index
         """
-        if self._pulp_problem.status != 1:
+        if not self._is_solved():
             raise RuntimeError("Problem not optimally solved yet")
         from allagash.coverage import Coverage
 
-        if not isinstance(coverage, Coverage):
+        if not isinstance(coverage, (Coverage, CostMatrix)):
             raise TypeError(
                 f"Expected 'Coverage' type for coverage, got '{type(coverage)}'"
             )
@@ -444,46 +1033,78 @@ class Problem:
             raise TypeError(f"Expected callable for operation, got '{type(operation)}'")
         if not isinstance(value, (int, float)):
             raise TypeError(f"Expected 'int' or 'float' for value, got '{type(value)}'")
-        ids = []
-        for var in self._pulp_problem.variables():
-            if var.name.split(self._delineator)[0] == coverage.supply_name:
-                if operation(var.varValue, value):
-                    ids.append(var.name.split(self._delineator)[1])
-        return ids
+        ids, values = self._location_values("supply", coverage.supply_name)
+        return self._original_ids(ids[operation(values, value)])
 
     def selected_demand(self, coverage):
         """
-        Gets the list of the demand locations that were selected when the optimization problem was solved.
+        Gets the demand locations that were selected when the optimization problem was solved.
 
         :param ~allagash.coverage.Coverage coverage: The coverage that the demand locations may be found in. If multiple
                 coverages were used that have the same demand, locations covered by any other coverages will also
                 be returned.
-        :return: The list of location ids of the covered locations
-        :rtype: list
+        :return: The ids of the covered locations, with the dtype of the demand ids of the coverage
+        :rtype: ~pandas.Index
         """
-        if self._pulp_problem.status != 1:
+        if not self._is_solved():
             raise RuntimeError("Problem not optimally solved yet")
         from allagash.coverage import Coverage
 
-        if not isinstance(coverage, Coverage):
+        if not isinstance(coverage, (Coverage, CostMatrix)):
             raise TypeError(
                 f"Expected 'Coverage' type for coverage, got '{type(coverage)}'"
             )
-        if self.problem_type in ["lscp", "bclp"]:
-            for c in self.coverages:
-                if c.demand_name == c.demand_name:
-                    return c.df.index.tolist()
-            else:
+        if self.problem_type in ["lscp", "bclp", "clscp", "pmedian", "pcenter"]:
+            # Every demand location is covered
+            demand_ids = MatrixModel._ids_by_name(self._coverages, "demand")
+            if coverage.demand_name not in demand_ids:
                 raise ValueError(
                     f"Unable to find demand named '{coverage.demand_name}'"
                 )
+            return self._original_ids(demand_ids[coverage.demand_name])
+        ids, values = self._location_values("demand", coverage.demand_name)
+        return self._original_ids(ids[values >= 1])
+
+    def assignments(self, coverage):
+        """
+        Gets the share of the demand of each demand location assigned to each supply location of a capacitated problem
+        (CMCLP or CLSCP), a p-median or a p-center problem when it was solved.
+
+        :param coverage: The coverage or cost matrix whose supply locations the demand is assigned to
+        :type coverage: ~allagash.coverage.Coverage or ~allagash.costs.CostMatrix
+        :return: The demand id, supply id and share of the demand ("share") of every assignment with a share above 0
+        :rtype: ~pandas.DataFrame
+        """
+        if not self._is_solved():
+            raise RuntimeError("Problem not optimally solved yet")
+        if not isinstance(coverage, (Coverage, CostMatrix)):
+            raise TypeError(
+                f"Expected 'Coverage' type for coverage, got '{type(coverage)}'"
+            )
+        if self._problem_type not in self._model_problem_types:
+            raise ValueError(
+                f"Assignments are not available for '{self._problem_type}' problems"
+            )
+        model = self.matrix_model
+        if coverage.supply_name not in model.assignment_columns:
+            raise ValueError(f"Unable to find supply named '{coverage.supply_name}'")
+        demand_ids, supply_ids, block = model.assignment_columns[coverage.supply_name]
+        if self._solution is not None:
+            values = np.asarray(self._solution.column_values[block], dtype=float)
         else:
-            ids = []
-            for var in self._pulp_problem.variables():
-                if var.name.split(self._delineator)[0] == coverage.demand_name:
-                    if var.varValue >= 1:
-                        ids.append(var.name.split(self._delineator)[1])
-            return ids
+            variables = self._pulp_problem.variablesDict()
+            values = np.array(
+                [variables[name].varValue or 0 for name in model.col_names[block]],
+                dtype=float,
+            )
+        assigned = values > 1e-9
+        return pd.DataFrame(
+            {
+                "demand_id": self._original_ids(demand_ids[assigned]),
+                "supply_id": self._original_ids(supply_ids[assigned]),
+                "share": values[assigned],
+            }
+        )
 
 
 class NotSolvedException(Exception):
@@ -0,0 +1,371 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .coverage import Coverage
+from .problem import (
+    Problem,
+    NotSolvedException,
+    InfeasibleException,
+    UnboundedException,
+)
+
+
+class Scenario:
+    _problem_types = ["lscp", "mclp", "bclp"]
+
+    def __init__(
+        self,
+        problem_type,
+        coverages,
+        max_supply=None,
+        supply_ids=None,
+        demand=None,
+        name=None,
+    ):
+        """
+        A variation of a problem over the base coverages of a :class:`~allagash.scenarios.ScenarioRunner`.
+
+        .. code-block:: python
+
+            Scenario("mclp", coverage, max_supply={coverage: 5}, supply_ids={coverage: [1, 4, 7]})
+
+        :param str problem_type: The type of problem to generate. Options are "lscp", "mclp" and "bclp".
+        :param list[~allagash.coverage.Coverage] coverages: The base coverages used to create the problem
+        :param dict[~allagash.coverage.Coverage,int] max_supply: (optional) The maximum number of supply locations to
+                                                                 allow. Required for MCLP and BCLP.
+        :param dict[~allagash.coverage.Coverage,list] supply_ids: (optional) The ids of the supply locations that can
+                                                                  be selected. If a coverage is not included, all of
+                                                                  its supply locations can be selected.
+        :param dict[~allagash.coverage.Coverage,list] demand: (optional) The amount of demand of each demand location,
+                                                              replacing the demand of the coverage
+        :param name: (optional) A name identifying the scenario in the results. If not supplied, the position of the
+                     scenario is used.
+        """
+        if isinstance(coverages, Coverage):
+            coverages = [coverages]
+        self._validate(problem_type, coverages, max_supply, supply_ids, demand)
+        self._problem_type = problem_type.lower()
+        self._coverages = coverages
+        self._max_supply = max_supply or {}
+        self._supply_ids = supply_ids or {}
+        self._demand = demand or {}
+        self._name = name
+
+    @classmethod
+    def _validate(cls, problem_type, coverages, max_supply, supply_ids, demand):
+        if not isinstance(problem_type, str):
+            raise TypeError(
+                f"Expected 'str' type for problem_type, got '{type(problem_type)}'"
+            )
+        if problem_type.lower() not in cls._problem_types:
+            raise ValueError(f"Invalid problem_type: '{problem_type}'")
+        if not isinstance(coverages, list):
+            raise TypeError(
+                f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
+            )
+        for param, value in (
+            ("max_supply", max_supply),
+            ("supply_ids", supply_ids),
+            ("demand", demand),
+        ):
+            if value is not None and not isinstance(value, dict):
+                raise TypeError(
+                    f"Expected 'dict' type for {param}, got '{type(value)}'"
+                )
+        if problem_type.lower() != "lscp" and max_supply is None:
+            raise ValueError(
+                f"'max_supply' is required for '{problem_type.lower()}' scenarios"
+            )
+
+    @property
+    def problem_type(self):
+        """
+
+        :return: The type of problem to generate
+        :rtype: str
+        """
+        return self._problem_type
+
+    @property
+    def coverages(self):
+        """
+
+        :return: The base coverages used to create the problem
+        :rtype: list[~allagash.coverage.Coverage]
+        """
+        return self._coverages
+
+    @property
+    def name(self):
+        """
+
+        :return: The name identifying the scenario in the results
+        """
+        return self._name
+
+
+class ScenarioResult:
+    def __init__(
+        self, name, status, objective, selected_supply, selected_demand, exception=None
+    ):
+        """
+        The result of solving a :class:`~allagash.scenarios.Scenario`.
+
+        :param name: The name of the scenario
+        :param int status: The pulp status of the solution
+        :param float objective: The objective value, None if the scenario was not solved
+        :param dict[str,~pandas.Index] selected_supply: The selected supply locations keyed by supply name
+        :param dict[str,~pandas.Index] selected_demand: The covered demand locations keyed by demand name
+        :param Exception exception: (optional) The exception raised when solving the scenario
+        """
+        self._name = name
+        self._status = status
+        self._objective = objective
+        self._selected_supply = selected_supply
+        self._selected_demand = selected_demand
+        self._exception = exception
+
+    @property
+    def name(self):
+        """
+
+        :return: The name of the scenario
+        """
+        return self._name
+
+    @property
+    def status(self):
+        """
+
+        :return: The pulp status of the solution
+        :rtype: int
+        """
+        return self._status
+
+    @property
+    def objective(self):
+        """
+
+        :return: The objective value, None if the scenario was not solved
+        :rtype: float
+        """
+        return self._objective
+
+    @property
+    def exception(self):
+        """
+
+        :return: The exception raised when solving the scenario, None if it was solved
+        :rtype: Exception
+        """
+        return self._exception
+
+    def selected_supply(self, coverage):
+        """
+        Gets the supply locations that were selected in the scenario.
+
+        :param ~allagash.coverage.Coverage coverage: The coverage that selected locations may be found in
+        :return: The ids of the selected locations
+        :rtype: ~pandas.Index
+        """
+        self._raise_if_not_solved()
+        return self._selected_supply[coverage.supply_name]
+
+    def selected_demand(self, coverage):
+        """
+        Gets the demand locations that were covered in the scenario.
+
+        :param ~allagash.coverage.Coverage coverage: The coverage that the demand locations may be found in
+        :return: The ids of the covered locations
+        :rtype: ~pandas.Index
+        """
+        self._raise_if_not_solved()
+        return self._selected_demand[coverage.demand_name]
+
+    def _raise_if_not_solved(self):
+        if self._exception is not None:
+            raise RuntimeError(
+                f"Scenario '{self._name}' was not solved"
+            ) from self._exception
+
+
+class ScenarioRunner:
+    def __init__(self, coverages, n_jobs=1):
+        """
+        Solves many scenarios over the same base coverages in a pool of processes. The coverages are written once to
+        memory-mapped files, so every worker shares the same read-only coverage matrices instead of receiving a copy
+        with each scenario.
+
+        .. code-block:: python
+
+            runner = ScenarioRunner([coverage], n_jobs=8)
+            scenarios = [Scenario("mclp", coverage, max_supply={coverage: k}, name=k) for k in range(1, 201)]
+            for result in runner.run(scenarios, pulp.PULP_CBC_CMD(msg=False)):
+                print(result.name, result.objective, result.selected_supply(coverage))
+
+        :param list[~allagash.coverage.Coverage] coverages: The base coverages the scenarios are created from
+        :param int n_jobs: (optional) The number of processes to use. -1 uses all available CPUs. If not supplied, the
+                           scenarios are solved in this process.
+        """
+        if isinstance(coverages, Coverage):
+            coverages = [coverages]
+        if not isinstance(coverages, list):
+            raise TypeError(
+                f"Expected 'Coverage' or 'list' type for coverages, got '{type(coverages)}'"
+            )
+        Coverage._validate_n_jobs(n_jobs)
+        self._coverages = coverages
+        self._n_jobs = n_jobs
+
+    @property
+    def coverages(self):
+        """
+
+        :return: The base coverages the scenarios are created from
+        :rtype: list[~allagash.coverage.Coverage]
+        """
+        return self._coverages
+
+    def run(self, scenarios, solver):
+        """
+        Solves each scenario and yields the results as they complete, which is not necessarily the order of the
+        scenarios. Scenarios that can not be solved yield a result with the exception that was raised.
+
+        :param list[~allagash.scenarios.Scenario] scenarios: The scenarios to solve
+        :param solver: The solver to use, see :meth:`~allagash.problem.Problem.solve`
+        :return: A generator of the results
+        :rtype: generator[~allagash.scenarios.ScenarioResult]
+        """
+        specs = [self._spec(i, scenario) for i, scenario in enumerate(scenarios)]
+        n_jobs = Coverage._resolve_n_jobs(self._n_jobs, len(specs))
+        if n_jobs == 1:
+            for spec in specs:
+                yield _solve_scenario(self._coverages, spec, solver)
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for i, coverage in enumerate(self._coverages):
+                path = os.path.join(directory, f"coverage{i}.npz")
+                coverage.to_npz(path)
+                paths.append(path)
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_init_scenario_worker,
+                initargs=(paths,),
+            ) as executor:
+                futures = [
+                    executor.submit(_solve_worker_scenario, spec, solver)
+                    for spec in specs
+                ]
+                for future in as_completed(futures):
+                    yield future.result()
+
+    def _spec(self, position, scenario):
+        """
+        Replaces the coverages of a scenario with their position in the base coverages, so only the positions, ids and
+        demand arrays are sent to the workers.
+        """
+        if not isinstance(scenario, Scenario):
+            raise TypeError(
+                f"Expected 'Scenario' type for scenario, got '{type(scenario)}'"
+            )
+
+        def index(coverage):
+            for i, c in enumerate(self._coverages):
+                if c is coverage:
+                    return i
+            raise ValueError(
+                f"Coverage with supply named '{coverage.supply_name}' is not a base coverage of the runner"
+            )
+
+        return {
+            "name": position if scenario.name is None else scenario.name,
+            "problem_type": scenario.problem_type,
+            "coverages": [index(c) for c in scenario.coverages],
+            "max_supply": {index(c): v for c, v in scenario._max_supply.items()},
+            "supply_ids": {
+                index(c): np.asarray(v) for c, v in scenario._supply_ids.items()
+            },
+            "demand": {index(c): np.asarray(v) for c, v in scenario._demand.items()},
+        }
+
+
+_worker_coverages = []
+
+_exception_status = {
+    NotSolvedException: 0,
+    InfeasibleException: -1,
+    UnboundedException: -2,
+}
+
+
+def _init_scenario_worker(paths):
+    _worker_coverages[:] = [Coverage.read_npz(path, mmap=True) for path in paths]
+
+
+def _solve_worker_scenario(spec, solver):
+    return _solve_scenario(_worker_coverages, spec, solver)
+
+
+def _scenario_coverage(coverage, supply_ids, demand):
+    """
+    Creates the coverage of a scenario from a base coverage, keeping only some supply locations and replacing the
+    demand. The names are kept so the variables match the ones of the base coverage.
+    """
+    if supply_ids is not None:
+        coverage = coverage.subset(supply_ids=supply_ids)
+    if demand is None:
+        return coverage
+    if len(demand) != len(coverage.demand_ids):
+        raise ValueError(
+            f"Expected {len(coverage.demand_ids)} demand values, got {len(demand)}"
+        )
+    return Coverage.from_sparse_matrix(
+        coverage.matrix,
+        coverage.demand_ids,
+        coverage.supply_ids,
+        demand=demand,
+        demand_col=coverage.demand_col or "demand",
+        demand_name=coverage.demand_name,
+        supply_name=coverage.supply_name,
+        coverage_type=coverage.coverage_type,
+    )
+
+
+def _solve_scenario(base_coverages, spec, solver):
+    """
+    Builds and solves the problem of a scenario, returning the result instead of raising so one scenario that can not
+    be solved does not stop the others.
+    """
+    try:
+        coverages = {
+            i: _scenario_coverage(
+                base_coverages[i], spec["supply_ids"].get(i), spec["demand"].get(i)
+            )
+            for i in spec["coverages"]
+        }
+        coverage_list = list(coverages.values())
+        if spec["problem_type"] == "lscp":
+            problem = Problem.lscp(coverage_list)
+        else:
+            max_supply = {coverages[i]: v for i, v in spec["max_supply"].items()}
+            factory = getattr(Problem, spec["problem_type"])
+            problem = factory(coverage_list, max_supply)
+        problem.solve(solver)
+        if problem.solution is not None:
+            objective = problem.solution.objective
+        else:
+            import pulp
+
+            objective = pulp.value(problem.pulp_problem.objective)
+        return ScenarioResult(
+            spec["name"],
+            1,
+            objective,
+            {c.supply_name: problem.selected_supply(c) for c in coverage_list},
+            {c.demand_name: problem.selected_demand(c) for c in coverage_list},
+        )
+    except Exception as e:
+        status = _exception_status.get(type(e), -3)
+        return ScenarioResult(spec["name"], status, None, {}, {}, exception=e)
@@ -0,0 +1,992 @@
+import abc
+import copy
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .coverage import Coverage
+from .model import MatrixModel
+
+
+class MatrixSolution:
+    def __init__(self, status, column_values, col_names, objective, bound=None):
+        """
+        The solution found by a :class:`~allagash.solvers.MatrixSolver`.
+
+        :param int status: The status of the solution, using the pulp status codes. 1 if a solution was found, -1 if
+                           the problem is infeasible.
+        :param ~numpy.ndarray column_values: The value of each variable, in the order of the columns of the model
+        :param list[str] col_names: The name of each variable
+        :param float objective: The objective value of the solution
+        :param float bound: (optional) A bound on the optimal objective value, an upper bound for maximization problems
+                            and a lower bound for minimization problems. None if no bound was computed.
+        """
+        self._status = status
+        self._column_values = column_values
+        self._col_names = col_names
+        self._objective = objective
+        self._bound = bound
+
+    @property
+    def status(self):
+        """
+
+        :return: The status of the solution, using the pulp status codes
+        :rtype: int
+        """
+        return self._status
+
+    @property
+    def column_values(self):
+        """
+
+        :return: The value of each variable, in the order of the columns of the model
+        :rtype: ~numpy.ndarray
+        """
+        return self._column_values
+
+    @property
+    def values(self):
+        """
+
+        :return: The value of each variable, keyed by the name of the variable
+        :rtype: dict[str,int]
+        """
+        return dict(zip(self._col_names, self._column_values.tolist()))
+
+    @property
+    def objective(self):
+        """
+
+        :return: The objective value of the solution
+        :rtype: float
+        """
+        return self._objective
+
+    @property
+    def bound(self):
+        """
+
+        :return: The bound on the optimal objective value, None if no bound was computed
+        :rtype: float
+        """
+        return self._bound
+
+    @property
+    def gap(self):
+        """
+
+        :return: The relative optimality gap between the objective and the bound, None if no bound was computed. A gap
+                 of 0 means the solution is optimal.
+        :rtype: float
+        """
+        if self._bound is None or self._objective is None:
+            return None
+        if self._bound == self._objective:
+            return 0.0
+        return abs(self._bound - self._objective) / max(
+            abs(self._bound), abs(self._objective)
+        )
+
+
+# The former name of MatrixSolution, kept for compatibility
+HeuristicSolution = MatrixSolution
+
+
+class MatrixSolver(abc.ABC):
+    _problem_types = []
+
+    def solve(self, model, problem_type):
+        """
+        Solves a problem from its :class:`~allagash.model.MatrixModel`, without generating the pulp problem.
+
+        :param ~allagash.model.MatrixModel model: The model of the problem to solve
+        :param str problem_type: The type of problem, such as "lscp" or "mclp"
+        :return: The solution
+        :rtype: ~allagash.solvers.MatrixSolution
+        """
+        if not isinstance(model, MatrixModel):
+            raise TypeError(
+                f"Expected 'MatrixModel' type for model, got '{type(model)}'"
+            )
+        if problem_type not in self._problem_types:
+            raise ValueError(
+                f"{type(self).__name__} can not solve '{problem_type}' problems"
+            )
+        return self._solve(model, problem_type)
+
+    @abc.abstractmethod
+    def _solve(self, model, problem_type):
+        """
+        Solves a model of one of the types of problems of the solver.
+        """
+
+
+class HeuristicSolver(MatrixSolver):
+    _problem_types = ["lscp", "mclp"]
+
+    def _solve(self, model, problem_type):
+        # Heuristics work directly on the constraint matrix of LSCP and MCLP models, without a MIP solver
+        if problem_type == "lscp":
+            return self._solve_lscp(model)
+        return self._solve_mclp(model)
+
+    @abc.abstractmethod
+    def _solve_lscp(self, model):
+        """
+        Solves an LSCP model.
+        """
+
+    @abc.abstractmethod
+    def _solve_mclp(self, model):
+        """
+        Solves an MCLP model.
+        """
+
+    @staticmethod
+    def _mclp_arrays(model):
+        # The MCLP model has a variable and a constraint for each demand location, followed by the supply variables
+        # and one constraint limiting the number of supply locations of each coverage (the rows without lower bound)
+        n_demand = np.count_nonzero(np.isfinite(model.row_lower))
+        coverage = model.matrix[:n_demand, n_demand:].tocsc()
+        groups = model.matrix[n_demand:, n_demand:].tocsc()
+        weights = model.objective[:n_demand]
+        budgets = np.floor(model.row_upper[n_demand:] + 1e-9).astype(int)
+        return n_demand, coverage, groups, weights, budgets
+
+    @staticmethod
+    def _greedy_mclp(coverage, groups, weights, budgets, order=None):
+        """
+        Selects the supply location with the largest marginal coverage until the budgets are used. Marginal coverage
+        only decreases as locations are selected, so stale gains in the priority queue are upper bounds and only the
+        location at the top of the queue has to be evaluated again (lazy greedy). If a list is supplied as order, the
+        selected locations are appended to it as they are selected.
+        """
+        covered = np.zeros(coverage.shape[0], dtype=bool)
+        remaining = budgets.copy()
+        selected = np.zeros(coverage.shape[1], dtype=bool)
+        gains = coverage.T.dot(weights)
+        heap = [(-gain, j) for j, gain in enumerate(gains.tolist()) if gain > 0]
+        heapq.heapify(heap)
+        while heap and remaining.max(initial=0) > 0:
+            _, j = heapq.heappop(heap)
+            column_groups = groups.indices[groups.indptr[j] : groups.indptr[j + 1]]
+            if np.any(remaining[column_groups] <= 0):
+                continue
+            rows = coverage.indices[coverage.indptr[j] : coverage.indptr[j + 1]]
+            gain = weights[rows[~covered[rows]]].sum()
+            if gain <= 0:
+                continue
+            if heap and gain < -heap[0][0]:
+                heapq.heappush(heap, (-gain, j))
+                continue
+            selected[j] = True
+            covered[rows] = True
+            remaining[column_groups] -= 1
+            if order is not None:
+                order.append(j)
+        return selected, covered
+
+    @staticmethod
+    def _greedy_lscp(coverage, costs, selected=None):
+        """
+        Selects the supply location covering the most uncovered demand locations per unit of cost until every demand
+        location is covered, then removes locations that became redundant. The selection can be started from an
+        existing set of locations.
+        """
+        if selected is None:
+            selected = np.zeros(coverage.shape[1], dtype=bool)
+        selected = selected.copy()
+        order = np.flatnonzero(selected).tolist()
+        counts = np.zeros(coverage.shape[0], dtype=int)
+        for j in order:
+            counts[coverage.indices[coverage.indptr[j] : coverage.indptr[j + 1]]] += 1
+        sizes = np.diff(coverage.indptr)
+        heap = [
+            (-sizes[j] / costs[j], j)
+            for j in np.flatnonzero((sizes > 0) & ~selected).tolist()
+        ]
+        heapq.heapify(heap)
+        while heap and not counts.all():
+            _, j = heapq.heappop(heap)
+            rows = coverage.indices[coverage.indptr[j] : coverage.indptr[j + 1]]
+            ratio = np.count_nonzero(counts[rows] == 0) / costs[j]
+            if ratio <= 0:
+                continue
+            if heap and ratio < -heap[0][0]:
+                heapq.heappush(heap, (-ratio, j))
+                continue
+            selected[j] = True
+            counts[rows] += 1
+            order.append(j)
+        if not counts.all():
+            return None
+        # The locations selected first may be covered entirely by locations selected later
+        for j in order:
+            rows = coverage.indices[coverage.indptr[j] : coverage.indptr[j + 1]]
+            if np.all(counts[rows] > 1):
+                selected[j] = False
+                counts[rows] -= 1
+        return selected
+
+
+class GreedySolver(HeuristicSolver):
+    def __init__(self):
+        """
+        Solves LSCP and MCLP problems greedily. MCLP selects the supply location adding the most covered demand until
+        the maximum number of supply locations is reached, LSCP selects the supply location covering the most
+        uncovered demand locations until every demand location is covered. No bound is computed, use
+        :class:`~allagash.solvers.LagrangianSolver` to know how far the solution may be from the optimum.
+
+        .. code-block:: python
+
+            problem.solve(GreedySolver())
+        """
+        super().__init__()
+
+    def _solve_lscp(self, model):
+        selected = self._greedy_lscp(model.matrix.tocsc(), model.objective)
+        if selected is None:
+            return MatrixSolution(
+                -1, np.zeros(len(model.col_names), dtype=int), model.col_names, None
+            )
+        return MatrixSolution(
+            1,
+            selected.astype(int),
+            model.col_names,
+            float(model.objective[selected].sum()),
+        )
+
+    def _solve_mclp(self, model):
+        n_demand, coverage, groups, weights, budgets = self._mclp_arrays(model)
+        selected, covered = self._greedy_mclp(coverage, groups, weights, budgets)
+        return MatrixSolution(
+            1,
+            np.concatenate([covered, selected]).astype(int),
+            model.col_names,
+            float(weights[covered].sum()),
+        )
+
+
+class LagrangianSolver(HeuristicSolver):
+    def __init__(self, iterations=200, tolerance=1e-4):
+        """
+        Solves LSCP and MCLP problems greedily and computes a bound on the optimal objective using Lagrangian
+        relaxation of the coverage constraints, so the optimality gap of the solution is known. The multipliers are
+        improved with subgradient optimization and each relaxed solution that is feasible, or can be made feasible,
+        is kept if it is better than the greedy solution.
+
+        .. code-block:: python
+
+            problem.solve(LagrangianSolver(iterations=500))
+            problem.solution.gap
+
+        :param int iterations: (optional) The maximum number of subgradient iterations. If not supplied, 200 is used.
+        :param float tolerance: (optional) The relative gap at which to stop. If not supplied, 1e-4 is used.
+        """
+        super().__init__()
+        if not isinstance(iterations, int):
+            raise TypeError(
+                f"Expected 'int' type for iterations, got '{type(iterations)}'"
+            )
+        if not isinstance(tolerance, (int, float)):
+            raise TypeError(
+                f"Expected 'float' type for tolerance, got '{type(tolerance)}'"
+            )
+        self._iterations = iterations
+        self._tolerance = tolerance
+
+    @property
+    def iterations(self):
+        """
+
+        :return: The maximum number of subgradient iterations
+        :rtype: int
+        """
+        return self._iterations
+
+    @property
+    def tolerance(self):
+        """
+
+        :return: The relative gap at which to stop
+        :rtype: float
+        """
+        return self._tolerance
+
+    def _solve_mclp(self, model):
+        n_demand, coverage, groups, weights, budgets = self._mclp_arrays(model)
+        best, covered = self._greedy_mclp(coverage, groups, weights, budgets)
+        best_objective = weights[covered].sum()
+        coverage_rows = coverage.tocsr()
+        group_rows = groups.tocsr()
+        group_columns = [
+            group_rows.indices[group_rows.indptr[g] : group_rows.indptr[g + 1]]
+            for g in range(len(budgets))
+        ]
+
+        # max sum(w_i y_i) with y_i <= sum_j a_ij x_j relaxed by multipliers u_i >= 0:
+        # L(u) = sum_i max(0, w_i - u_i) + the best budgeted selection of columns with value sum_i a_ij u_i
+        multipliers = weights.astype(float).copy()
+        bound = math.inf
+        step_scale = 2.0
+        stalled = 0
+        for _ in range(self._iterations):
+            demand_values = np.maximum(weights - multipliers, 0)
+            column_values = coverage.T.dot(multipliers)
+            x = np.zeros(coverage.shape[1], dtype=bool)
+            value = demand_values.sum()
+            for columns, budget in zip(group_columns, budgets.tolist()):
+                if budget <= 0 or len(columns) == 0:
+                    continue
+                candidates = columns[column_values[columns] > 0]
+                if len(candidates) > budget:
+                    top = np.argpartition(-column_values[candidates], budget - 1)
+                    candidates = candidates[top[:budget]]
+                x[candidates] = True
+                value += column_values[candidates].sum()
+            if value < bound - 1e-9:
+                bound = value
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled >= 10:
+                    step_scale /= 2
+                    stalled = 0
+
+            # The relaxed selection respects the budgets unless supply locations are shared between coverages
+            if np.all(groups.dot(x.astype(int)) <= budgets):
+                x_covered = coverage_rows.dot(x.astype(int)) > 0
+                objective = weights[x_covered].sum()
+                if objective > best_objective:
+                    best, covered, best_objective = x, x_covered, objective
+            if bound - best_objective <= self._tolerance * max(abs(bound), 1):
+                break
+
+            y = weights - multipliers > 0
+            subgradient = coverage_rows.dot(x.astype(int)) - y
+            norm = float(np.dot(subgradient, subgradient))
+            if norm == 0:
+                break
+            step = step_scale * (value - best_objective) / norm
+            multipliers = np.maximum(multipliers - step * subgradient, 0)
+
+        return MatrixSolution(
+            1,
+            np.concatenate([covered, best]).astype(int),
+            model.col_names,
+            float(best_objective),
+            float(min(bound, weights.sum())),
+        )
+
+    def _solve_lscp(self, model):
+        coverage = model.matrix.tocsc()
+        costs = model.objective
+        best = self._greedy_lscp(coverage, costs)
+        if best is None:
+            return MatrixSolution(
+                -1, np.zeros(len(model.col_names), dtype=int), model.col_names, None
+            )
+        best_objective = costs[best].sum()
+        coverage_rows = coverage.tocsr()
+        integer_costs = np.all(costs == np.round(costs))
+
+        # min sum(c_j x_j) with sum_j a_ij x_j >= 1 relaxed by multipliers u_i >= 0:
+        # L(u) = sum_i u_i + sum_j min(0, c_j - sum_i a_ij u_i)
+        multipliers = np.zeros(coverage.shape[0])
+        bound = -math.inf
+        step_scale = 2.0
+        stalled = 0
+        for _ in range(self._iterations):
+            reduced_costs = costs - coverage.T.dot(multipliers)
+            x = reduced_costs < 0
+            value = multipliers.sum() + reduced_costs[x].sum()
+            if value > bound + 1e-9:
+                bound = value
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled >= 10:
+                    step_scale /= 2
+                    stalled = 0
+
+            # The relaxed selection is completed into a cover greedily
+            counts = coverage_rows.dot(x.astype(int))
+            candidate = self._greedy_lscp(coverage, costs, x)
+            if candidate is not None and costs[candidate].sum() < best_objective:
+                best, best_objective = candidate, costs[candidate].sum()
+            lower = math.ceil(bound - 1e-9) if integer_costs else bound
+            if best_objective - lower <= self._tolerance * max(abs(lower), 1):
+                break
+
+            subgradient = 1 - counts
+            norm = float(np.dot(subgradient, subgradient))
+            if norm == 0:
+                break
+            step = step_scale * (best_objective - value) / norm
+            multipliers = np.maximum(multipliers + step * subgradient, 0)
+
+        if integer_costs:
+            bound = math.ceil(bound - 1e-9)
+        return MatrixSolution(
+            1,
+            best.astype(int),
+            model.col_names,
+            float(best_objective),
+            float(max(bound, 0)),
+        )
+
+
+class HighsSolver(MatrixSolver):
+    _problem_types = [
+        "lscp",
+        "mclp",
+        "bclp",
+        "cmclp",
+        "clscp",
+        "pmedian",
+        "pcenter",
+    ]
+
+    def __init__(self, time_limit=None, mip_gap=None, threads=None, msg=False):
+        """
+        Solves any type of problem to optimality with HiGHS. The constraint matrix of the model is passed to
+        HiGHS in memory through the highspy package, so no files are written and no solver process is started. This
+        makes many small solves, such as the scenarios of a :class:`~allagash.scenarios.ScenarioRunner`, much faster
+        than with a pulp solver. The highspy package is required.
+
+        .. code-block:: python
+
+            problem.solve(HighsSolver(time_limit=60, mip_gap=0.01))
+            problem.solution.gap
+
+        :param float time_limit: (optional) The maximum number of seconds to solve for. If not supplied, there is no
+                                 limit. The best solution found within the limit is kept.
+        :param float mip_gap: (optional) The relative gap at which to stop. If not supplied, the HiGHS default is used.
+        :param int threads: (optional) The number of threads to use. If not supplied, HiGHS chooses.
+        :param bool msg: (optional) Whether to show the solver output. If not supplied, the default is False.
+        """
+        super().__init__()
+        for param, value in (("time_limit", time_limit), ("mip_gap", mip_gap)):
+            if value is not None and not isinstance(value, (int, float)):
+                raise TypeError(
+                    f"Expected 'float' type for {param}, got '{type(value)}'"
+                )
+            if value is not None and value < 0:
+                raise ValueError(f"Invalid {param} '{value}'")
+        if threads is not None and not isinstance(threads, int):
+            raise TypeError(f"Expected 'int' type for threads, got '{type(threads)}'")
+        if threads is not None and threads < 1:
+            raise ValueError(f"Invalid threads '{threads}'")
+        if not isinstance(msg, bool):
+            raise TypeError(f"Expected 'bool' type for msg, got '{type(msg)}'")
+        self._time_limit = time_limit
+        self._mip_gap = mip_gap
+        self._threads = threads
+        self._msg = msg
+
+    @property
+    def time_limit(self):
+        """
+
+        :return: The maximum number of seconds to solve for, None if there is no limit
+        :rtype: float
+        """
+        return self._time_limit
+
+    @property
+    def mip_gap(self):
+        """
+
+        :return: The relative gap at which to stop, None if the HiGHS default is used
+        :rtype: float
+        """
+        return self._mip_gap
+
+    @property
+    def threads(self):
+        """
+
+        :return: The number of threads to use, None if HiGHS chooses
+        :rtype: int
+        """
+        return self._threads
+
+    def _solve(self, model, problem_type):
+        # Every type of problem is solved from its model as is
+        import highspy
+
+        h = highspy.Highs()
+        h.setOptionValue("output_flag", self._msg)
+        if self._time_limit is not None:
+            h.setOptionValue("time_limit", float(self._time_limit))
+        if self._mip_gap is not None:
+            h.setOptionValue("mip_rel_gap", float(self._mip_gap))
+        if self._threads is not None:
+            h.setOptionValue("threads", self._threads)
+        h.passModel(self._highs_lp(highspy, model))
+        h.run()
+
+        model_status = h.getModelStatus()
+        info = h.getInfo()
+        has_solution = info.primal_solution_status == highspy.kSolutionStatusFeasible
+        n_cols = len(model.col_names)
+        if model_status == highspy.HighsModelStatus.kOptimal:
+            status = 1
+        elif model_status == highspy.HighsModelStatus.kModelEmpty:
+            # HiGHS does not check the constraints of a model without variables
+            feasible = np.all(model.row_lower <= 0) and np.all(model.row_upper >= 0)
+            status = 1 if feasible else -1
+        elif model_status in (
+            highspy.HighsModelStatus.kInfeasible,
+            # Every variable is bounded, so the problem can not be unbounded
+            highspy.HighsModelStatus.kUnboundedOrInfeasible,
+        ):
+            status = -1
+        elif model_status == highspy.HighsModelStatus.kUnbounded:
+            status = -2
+        else:
+            # Stopped by a limit, the best solution found so far is kept
+            status = 1 if has_solution else 0
+        if status != 1:
+            return MatrixSolution(
+                status, np.zeros(n_cols, dtype=int), model.col_names, None
+            )
+        column_values = np.asarray(h.getSolution().col_value, dtype=float)
+        column_values[model.integer] = np.round(column_values[model.integer])
+        if np.all(model.integer):
+            column_values = column_values.astype(int)
+        bound = info.mip_dual_bound if np.any(model.integer) else None
+        return MatrixSolution(
+            status,
+            column_values,
+            model.col_names,
+            # Computed from the rounded values, the HiGHS objective carries its integrality tolerance
+            float(model.objective.dot(column_values)),
+            None if bound is None or not np.isfinite(bound) else float(bound),
+        )
+
+    @staticmethod
+    def _highs_lp(highspy, model):
+        matrix = model.matrix.tocsc()
+        lp = highspy.HighsLp()
+        lp.num_col_ = matrix.shape[1]
+        lp.num_row_ = matrix.shape[0]
+        lp.sense_ = (
+            highspy.ObjSense.kMaximize
+            if model.sense == "maximize"
+            else highspy.ObjSense.kMinimize
+        )
+        lp.col_cost_ = model.objective
+        lp.col_lower_ = model.col_lower
+        lp.col_upper_ = model.col_upper
+        lp.row_lower_ = model.row_lower
+        lp.row_upper_ = model.row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = matrix.indptr
+        lp.a_matrix_.index_ = matrix.indices
+        lp.a_matrix_.value_ = matrix.data
+        lp.integrality_ = [
+            highspy.HighsVarType.kInteger
+            if integer
+            else highspy.HighsVarType.kContinuous
+            for integer in model.integer.tolist()
+        ]
+        return lp
+
+
+class DecompositionSolver(MatrixSolver):
+    _problem_types = ["lscp", "mclp"]
+
+    def __init__(self, solver, n_jobs=1):
+        """
+        Splits a problem into the connected components of its coverage, the groups of demand and supply locations that
+        are only linked to each other, and solves each component as a smaller problem with another solver. The
+        components of an LSCP are independent, so their selections are combined. For MCLP, the maximum number of supply
+        locations is split between the components by dynamic programming over the coverage of each component for 1,
+        2, ... supply locations. The coverage is bounded with greedy selections and a component is only solved for the
+        numbers of supply locations that can still be part of the best split.
+
+        The combined solution is optimal if the solver finds optimal solutions of the components. Regional problems
+        often split into hundreds of small components, which are solved much faster than one large problem. MCLP
+        problems can only be solved if they have one maximum number of supply locations.
+
+        .. code-block:: python
+
+            problem.solve(DecompositionSolver(HighsSolver(), n_jobs=4))
+
+        :param solver: The solver to use for each component. Either a pulp solver or a
+                       :class:`~allagash.solvers.MatrixSolver`.
+        :type solver: ~pulp.solvers.LpSolver or ~allagash.solvers.MatrixSolver
+        :param int n_jobs: (optional) The number of processes solving components in parallel. -1 uses all available
+                           CPUs. If not supplied, the default is 1.
+        """
+        super().__init__()
+        if not isinstance(solver, MatrixSolver):
+            import pulp
+
+            if not isinstance(solver, pulp.LpSolver):
+                raise TypeError(
+                    f"Expected 'LpSolver' or 'MatrixSolver' type for solver, got '{type(solver)}'"
+                )
+        Coverage._validate_n_jobs(n_jobs)
+        self._solver = solver
+        self._n_jobs = n_jobs
+
+    @property
+    def solver(self):
+        """
+
+        :return: The solver used for each component
+        :rtype: ~pulp.solvers.LpSolver or ~allagash.solvers.MatrixSolver
+        """
+        return self._solver
+
+    @property
+    def n_jobs(self):
+        """
+
+        :return: The number of processes solving components in parallel
+        :rtype: int
+        """
+        return self._n_jobs
+
+    @staticmethod
+    def components(coverage):
+        """
+        Finds the connected components of a coverage matrix, where a demand location and a supply location are
+        connected if the supply location covers the demand location.
+
+        :param ~scipy.sparse.spmatrix coverage: A matrix of demand (rows) and supply (columns)
+        :return: The number of components and the component of each demand and supply location
+        :rtype: tuple(int,~numpy.ndarray,~numpy.ndarray)
+        """
+        import scipy.sparse.csgraph
+
+        n_demand, n_supply = coverage.shape
+        coverage = scipy.sparse.csr_matrix(coverage)
+        graph = scipy.sparse.bmat([[None, coverage], [coverage.T, None]], format="csr")
+        n_components, labels = scipy.sparse.csgraph.connected_components(
+            graph, directed=False
+        )
+        return n_components, labels[:n_demand], labels[n_demand:]
+
+    def _solve(self, model, problem_type):
+        if problem_type == "lscp":
+            return self._solve_lscp(model)
+        return self._solve_mclp(model)
+
+    def _solve_lscp(self, model):
+        n_cols = len(model.col_names)
+        matrix = model.matrix.tocsr()
+        if np.any(np.diff(matrix.indptr) == 0):
+            # A demand location that no supply location covers can not be covered in any component
+            return MatrixSolution(
+                -1, np.zeros(n_cols, dtype=int), model.col_names, None
+            )
+        _, demand_labels, supply_labels = self.components(matrix)
+        groups = [
+            (rows, np.flatnonzero(supply_labels == label))
+            for label, rows in _groups(demand_labels)
+        ]
+        if len(groups) == 1:
+            return _solve_component_model(self._solver, model, "lscp")
+        tasks = [
+            (self._solver, _component_model(model, matrix, rows, cols), "lscp")
+            for rows, cols in groups
+        ]
+        column_values = np.zeros(n_cols, dtype=int)
+        bounds = []
+        for (_, cols), solution in zip(groups, self._map(_solve_component, tasks)):
+            if solution.status != 1:
+                return MatrixSolution(
+                    solution.status,
+                    np.zeros(n_cols, dtype=int),
+                    model.col_names,
+                    None,
+                )
+            column_values[cols] = solution.column_values
+            bounds.append(solution.bound)
+        return MatrixSolution(
+            1,
+            column_values,
+            model.col_names,
+            float(model.objective.dot(column_values)),
+            None if None in bounds else float(sum(bounds)),
+        )
+
+    def _solve_mclp(self, model):
+        n_demand, coverage, _, weights, budgets = HeuristicSolver._mclp_arrays(model)
+        if len(budgets) != 1:
+            raise ValueError(
+                "DecompositionSolver can only solve MCLP problems with one maximum supply"
+            )
+        budget = int(budgets[0])
+        n_cols = len(model.col_names)
+        _, demand_labels, supply_labels = self.components(coverage)
+        # Components without supply locations cover nothing and components without demand locations are never used
+        groups = [
+            (rows, np.flatnonzero(supply_labels == label))
+            for label, rows in _groups(demand_labels)
+        ]
+        groups = [(rows, cols) for rows, cols in groups if len(cols)]
+        if len(groups) == 1:
+            return _solve_component_model(self._solver, model, "mclp")
+        matrix = model.matrix.tocsr()
+        coverage = coverage.tocsr()
+        curves = [
+            _CoverageCurve(
+                coverage[rows][:, cols].tocsc(),
+                matrix[[n_demand]][:, n_demand + cols].tocsc(),
+                weights[rows],
+                budget,
+                float(weights[rows].sum()),
+            )
+            for rows, cols in groups
+        ]
+        if sum(len(c.lower) for c in curves) <= budget and all(
+            c.saturated for c in curves
+        ):
+            # The greedy selections cover all of the demand within the maximum number of supply locations
+            allocation = [len(c.lower) for c in curves]
+            bound = None
+        else:
+            models = {}
+            while True:
+                # Only the points used by the best split of the upper bounds can improve the solution, so they are
+                # solved until every point of that split is known
+                allocation = _allocate_budget([c.upper for c in curves], budget)
+                pending = [
+                    (i, k)
+                    for i, k in enumerate(allocation)
+                    if k > 0 and not curves[i].solved[k - 1]
+                ]
+                if not pending:
+                    break
+                tasks = []
+                for i, k in pending:
+                    if i not in models:
+                        rows, cols = groups[i]
+                        models[i] = _component_model(
+                            model,
+                            matrix,
+                            np.append(rows, n_demand),
+                            np.concatenate([rows, n_demand + cols]),
+                        )
+                    # The last row limits the number of supply locations
+                    component_model = copy.copy(models[i])
+                    component_model._row_upper = component_model.row_upper.copy()
+                    component_model._row_upper[-1] = k
+                    tasks.append((self._solver, component_model, "mclp"))
+                for (i, k), solution in zip(
+                    pending, self._map(_solve_component, tasks)
+                ):
+                    if solution.status != 1:
+                        return MatrixSolution(
+                            solution.status,
+                            np.zeros(n_cols, dtype=int),
+                            model.col_names,
+                            None,
+                        )
+                    curves[i].update(k, solution)
+            bound = float(
+                sum(c.upper[k - 1] for c, k in zip(curves, allocation) if k > 0)
+            )
+            allocation = _allocate_budget([c.lower for c in curves], budget)
+
+        column_values = np.zeros(n_cols, dtype=int)
+        for (rows, cols), curve, k in zip(groups, curves, allocation):
+            if k > 0:
+                values = curve.solutions[k - 1].column_values
+                column_values[rows] = values[: len(rows)]
+                column_values[n_demand + cols] = values[len(rows) :]
+        objective = float(model.objective.dot(column_values))
+        return MatrixSolution(
+            1,
+            column_values,
+            model.col_names,
+            objective,
+            objective if bound is None else max(bound, objective),
+        )
+
+    def _map(self, function, tasks):
+        n_jobs = Coverage._resolve_n_jobs(self._n_jobs, len(tasks))
+        if n_jobs == 1:
+            return [function(task) for task in tasks]
+        # Most components are small, so they are sent to the processes in batches
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            return list(
+                executor.map(
+                    function,
+                    tasks,
+                    chunksize=max(1, len(tasks) // (4 * n_jobs)),
+                )
+            )
+
+
+def _groups(labels):
+    """
+    Groups the positions of the labels by label, in the order of the labels.
+    """
+    order = np.argsort(labels, kind="stable")
+    unique, starts = np.unique(labels[order], return_index=True)
+    return zip(unique.tolist(), np.split(order, starts[1:]))
+
+
+def _component_model(model, matrix, rows, cols):
+    """
+    Creates the model of the rows and columns of a component of a model.
+    """
+    return MatrixModel(
+        model.name,
+        model.sense,
+        model.objective[cols],
+        matrix[rows][:, cols],
+        model.row_lower[rows],
+        model.row_upper[rows].copy(),
+        [model.col_names[j] for j in cols.tolist()],
+        [model.row_names[i] for i in rows.tolist()],
+        col_lower=model.col_lower[cols],
+        col_upper=model.col_upper[cols],
+        integer=model.integer[cols],
+    )
+
+
+def _solve_component(task):
+    solver, model, problem_type = task
+    return _solve_component_model(solver, model, problem_type)
+
+
+class _CoverageCurve:
+    """
+    The coverage of a component of an MCLP model for 1, 2, ... supply locations, up to the last number or until the
+    greedy selection covers all of its demand (the target). The best known solutions are lower bounds of the optimal
+    coverage and the upper bounds come from the greedy selections, which cover at least 1 - (1 - 1/k)^k of the optimal
+    coverage of k supply locations. A point is solved once its best known solution is known to be optimal.
+    """
+
+    def __init__(self, coverage, groups, weights, last, target):
+        self.lower, self.upper, self.solved, self.solutions = [], [], [], []
+        self.saturated = False
+        largest = np.cumsum(np.sort(coverage.T.dot(weights))[::-1])
+        # The greedy selection of k supply locations is the first k locations of the greedy selection of the last
+        order = []
+        HeuristicSolver._greedy_mclp(coverage, groups, weights, np.array([last]), order)
+        selected = np.zeros(coverage.shape[1], dtype=int)
+        covered = np.zeros(coverage.shape[0], dtype=int)
+        for k, j in enumerate(order, start=1):
+            selected[j] = 1
+            covered[coverage.indices[coverage.indptr[j] : coverage.indptr[j + 1]]] = 1
+            objective = float(weights.dot(covered))
+            # One supply location and selections covering all of the demand are optimal
+            self.saturated = objective >= target - 1e-9
+            solved = k == 1 or self.saturated
+            self.lower.append(objective)
+            self.upper.append(
+                objective
+                if solved
+                else min(target, largest[k - 1], objective / (1 - (1 - 1 / k) ** k))
+            )
+            self.solved.append(solved)
+            self.solutions.append(
+                MatrixSolution(1, np.concatenate([covered, selected]), None, objective)
+            )
+        self._tighten()
+
+    def update(self, k, solution):
+        """
+        Records the solution of the model of the component with k supply locations.
+        """
+        self.solved[k - 1] = True
+        if solution.bound is not None:
+            self.upper[k - 1] = min(self.upper[k - 1], solution.bound)
+        # A selection of k supply locations is also a selection of at most k + 1, k + 2, ... supply locations
+        for j in range(k - 1, len(self.lower)):
+            if solution.objective > self.lower[j]:
+                self.lower[j] = solution.objective
+                self.solutions[j] = solution
+        self._tighten()
+
+    def _tighten(self):
+        # The optimal coverage never decreases with more supply locations, and removing the location covering the
+        # least demand from the best selection of k locations keeps at least (k - 1) / k of its coverage
+        for j in range(len(self.upper) - 2, -1, -1):
+            self.upper[j] = min(self.upper[j], self.upper[j + 1])
+        for j in range(1, len(self.upper)):
+            self.upper[j] = min(self.upper[j], self.upper[j - 1] * (j + 1) / j)
+        for j in range(len(self.lower)):
+            if self.lower[j] >= self.upper[j] - 1e-9:
+                self.solved[j] = True
+
+
+def _solve_component_model(solver, model, problem_type):
+    if isinstance(solver, MatrixSolver):
+        return solver.solve(model, problem_type)
+    import pulp
+    from .problem import Problem
+
+    problem = Problem._generate_model_problem(model)
+    problem.solve(solver)
+    if problem.status != 1:
+        return MatrixSolution(
+            problem.status,
+            np.zeros(len(model.col_names), dtype=int),
+            model.col_names,
+            None,
+        )
+    variables = problem.variablesDict()
+    # Variables that are not part of any constraint or the objective are not passed to the solver
+    column_values = np.array(
+        [
+            (variables[n].varValue or 0) if n in variables else 0
+            for n in model.col_names
+        ],
+        dtype=float,
+    )
+    column_values = np.round(column_values).astype(int)
+    objective = float(model.objective.dot(column_values))
+    # pulp reports an optimal status for solutions found before a time or gap limit as well, only the solution status
+    # (missing before pulp 1.6.1) tells proven optima apart
+    optimal = getattr(problem, "sol_status", None) == pulp.LpSolutionOptimal
+    return MatrixSolution(
+        1,
+        column_values,
+        model.col_names,
+        objective,
+        objective if optimal else None,
+    )
+
+
+def _allocate_budget(curves, budget):
+    """
+    Splits a budget between components to maximize the sum of their values (a grouped knapsack). Each curve holds the
+    value of a component for 1, 2, ... units of the budget, using no units is worth 0.
+
+    :param list[list[float]] curves: The value of each component for each number of units
+    :param int budget: The number of units to split
+    :return: The number of units of each component
+    :rtype: list[int]
+    """
+    # best[b] is the best value of the components so far using at most b units
+    best = np.zeros(budget + 1)
+    choices = []
+    for curve in curves:
+        values = np.concatenate([[0.0], np.asarray(curve, dtype=float)])
+        new = best.copy()
+        choice = np.zeros(budget + 1, dtype=int)
+        for k in range(1, len(values)):
+            candidate = np.full(budget + 1, -np.inf)
+            candidate[k:] = best[: budget + 1 - k] + values[k]
+            # Ties keep the fewest units
+            better = candidate > new
+            new[better] = candidate[better]
+            choice[better] = k
+        best = new
+        choices.append(choice)
+    allocation = []
+    remaining = budget
+    for choice in reversed(choices):
+        k = int(choice[remaining])
+        allocation.append(k)
+        remaining -= k
+    return allocation[::-1]
@@ -0,0 +1,148 @@
+import contextlib
+import logging
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # The resource module is not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class ProblemStats:
+    def __init__(self):
+        """
+        The time spent in each phase of building and solving a :class:`~allagash.problem.Problem`, along with the size
+        of the generated model. This is not intended to be created on it's own but rather accessed from
+        :attr:`~allagash.problem.Problem.stats`.
+
+        The phases are "validate", "presolve", "generate" (the pulp problem), "matrix_model", "write_mps", "solve" and
+        "read_solution". A phase that runs more than once, such as solving after changing the maximum supply, adds to
+        its previous duration. Each phase is logged to the "allagash.stats" logger at the DEBUG level.
+
+        .. code-block:: python
+
+            problem = Problem.mclp(coverage, max_supply={coverage: 5})
+            problem.stats.add_callback(lambda phase, seconds, stats: print(phase, seconds))
+            problem.solve(pulp.PULP_CBC_CMD(msg=False))
+            problem.stats.to_dict()
+        """
+        self._durations = {}
+        self._variables = None
+        self._constraints = None
+        self._nonzeros = None
+        self._peak_memory = None
+        self._callbacks = []
+
+    @property
+    def durations(self):
+        """
+
+        :return: The number of seconds spent in each phase, in the order the phases first ran
+        :rtype: dict[str,float]
+        """
+        return dict(self._durations)
+
+    @property
+    def total_time(self):
+        """
+
+        :return: The number of seconds spent in all phases
+        :rtype: float
+        """
+        return sum(self._durations.values())
+
+    @property
+    def variables(self):
+        """
+
+        :return: The number of variables of the generated model, None if the model was not generated yet
+        :rtype: int
+        """
+        return self._variables
+
+    @property
+    def constraints(self):
+        """
+
+        :return: The number of constraints of the generated model, None if the model was not generated yet
+        :rtype: int
+        """
+        return self._constraints
+
+    @property
+    def nonzeros(self):
+        """
+
+        :return: The number of non-zero constraint coefficients of the generated model, None if the model was not
+                 generated yet
+        :rtype: int
+        """
+        return self._nonzeros
+
+    @property
+    def peak_memory(self):
+        """
+
+        :return: The peak resident memory of the process in bytes, measured at the end of the last phase. None if it
+                 can not be measured on this platform.
+        :rtype: int
+        """
+        return self._peak_memory
+
+    def add_callback(self, callback):
+        """
+        Adds a function that is called at the end of each phase with the name of the phase, the number of seconds it
+        took and these stats.
+
+        :param function callback: The function to call
+        :return: None
+        """
+        if not callable(callback):
+            raise TypeError(f"Expected callable for callback, got '{type(callback)}'")
+        self._callbacks.append(callback)
+
+    def to_dict(self):
+        """
+
+        :return: The stats as a dictionary that can be serialized to JSON
+        :rtype: dict
+        """
+        return {
+            "durations": self.durations,
+            "total_time": self.total_time,
+            "variables": self._variables,
+            "constraints": self._constraints,
+            "nonzeros": self._nonzeros,
+            "peak_memory": self._peak_memory,
+        }
+
+    def _set_size(self, variables, constraints, nonzeros):
+        self._variables = variables
+        self._constraints = constraints
+        self._nonzeros = nonzeros
+
+    @contextlib.contextmanager
+    def _phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Phases that raise, such as a failed solve, are still timed and reported
+            seconds = time.perf_counter() - start
+            self._durations[name] = self._durations.get(name, 0.0) + seconds
+            self._peak_memory = self._measure_peak_memory()
+            logger.debug("%s took %.6f seconds", name, seconds)
+            for callback in self._callbacks:
+                callback(name, seconds, self)
+
+    @staticmethod
+    def _measure_peak_memory():
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        return peak if sys.platform == "darwin" else peak * 1024
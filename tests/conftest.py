@@ -2,9 +2,10 @@ import os
 import arcgis
 import geopandas
 import pandas as pd
+import scipy.sparse
 from pulp import GLPK
 import pytest
-from allagash import Coverage
+from allagash import CostMatrix, Coverage
 from allagash import Problem
 
 dir_name = os.path.dirname(__file__)
@@ -28,6 +29,17 @@ def demand_points_dataframe():
     return demand_gdf
 
 
+@pytest.fixture(scope="class")
+def supply_points_dataframe():
+    supply_df = pd.DataFrame(
+        {"SupplyIdentifier": ["A", "B"], "Latitude": [1, 4], "Longitude": [1, 5]}
+    )
+    return geopandas.GeoDataFrame(
+        supply_df,
+        geometry=geopandas.points_from_xy(supply_df.Longitude, supply_df.Latitude),
+    )
+
+
 @pytest.fixture(scope="class")
 def demand_points_sedf(demand_points_dataframe):
     return arcgis.GeoAccessor.from_geodataframe(
@@ -123,6 +135,30 @@ def binary_coverage(demand_points_dataframe, facility_service_areas_dataframe):
     )
 
 
+@pytest.fixture(scope="class")
+def binary_sparse_coverage(demand_points_dataframe, facility_service_areas_dataframe):
+    return Coverage.from_geodataframes(
+        demand_points_dataframe,
+        facility_service_areas_dataframe,
+        "DemandIdentifier",
+        "SupplyIdentifier",
+        demand_col="Value",
+        sparse=True,
+    )
+
+
+@pytest.fixture(scope="class")
+def binary_sparse_coverage2(demand_points_dataframe, facility2_service_areas_dataframe):
+    return Coverage.from_geodataframes(
+        demand_points_dataframe,
+        facility2_service_areas_dataframe,
+        "DemandIdentifier",
+        "SupplyIdentifier",
+        demand_col="Value",
+        sparse=True,
+    )
+
+
 @pytest.fixture(scope="class")
 def binary_coverage_no_demand(
     demand_points_dataframe, facility_service_areas_dataframe
@@ -229,3 +265,39 @@ def mclp_problem_solved(binary_coverage, binary_coverage2):
     )
     problem.solve(GLPK())
     return problem
+
+
+@pytest.fixture(scope="class")
+def cost_matrix():
+    return CostMatrix.from_distance_matrix(
+        pd.DataFrame(
+            [[1, 5, 9], [2, 4, 8], [9, 1, 3], [8, 6, 1]],
+            index=[1, 2, 3, 4],
+            columns=["A", "B", "C"],
+        ),
+        demand=[10, 10, 10, 10],
+        demand_col="Population",
+        supply_name="Facility",
+    )
+
+
+@pytest.fixture(scope="class")
+def component_coverage():
+    # Demand 1, 3 and 5 are only covered by A and B, demand 2, 4 and 6 are only covered by C and D
+    return Coverage.from_sparse_matrix(
+        scipy.sparse.csr_matrix(
+            [
+                [1, 0, 0, 0],
+                [0, 0, 1, 0],
+                [1, 1, 0, 0],
+                [0, 0, 1, 1],
+                [0, 1, 0, 0],
+                [0, 0, 0, 1],
+            ]
+        ),
+        [1, 2, 3, 4, 5, 6],
+        ["A", "B", "C", "D"],
+        demand=[10, 40, 20, 50, 30, 60],
+        demand_col="Population",
+        supply_name="Facility",
+    )
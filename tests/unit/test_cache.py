@@ -0,0 +1,165 @@
+import os
+import numpy as np
+import pytest
+from allagash.cache import CoverageCache
+from allagash.coverage import Coverage
+
+
+class TestCoverageCache:
+    def test_init(self, tmp_path):
+        cache = CoverageCache(tmp_path / "cache")
+        assert os.path.isdir(cache.directory)
+        assert cache.max_size is None
+        assert len(cache) == 0
+
+    def test_init_invalid_directory(self):
+        with pytest.raises(TypeError) as e:
+            CoverageCache(None)
+        assert (
+            e.value.args[0]
+            == "Expected 'str' or 'PathLike' type for directory, got '<class 'NoneType'>'"
+        )
+
+    def test_init_invalid_max_size(self, tmp_path):
+        with pytest.raises(ValueError) as e:
+            CoverageCache(tmp_path, max_size=-1)
+        assert e.value.args[0] == "Invalid max_size '-1'"
+
+    def test_from_geodataframes(
+        self, tmp_path, demand_points_dataframe, facility_service_areas_dataframe
+    ):
+        cache = CoverageCache(tmp_path)
+        c = cache.from_geodataframes(
+            demand_points_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            demand_col="Value",
+        )
+        assert len(cache) == 1
+        c2 = cache.from_geodataframes(
+            demand_points_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            demand_col="Value",
+            supply_name="Facilities",
+        )
+        assert len(cache) == 1
+        assert c2.supply_name == "Facilities"
+        assert c2.demand_col == "Value"
+        assert c2.df.equals(c.df)
+
+    def test_from_geodataframes_hit_skips_coverage(
+        self,
+        tmp_path,
+        monkeypatch,
+        demand_points_dataframe,
+        facility_service_areas_dataframe,
+    ):
+        cache = CoverageCache(tmp_path)
+        c = cache.from_geodataframes(
+            demand_points_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+        )
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Coverage was recomputed")
+
+        monkeypatch.setattr(Coverage, "from_geodataframes", fail)
+        c2 = cache.from_geodataframes(
+            demand_points_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            sparse=True,
+        )
+        assert c2.is_sparse
+        assert (c2.matrix != c.matrix).nnz == 0
+
+    def test_from_geodataframes_partial(
+        self, tmp_path, demand_polygon_dataframe, facility_service_areas_dataframe
+    ):
+        cache = CoverageCache(tmp_path)
+        args = (
+            demand_polygon_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+        )
+        binary = cache.from_geodataframes(*args, demand_col="Value")
+        partial = cache.from_geodataframes(
+            *args, demand_col="Value", coverage_type="partial"
+        )
+        partial2 = cache.from_geodataframes(
+            *args, demand_col="Value", coverage_type="partial"
+        )
+        assert len(cache) == 2
+        assert binary.coverage_type == "binary"
+        assert partial2.coverage_type == "partial"
+        assert np.allclose(partial.matrix.toarray(), partial2.matrix.toarray())
+
+    def test_from_spatially_enabled_dataframes(
+        self, tmp_path, binary_coverage, demand_points_sedf, facility_service_areas_sedf
+    ):
+        cache = CoverageCache(tmp_path)
+        for _ in range(2):
+            c = cache.from_spatially_enabled_dataframes(
+                demand_points_sedf,
+                facility_service_areas_sedf,
+                "DemandIdentifier",
+                "SupplyIdentifier",
+                demand_geometry_col="geometry",
+                supply_geometry_col="geometry",
+            )
+            assert (c.matrix != binary_coverage.matrix).nnz == 0
+        assert len(cache) == 1
+
+    def test_get_missing(self, tmp_path):
+        assert CoverageCache(tmp_path).get("missing") is None
+
+    def test_eviction(self, tmp_path, binary_coverage, binary_coverage2):
+        cache = CoverageCache(tmp_path)
+        cache.put("a", binary_coverage)
+        entry_size = cache.size
+        cache = CoverageCache(tmp_path, max_size=entry_size * 2)
+        os.utime(cache._path("a"), ns=(0, 0))
+        cache.put("b", binary_coverage2)
+        cache.put("c", binary_coverage)
+        assert "a" not in cache
+        assert "b" in cache
+        assert "c" in cache
+        assert cache.size <= cache.max_size
+
+    def test_eviction_removed_entries(self, tmp_path, binary_coverage, monkeypatch):
+        cache = CoverageCache(tmp_path, max_size=0)
+        entries = cache._entries
+        # Another process removed an entry after it was listed
+        monkeypatch.setattr(
+            cache, "_entries", lambda: entries() + [str(tmp_path / "gone.npz")]
+        )
+        cache.put("a", binary_coverage)
+        assert os.listdir(tmp_path) == []
+
+    def test_get_removed_entry(self, tmp_path, binary_coverage, monkeypatch):
+        cache = CoverageCache(tmp_path)
+        cache.put("a", binary_coverage)
+        read_npz = Coverage.read_npz
+
+        def read_and_remove(path, mmap=False):
+            # Another process evicts the entry right after it is read
+            coverage = read_npz(path, mmap)
+            os.remove(path)
+            return coverage
+
+        monkeypatch.setattr(Coverage, "read_npz", read_and_remove)
+        c = cache.get("a")
+        assert c.demand_ids.tolist() == binary_coverage.demand_ids.tolist()
+
+    def test_clear(self, tmp_path, binary_coverage):
+        cache = CoverageCache(tmp_path)
+        cache.put("a", binary_coverage)
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+import allagash.costs as costs_module
+from allagash.costs import CostMatrix
+
+
+class TestCostMatrix:
+    def test_init(self):
+        matrix = scipy.sparse.csr_matrix(
+            ([0.0, 5.0, 2.0, 1.0], ([0, 0, 1, 1], [0, 1, 0, 1])), shape=(2, 2)
+        )
+        costs = CostMatrix(matrix, [1, 2], ["A", "B"], demand_name="Demand")
+        assert costs.nnz == 4
+        assert costs.matrix.toarray().tolist() == [[0, 5], [2, 1]]
+        assert costs.demand_ids.tolist() == [1, 2]
+        assert costs.supply_ids.tolist() == ["A", "B"]
+        assert costs.demand_values is None
+        assert costs.demand_name == "Demand"
+        assert costs.k is None
+
+    def test_init_k(self):
+        matrix = scipy.sparse.csr_matrix([[3.0, 1.0, 2.0], [1.0, 2.0, 3.0]])
+        costs = CostMatrix(matrix, [1, 2], ["A", "B", "C"], k=2)
+        assert costs.k == 2
+        # The pairs of each demand location are ordered by cost
+        assert costs.matrix.indices.tolist() == [1, 2, 0, 1]
+        assert costs.matrix.toarray().tolist() == [[0, 1, 2], [1, 2, 0]]
+
+    def test_init_invalid_matrix(self):
+        with pytest.raises(TypeError) as e:
+            CostMatrix([[1]], [1], ["A"])
+        assert (
+            e.value.args[0]
+            == "Expected 'spmatrix' type for matrix, got '<class 'list'>'"
+        )
+
+    def test_init_invalid_demand_ids(self):
+        with pytest.raises(ValueError) as e:
+            CostMatrix(scipy.sparse.csr_matrix([[1]]), [1, 2], ["A"])
+        assert e.value.args[0] == "Expected 1 demand_ids, got 2"
+
+    def test_init_invalid_k(self):
+        with pytest.raises(ValueError) as e:
+            CostMatrix(scipy.sparse.csr_matrix([[1]]), [1], ["A"], k=0)
+        assert e.value.args[0] == "Invalid k '0'"
+
+    def test_init_infinite_cost(self):
+        with pytest.raises(ValueError) as e:
+            CostMatrix(scipy.sparse.csr_matrix([[np.inf]]), [1], ["A"])
+        assert e.value.args[0] == "Invalid costs, every stored cost must be finite"
+
+    def test_nearest(self):
+        costs = CostMatrix.from_distance_matrix(
+            pd.DataFrame([[3, 1, 2], [1, 1, 0]], columns=["A", "B", "C"]),
+            demand=[10, 20],
+            demand_col="Population",
+        )
+        nearest = costs.nearest(1)
+        assert nearest.k == 1
+        assert nearest.matrix.toarray().tolist() == [[0, 1, 0], [0, 0, 0]]
+        assert nearest.nnz == 2
+        assert nearest.demand_values.tolist() == [10, 20]
+        assert nearest.supply_name == costs.supply_name
+
+    def test_from_distance_matrix(self):
+        costs = CostMatrix.from_distance_matrix(
+            pd.DataFrame(
+                [[4, np.nan, 2], [0, 7, 9]], index=[1, 2], columns=["A", "B", "C"]
+            ),
+            k=2,
+        )
+        assert costs.demand_ids.tolist() == [1, 2]
+        assert costs.supply_ids.tolist() == ["A", "B", "C"]
+        assert costs.nnz == 4
+        assert costs.matrix.toarray().tolist() == [[4, 0, 2], [0, 7, 0]]
+        # A cost of 0 is kept
+        assert costs.matrix[1, 0] == 0
+        assert costs.matrix.indices[2:].tolist() == [0, 1]
+
+    def test_from_distance_matrix_invalid_costs(self):
+        with pytest.raises(TypeError) as e:
+            CostMatrix.from_distance_matrix(None)
+        assert (
+            e.value.args[0]
+            == "Expected 'Dataframe' type for costs, got '<class 'NoneType'>'"
+        )
+
+    def test_from_od_table(self, tmp_path):
+        od = pd.DataFrame(
+            {
+                "Origin": [1, 1, 1, 2, 2, 3, 1],
+                "Destination": ["A", "B", "C", "A", "B", "C", "A"],
+                "Minutes": [4, 12, 8, 20, 30, 9, 2],
+            }
+        )
+        od.to_csv(tmp_path / "od.csv", index=False)
+        costs = CostMatrix.from_od_table(
+            str(tmp_path / "od.csv"),
+            "Origin",
+            "Destination",
+            "Minutes",
+            k=2,
+            chunksize=2,
+        )
+        assert costs.demand_ids.tolist() == [1, 2, 3]
+        assert costs.supply_ids.tolist() == ["A", "B", "C"]
+        # The cheapest cost of a repeated pair is kept
+        assert costs.matrix.toarray().tolist() == [[2, 0, 8], [20, 30, 0], [0, 0, 9]]
+
+    def test_from_od_table_reduced_once(self, monkeypatch):
+        calls = []
+        nearest_pairs = costs_module._nearest_pairs
+
+        def count(*args):
+            calls.append(len(args[0]))
+            return nearest_pairs(*args)
+
+        monkeypatch.setattr(costs_module, "_nearest_pairs", count)
+        od = pd.DataFrame(
+            {
+                "Origin": [1, 1, 2, 2, 3],
+                "Destination": ["A", "B", "A", "B", "A"],
+                "Minutes": [4, 12, 8, 20, 9],
+            }
+        )
+        costs = CostMatrix.from_od_table(
+            od, "Origin", "Destination", "Minutes", chunksize=2
+        )
+        # Without k nothing can be dropped between chunks, so the pairs are only sorted once
+        assert calls == [5]
+        assert costs.nnz == 5
+
+    def test_from_od_table_max_cost(self):
+        chunks = [
+            pd.DataFrame({"Origin": [2], "Destination": ["A"], "Minutes": [3]}),
+            pd.DataFrame({"Origin": [1], "Destination": ["B"], "Minutes": [30]}),
+        ]
+        costs = CostMatrix.from_od_table(
+            iter(chunks),
+            "Origin",
+            "Destination",
+            "Minutes",
+            max_cost=10,
+            demand_ids=[1, 2],
+            supply_ids=["A", "B"],
+            demand=[10, 20],
+            demand_col="Population",
+        )
+        assert costs.matrix.toarray().tolist() == [[0, 0], [3, 0]]
+        assert costs.demand_values.tolist() == [10, 20]
+
+    def test_from_od_table_invalid_k(self):
+        od = pd.DataFrame({"Origin": [1], "Destination": ["A"], "Minutes": [3]})
+        with pytest.raises(TypeError) as e:
+            CostMatrix.from_od_table(od, "Origin", "Destination", "Minutes", k="1")
+        assert e.value.args[0] == "Expected 'int' type for k, got '<class 'str'>'"
+
+    def test_from_points(self, demand_points_dataframe, supply_points_dataframe):
+        costs = CostMatrix.from_points(
+            demand_points_dataframe,
+            supply_points_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            1,
+            demand_col="Value",
+        )
+        assert costs.nnz == 5
+        assert costs.matrix.indices.tolist() == [0, 0, 1, 1, 1]
+        assert costs.matrix.data.tolist() == pytest.approx(
+            [0, np.sqrt(2), np.sqrt(5), 1, 1]
+        )
+        assert costs.demand_values.tolist() == [100, 200, 300, 400, 500]
+
+    def test_from_points_max_cost(
+        self, demand_points_dataframe, supply_points_dataframe
+    ):
+        costs = CostMatrix.from_points(
+            demand_points_dataframe,
+            supply_points_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            2,
+            max_cost=1.5,
+        )
+        assert costs.matrix.toarray() == pytest.approx(
+            np.array([[0, 0], [np.sqrt(2), 0], [0, 0], [0, 1], [0, 1]])
+        )
+
+    def test_from_points_haversine(
+        self, demand_points_dataframe, supply_points_dataframe
+    ):
+        costs = CostMatrix.from_points(
+            demand_points_dataframe,
+            supply_points_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            1,
+            x_col="Longitude",
+            y_col="Latitude",
+            metric="haversine",
+        )
+        # One degree of latitude is about 111 km
+        assert costs.matrix[4, 1] == pytest.approx(111195, rel=1e-3)
+
+    def test_from_points_invalid_metric(
+        self, demand_points_dataframe, supply_points_dataframe
+    ):
+        with pytest.raises(ValueError) as e:
+            CostMatrix.from_points(
+                demand_points_dataframe,
+                supply_points_dataframe,
+                "DemandIdentifier",
+                "SupplyIdentifier",
+                1,
+                metric="manhattan",
+            )
+        assert e.value.args[0] == "Invalid metric 'manhattan'"
@@ -1,5 +1,11 @@
+import geopandas
+import numpy as np
+import pandas as pd
+import pulp
 import pytest
+import scipy.sparse
 from allagash.coverage import Coverage
+from allagash.problem import Problem
 
 
 class TestCoverage:
@@ -80,6 +86,24 @@ class TestCoverage:
         )
         assert isinstance(c, Coverage)
 
+    def test_from_coverage_dataframe_values(
+        self, demand_points_dataframe, facility_service_areas_dataframe
+    ):
+        c = Coverage.from_geodataframes(
+            demand_points_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            demand_col="Value",
+        )
+        assert c.df.index.name == "DemandIdentifier"
+        assert c.df.index.tolist() == [1, 2, 3, 4, 5]
+        assert c.df.columns.tolist() == ["Value", 1, 2, 3]
+        assert c.df["Value"].tolist() == [100, 200, 300, 400, 500]
+        assert c.df[1].tolist() == [True, True, True, False, False]
+        assert c.df[2].tolist() == [False, False, True, False, False]
+        assert c.df[3].tolist() == [False, False, True, True, False]
+
     def test_from_coverage_dataframe_partial(
         self, demand_polygon_dataframe, facility_service_areas_dataframe
     ):
@@ -529,3 +553,724 @@ class TestCoverage:
     def test_demand_col_property2(self, binary_coverage_dataframe):
         c = Coverage(binary_coverage_dataframe)
         assert c.demand_col is None
+
+    def test_is_sparse_property(self, binary_coverage, binary_sparse_coverage):
+        assert not binary_coverage.is_sparse
+        assert binary_sparse_coverage.is_sparse
+
+    def test_from_coverage_dataframe_sparse(
+        self, binary_coverage, binary_sparse_coverage
+    ):
+        assert isinstance(binary_sparse_coverage.matrix, scipy.sparse.csr_matrix)
+        assert (binary_sparse_coverage.matrix != binary_coverage.matrix).nnz == 0
+        assert binary_sparse_coverage.demand_ids.tolist() == [1, 2, 3, 4, 5]
+        assert binary_sparse_coverage.supply_ids.tolist() == [1, 2, 3]
+        assert binary_sparse_coverage.demand_values.tolist() == [
+            100,
+            200,
+            300,
+            400,
+            500,
+        ]
+
+    def test_from_coverage_dataframe_partial_sparse(
+        self, demand_polygon_dataframe, facility_service_areas_dataframe
+    ):
+        dense = Coverage.from_geodataframes(
+            demand_polygon_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            coverage_type="partial",
+            demand_col="Value",
+        )
+        sparse = Coverage.from_geodataframes(
+            demand_polygon_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            coverage_type="partial",
+            demand_col="Value",
+            sparse=True,
+        )
+        assert sparse.is_sparse
+        assert np.allclose(sparse.matrix.toarray(), dense.matrix.toarray())
+        assert dense.df.index.tolist() == [1, 2, 3, 4, 5]
+        assert dense.df[1].tolist() == [100.0, 200.0, 300.0, 0.0, 0.0]
+
+    def test_sparse_df_property(self, binary_coverage, binary_sparse_coverage):
+        df = binary_sparse_coverage.df
+        assert df.index.tolist() == binary_coverage.df.index.tolist()
+        assert df.columns.tolist() == binary_coverage.df.columns.tolist()
+        assert df["Value"].tolist() == binary_coverage.df["Value"].tolist()
+
+    def test_from_sparse_matrix(self):
+        matrix = scipy.sparse.csr_matrix(
+            np.array([[True, False], [False, False], [True, True]])
+        )
+        c = Coverage.from_sparse_matrix(
+            matrix,
+            [1, 2, 3],
+            ["A", "B"],
+            demand=[10, 20, 30],
+            demand_col="Population",
+            supply_name="test",
+        )
+        assert c.is_sparse
+        assert c.supply_name == "test"
+        assert c.demand_col == "Population"
+        assert c.demand_ids.tolist() == [1, 2, 3]
+        assert c.supply_ids.tolist() == ["A", "B"]
+        assert c.demand_values.tolist() == [10, 20, 30]
+        assert c.matrix.nnz == 3
+
+    def test_from_sparse_matrix_invalid_matrix(self):
+        with pytest.raises(TypeError) as e:
+            Coverage.from_sparse_matrix(None, [1], ["A"])
+        assert (
+            e.value.args[0]
+            == "Expected 'spmatrix' type for matrix, got '<class 'NoneType'>'"
+        )
+
+    def test_from_sparse_matrix_invalid_demand_ids(self):
+        with pytest.raises(ValueError) as e:
+            Coverage.from_sparse_matrix(scipy.sparse.csr_matrix((2, 1)), [1], ["A"])
+        assert e.value.args[0] == "Expected 2 demand_ids, got 1"
+
+    def test_from_sparse_matrix_invalid_supply_ids(self):
+        with pytest.raises(ValueError) as e:
+            Coverage.from_sparse_matrix(scipy.sparse.csr_matrix((1, 1)), [1], [])
+        assert e.value.args[0] == "Expected 1 supply_ids, got 0"
+
+    def test_from_sparse_matrix_demand_col_required(self):
+        with pytest.raises(ValueError) as e:
+            Coverage.from_sparse_matrix(
+                scipy.sparse.csr_matrix((1, 1)), [1], ["A"], demand=[10]
+            )
+        assert e.value.args[0] == "'demand_col' is required when 'demand' is supplied"
+
+    def test_from_coverage_dataframe_n_jobs(
+        self, binary_coverage, demand_points_dataframe, facility_service_areas_dataframe
+    ):
+        c = Coverage.from_geodataframes(
+            demand_points_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            n_jobs=2,
+        )
+        assert c.df.index.tolist() == binary_coverage.df.index.tolist()
+        assert (c.matrix != binary_coverage.matrix).nnz == 0
+
+    def test_from_coverage_dataframe_partial_n_jobs(
+        self, demand_polygon_dataframe, facility_service_areas_dataframe
+    ):
+        serial = Coverage.from_geodataframes(
+            demand_polygon_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            coverage_type="partial",
+            demand_col="Value",
+        )
+        parallel = Coverage.from_geodataframes(
+            demand_polygon_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            coverage_type="partial",
+            demand_col="Value",
+            sparse=True,
+            n_jobs=-1,
+        )
+        assert np.allclose(parallel.matrix.toarray(), serial.matrix.toarray())
+
+    def test_from_spatially_enabled_dataframe_n_jobs(
+        self, binary_coverage, demand_points_sedf, facility_service_areas_sedf
+    ):
+        c = Coverage.from_spatially_enabled_dataframes(
+            demand_points_sedf,
+            facility_service_areas_sedf,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            demand_geometry_col="geometry",
+            supply_geometry_col="geometry",
+            n_jobs=2,
+        )
+        assert (c.matrix != binary_coverage.matrix).nnz == 0
+
+    def test_from_coverage_dataframe_invalid_n_jobs(
+        self, demand_points_dataframe, facility_service_areas_dataframe
+    ):
+        with pytest.raises(ValueError) as e:
+            Coverage.from_geodataframes(
+                demand_points_dataframe,
+                facility_service_areas_dataframe,
+                "DemandIdentifier",
+                "SupplyIdentifier",
+                n_jobs=0,
+            )
+        assert e.value.args[0] == "Invalid n_jobs '0'"
+
+    def test_from_spatially_enabled_dataframe_partial_values(
+        self,
+        demand_polygon_dataframe,
+        facility_service_areas_dataframe,
+        demand_polygon_sedf,
+        facility_service_areas_sedf,
+    ):
+        c = Coverage.from_geodataframes(
+            demand_polygon_dataframe,
+            facility_service_areas_dataframe,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            coverage_type="partial",
+            demand_col="Value",
+        )
+        c2 = Coverage.from_spatially_enabled_dataframes(
+            demand_polygon_sedf,
+            facility_service_areas_sedf,
+            "DemandIdentifier",
+            "SupplyIdentifier",
+            coverage_type="partial",
+            demand_col="Value",
+            demand_geometry_col="geometry",
+            supply_geometry_col="geometry",
+        )
+        assert np.allclose(c.matrix.toarray(), c2.matrix.toarray())
+
+    def test_to_npz(self, tmp_path, binary_coverage):
+        path = tmp_path / "coverage.npz"
+        binary_coverage.to_npz(path)
+        c = Coverage.read_npz(path)
+        assert c.is_sparse
+        assert c.demand_name == binary_coverage.demand_name
+        assert c.supply_name == binary_coverage.supply_name
+        assert c.demand_col == binary_coverage.demand_col
+        assert c.coverage_type == binary_coverage.coverage_type
+        assert c.demand_ids.tolist() == binary_coverage.demand_ids.tolist()
+        assert c.supply_ids.tolist() == binary_coverage.supply_ids.tolist()
+        assert c.demand_values.tolist() == binary_coverage.demand_values.tolist()
+        assert c.df.equals(binary_coverage.df.astype(c.df.dtypes))
+
+    def test_read_npz_mmap(self, tmp_path, partial_coverage):
+        path = tmp_path / "coverage.npz"
+        partial_coverage.to_npz(path)
+        c = Coverage.read_npz(path, mmap=True)
+        # The arrays are read-only views of the mapped file rather than copies
+        assert not c.matrix.indices.flags.writeable
+        assert not c.matrix.data.flags.writeable
+        assert np.allclose(c.matrix.toarray(), partial_coverage.matrix.toarray())
+        assert c.demand_values.tolist() == partial_coverage.demand_values.tolist()
+
+    def test_read_npz_mmap_string_ids(self, tmp_path):
+        path = tmp_path / "coverage.npz"
+        Coverage.from_sparse_matrix(
+            scipy.sparse.csr_matrix([[1, 0], [0, 0]]), ["a", "b"], ["A", "B"]
+        ).to_npz(path)
+        c = Coverage.read_npz(path, mmap=True)
+        assert c.demand_ids.tolist() == ["a", "b"]
+        assert c.supply_ids.tolist() == ["A", "B"]
+        assert c.matrix.toarray().tolist() == [[1, 0], [0, 0]]
+
+    @pytest.mark.parametrize("mmap", [False, True])
+    def test_read_npz_mixed_ids(self, tmp_path, mmap):
+        path = tmp_path / "coverage.npz"
+        Coverage.from_sparse_matrix(
+            scipy.sparse.csr_matrix([[1, 0], [0, 1]]), [1, "b"], ["A", 2.5]
+        ).to_npz(path)
+        c = Coverage.read_npz(path, mmap=mmap)
+        assert c.demand_ids.tolist() == [1, "b"]
+        assert c.supply_ids.tolist() == ["A", 2.5]
+        assert c.supply_ids.get_indexer([2.5]).tolist() == [1]
+
+    def test_to_npz_invalid_ids(self, tmp_path):
+        coverage = Coverage.from_sparse_matrix(
+            scipy.sparse.csr_matrix([[1]]), [(1, 2)], ["A"]
+        )
+        with pytest.raises(ValueError) as e:
+            coverage.to_npz(tmp_path / "coverage.npz")
+        assert (
+            e.value.args[0]
+            == "Expected 'str', 'int' or 'float' ids, got '<class 'tuple'>'"
+        )
+
+    def test_read_npz_invalid_mmap(self, tmp_path):
+        with pytest.raises(TypeError) as e:
+            Coverage.read_npz(tmp_path / "coverage.npz", mmap=None)
+        assert (
+            e.value.args[0] == "Expected 'bool' type for mmap, got '<class 'NoneType'>'"
+        )
+
+    def test_subset(self, binary_coverage):
+        view = binary_coverage.subset(supply_ids=[3, 1], demand_ids=[2, 3, 4])
+        assert not view.is_sparse
+        assert view.supply_ids.tolist() == [1, 3]
+        assert view.demand_ids.tolist() == [2, 3, 4]
+        assert view.demand_values.tolist() == [200, 300, 400]
+        assert view.matrix.toarray().tolist() == [[1, 0], [1, 1], [0, 1]]
+        assert view.supply_name == binary_coverage.supply_name
+        assert view.demand_name == binary_coverage.demand_name
+
+    def test_subset_df(self, binary_coverage):
+        view = binary_coverage.subset(supply_ids=[3, 1], demand_ids=[2, 3, 4])
+        assert view.df.columns.tolist() == ["Value", 1, 3]
+        assert view.df.index.tolist() == [2, 3, 4]
+        assert view.df[3].tolist() == [False, True, True]
+        assert view.matrix is view.matrix
+
+    def test_matrix_cached(self, binary_coverage):
+        assert binary_coverage.matrix is binary_coverage.matrix
+        assert not binary_coverage.is_sparse
+
+    def test_subset_sparse(self, binary_sparse_coverage):
+        view = binary_sparse_coverage.subset(supply_ids=[2, 3])
+        assert view.is_sparse
+        assert view.demand_ids.tolist() == [1, 2, 3, 4, 5]
+        assert view.matrix.toarray().tolist() == [
+            [0, 0],
+            [0, 0],
+            [1, 1],
+            [0, 1],
+            [0, 0],
+        ]
+        assert view.df.columns.tolist() == ["Value", 2, 3]
+
+    def test_subset_of_subset(self, binary_coverage):
+        view = binary_coverage.subset(supply_ids=[1, 3]).subset(
+            supply_ids=[3], demand_ids=[4, 5]
+        )
+        assert view._view[0] is binary_coverage
+        assert view.supply_ids.tolist() == [3]
+        assert view.matrix.toarray().tolist() == [[1], [0]]
+
+    def test_subset_problem(self, binary_coverage):
+        view = binary_coverage.subset(supply_ids=[1, 2])
+        problem = Problem.mclp(view, max_supply={view: 1})
+        problem.solve(pulp.PULP_CBC_CMD(msg=False))
+        assert problem.selected_supply(view).tolist() == [1]
+        assert sorted(problem.selected_demand(view)) == [1, 2, 3]
+
+    def test_subset_unknown_ids(self, binary_coverage):
+        with pytest.raises(ValueError) as e:
+            binary_coverage.subset(supply_ids=[1, 7])
+        assert (
+            e.value.args[0]
+            == f"Unknown supply ids for supply named '{binary_coverage.supply_name}'"
+        )
+
+    def test_subset_invalid_ids(self, binary_coverage):
+        with pytest.raises(TypeError) as e:
+            binary_coverage.subset(demand_ids=1)
+        assert (
+            e.value.args[0]
+            == "Expected list-like type for demand_ids, got '<class 'int'>'"
+        )
+
+    def test_union(self, binary_coverage):
+        other = Coverage.from_sparse_matrix(
+            scipy.sparse.csr_matrix([[1, 0], [0, 1]]),
+            [5, 6],
+            [1, 4],
+            demand=[500, 600],
+            demand_col="Value",
+        )
+        c = binary_coverage.union(other, supply_name="Either")
+        assert c.demand_ids.tolist() == [1, 2, 3, 4, 5, 6]
+        assert c.supply_ids.tolist() == [1, 2, 3, 4]
+        assert c.matrix.toarray().tolist() == [
+            [1, 0, 0, 0],
+            [1, 0, 0, 0],
+            [1, 1, 1, 0],
+            [0, 0, 1, 0],
+            [1, 0, 0, 0],
+            [0, 0, 0, 1],
+        ]
+        assert c.demand_values.tolist() == [100, 200, 300, 400, 500, 600]
+        assert c.demand_name == binary_coverage.demand_name
+        assert c.supply_name == "Either"
+
+    def test_intersection(self, binary_coverage):
+        other = Coverage.from_sparse_matrix(
+            scipy.sparse.csr_matrix([[1, 0], [0, 1]]), [3, 4], [3, 1]
+        )
+        c = binary_coverage.intersection(other)
+        assert c.demand_ids.tolist() == [3, 4]
+        assert c.supply_ids.tolist() == [1, 3]
+        assert c.matrix.toarray().tolist() == [[0, 1], [0, 0]]
+        assert c.demand_values.tolist() == [300, 400]
+        assert c.supply_name == binary_coverage.supply_name
+
+    def test_difference(self, binary_coverage):
+        other = Coverage.from_sparse_matrix(
+            scipy.sparse.csr_matrix([[1, 0], [0, 1]]), [3, 4], [3, 1]
+        )
+        c = binary_coverage.difference(other)
+        assert c.demand_ids.tolist() == [1, 2, 3, 4, 5]
+        assert c.supply_ids.tolist() == [1, 2, 3]
+        assert c.matrix.toarray().tolist() == [
+            [1, 0, 0],
+            [1, 0, 0],
+            [1, 1, 0],
+            [0, 0, 1],
+            [0, 0, 0],
+        ]
+
+    def test_union_demand_mismatch(self, binary_coverage):
+        other = Coverage.from_sparse_matrix(
+            scipy.sparse.csr_matrix([[1]]), [1], [1], demand=[1], demand_col="Value"
+        )
+        with pytest.raises(ValueError) as e:
+            binary_coverage.union(other)
+        assert e.value.args[0] == "The demand values of the coverages do not match"
+
+    def test_union_missing_demand(self, binary_coverage):
+        other = Coverage.from_sparse_matrix(scipy.sparse.csr_matrix([[1]]), [6], [1])
+        with pytest.raises(ValueError) as e:
+            binary_coverage.union(other)
+        assert (
+            e.value.args[0]
+            == f"Missing demand values for demand named '{binary_coverage.demand_name}'"
+        )
+
+    def test_union_coverage_type(self, binary_coverage, partial_coverage):
+        with pytest.raises(ValueError) as e:
+            binary_coverage.union(partial_coverage)
+        assert e.value.args[0] == "Expected 'binary' coverage, got 'partial'"
+
+    def test_union_invalid_other(self, binary_coverage):
+        with pytest.raises(TypeError) as e:
+            binary_coverage.union(None)
+        assert (
+            e.value.args[0]
+            == "Expected 'Coverage' type for other, got '<class 'NoneType'>'"
+        )
+
+    def test_concat(self, binary_coverage, binary_coverage2):
+        c = Coverage.concat([binary_coverage, binary_coverage2], supply_name="All")
+        assert c.supply_ids.tolist() == [1, 2, 3, 4, 5]
+        assert c.matrix.toarray().tolist() == [
+            [1, 0, 0, 1, 0],
+            [1, 0, 0, 0, 0],
+            [1, 1, 1, 0, 0],
+            [0, 0, 1, 0, 1],
+            [0, 0, 0, 0, 1],
+        ]
+        problem = Problem.lscp(c)
+        problem.solve(pulp.PULP_CBC_CMD(msg=False))
+        assert problem.selected_supply(c).tolist() == [1, 5]
+
+    def test_concat_demand(self, binary_coverage):
+        other = Coverage.from_sparse_matrix(
+            scipy.sparse.csr_matrix([[1, 1]]),
+            [6],
+            [3, 4],
+            demand=[600],
+            demand_col="Value",
+        )
+        c = Coverage.concat([binary_coverage, other], axis="demand")
+        assert c.demand_ids.tolist() == [1, 2, 3, 4, 5, 6]
+        assert c.supply_ids.tolist() == [1, 2, 3, 4]
+        assert c.matrix.toarray()[-1].tolist() == [0, 0, 1, 1]
+        assert c.demand_values.tolist() == [100, 200, 300, 400, 500, 600]
+
+    def test_concat_duplicate_ids(self, binary_coverage):
+        with pytest.raises(ValueError) as e:
+            Coverage.concat([binary_coverage, binary_coverage])
+        assert e.value.args[0] == "The supply ids of the coverages must be unique"
+
+    def test_concat_invalid_axis(self, binary_coverage):
+        with pytest.raises(ValueError) as e:
+            Coverage.concat([binary_coverage], axis=0)
+        assert e.value.args[0] == "Invalid axis '0'"
+
+    def test_from_points_within_radius(self, demand_points_dataframe):
+        supply_df = pd.DataFrame(
+            {"Id": ["A", "B"], "Longitude": [1.5, 4], "Latitude": [1.5, 4]}
+        )
+        c = Coverage.from_points_within_radius(
+            demand_points_dataframe,
+            supply_df,
+            "DemandIdentifier",
+            "Id",
+            1,
+            demand_col="Value",
+            x_col="Longitude",
+            y_col="Latitude",
+            sparse=True,
+        )
+        assert c.demand_ids.tolist() == [1, 2, 3, 4, 5]
+        assert c.supply_ids.tolist() == ["A", "B"]
+        assert c.matrix.toarray().tolist() == [[1, 0], [1, 0], [0, 0], [0, 1], [0, 0]]
+        assert c.demand_values.tolist() == [100, 200, 300, 400, 500]
+
+    def test_from_points_within_radius_geometry(self, demand_points_dataframe):
+        c = Coverage.from_points_within_radius(
+            demand_points_dataframe,
+            demand_points_dataframe,
+            "DemandIdentifier",
+            "DemandIdentifier",
+            1.5,
+        )
+        # Each point covers itself and its neighbors
+        assert c.df.sum().tolist() == [2, 3, 3, 3, 2]
+
+    def test_from_points_within_radius_haversine(self, demand_points_dataframe):
+        c = Coverage.from_points_within_radius(
+            demand_points_dataframe,
+            demand_points_dataframe.iloc[:1],
+            "DemandIdentifier",
+            "DemandIdentifier",
+            160000,
+            metric="haversine",
+            sparse=True,
+        )
+        # (1, 1) to (2, 2) is about 157 km
+        assert c.matrix.toarray().ravel().tolist() == [1, 1, 0, 0, 0]
+
+    def test_from_points_within_radius_invalid_metric(self, demand_points_dataframe):
+        with pytest.raises(ValueError) as e:
+            Coverage.from_points_within_radius(
+                demand_points_dataframe,
+                demand_points_dataframe,
+                "DemandIdentifier",
+                "DemandIdentifier",
+                1,
+                metric="manhattan",
+            )
+        assert e.value.args[0] == "Invalid metric 'manhattan'"
+
+    def test_from_points_within_radius_invalid_radius(self, demand_points_dataframe):
+        with pytest.raises(ValueError) as e:
+            Coverage.from_points_within_radius(
+                demand_points_dataframe,
+                demand_points_dataframe,
+                "DemandIdentifier",
+                "DemandIdentifier",
+                -1,
+            )
+        assert e.value.args[0] == "Invalid radius '-1'"
+
+    def test_from_points_within_radius_list(self, demand_points_dataframe):
+        coverages = Coverage.from_points_within_radius(
+            demand_points_dataframe,
+            demand_points_dataframe.iloc[:1],
+            "DemandIdentifier",
+            "DemandIdentifier",
+            [1, 1.5, 3],
+            sparse=True,
+        )
+        assert len(coverages) == 3
+        assert [c.matrix.toarray().ravel().tolist() for c in coverages] == [
+            [1, 0, 0, 0, 0],
+            [1, 1, 0, 0, 0],
+            [1, 1, 1, 0, 0],
+        ]
+
+    def test_from_nested_geodataframes(self, demand_points_dataframe):
+        centers = geopandas.points_from_xy([1.5, 1.5, 4, 4], [1.5, 1.5, 4, 4])
+        supply_df = geopandas.GeoDataFrame(
+            {"Id": ["A", "A", "B", "B"], "Minutes": [10, 5, 5, 10]},
+            geometry=centers.buffer([2.5, 1, 0.5, 1.5]),
+        )
+        coverages = Coverage.from_nested_geodataframes(
+            demand_points_dataframe,
+            supply_df,
+            "DemandIdentifier",
+            "Id",
+            "Minutes",
+            demand_col="Value",
+            sparse=True,
+        )
+        assert list(coverages) == [5, 10]
+        assert coverages[5].matrix.toarray().tolist() == [
+            [1, 0],
+            [1, 0],
+            [0, 0],
+            [0, 1],
+            [0, 0],
+        ]
+        assert coverages[10].matrix.toarray().tolist() == [
+            [1, 0],
+            [1, 0],
+            [1, 1],
+            [0, 1],
+            [0, 1],
+        ]
+        assert coverages[10].supply_ids.tolist() == ["A", "B"]
+        assert coverages[10].demand_values.tolist() == [100, 200, 300, 400, 500]
+
+    def test_from_nested_geodataframes_missing_threshold(self, demand_points_dataframe):
+        # A has no service area at 10 minutes
+        centers = geopandas.points_from_xy([1.5, 1.5, 4, 4, 4], [1.5, 1.5, 4, 4, 4])
+        supply_df = geopandas.GeoDataFrame(
+            {"Id": ["A", "A", "B", "B", "B"], "Minutes": [15, 5, 5, 10, 15]},
+            geometry=centers.buffer([2.5, 1, 0.5, 1.5, 2]),
+        )
+        coverages = Coverage.from_nested_geodataframes(
+            demand_points_dataframe, supply_df, "DemandIdentifier", "Id", "Minutes"
+        )
+        for threshold in (5, 10, 15):
+            expected = Coverage.from_geodataframes(
+                demand_points_dataframe,
+                supply_df[supply_df["Minutes"] == threshold],
+                "DemandIdentifier",
+                "Id",
+            )
+            assert (
+                coverages[threshold].df[expected.supply_ids].values.tolist()
+                == expected.df.values.tolist()
+            )
+        assert coverages[5].df["A"].tolist() == [True, True, False, False, False]
+
+    def test_from_nested_geodataframes_partial(
+        self, demand_polygon_dataframe, facility_service_areas_dataframe
+    ):
+        smaller = facility_service_areas_dataframe.copy()
+        smaller["geometry"] = smaller.geometry.buffer(-0.5)
+        supply_df = pd.concat(
+            [
+                facility_service_areas_dataframe.assign(Threshold=2),
+                smaller.assign(Threshold=1),
+            ]
+        )
+        coverages = Coverage.from_nested_geodataframes(
+            demand_polygon_dataframe,
+            supply_df,
+            "DemandIdentifier",
+            "Name",
+            "Threshold",
+            demand_col="Value",
+            coverage_type="partial",
+        )
+        for threshold, areas in ((1, smaller), (2, facility_service_areas_dataframe)):
+            expected = Coverage.from_geodataframes(
+                demand_polygon_dataframe,
+                areas,
+                "DemandIdentifier",
+                "Name",
+                demand_col="Value",
+                coverage_type="partial",
+            )
+            assert np.allclose(
+                coverages[threshold].df.values, expected.df.values.astype(float)
+            )
+
+    def test_from_nested_geodataframes_duplicate_threshold(
+        self, demand_points_dataframe, facility_service_areas_dataframe
+    ):
+        supply_df = pd.concat(
+            [facility_service_areas_dataframe, facility_service_areas_dataframe]
+        ).assign(Threshold=1)
+        with pytest.raises(ValueError) as e:
+            Coverage.from_nested_geodataframes(
+                demand_points_dataframe,
+                supply_df,
+                "DemandIdentifier",
+                "Name",
+                "Threshold",
+            )
+        assert e.value.args[0] == "Expected one row per 'Name' and 'Threshold'"
+
+    def test_from_distance_matrix(self):
+        costs = pd.DataFrame(
+            [[5, 20], [np.nan, 10], [15, 16]], index=[1, 2, 3], columns=["A", "B"]
+        )
+        c = Coverage.from_distance_matrix(
+            costs, 15, demand=[10, 20, 30], demand_col="Population", sparse=True
+        )
+        assert c.matrix.toarray().tolist() == [[1, 0], [0, 1], [1, 0]]
+        assert c.demand_ids.tolist() == [1, 2, 3]
+        assert c.supply_ids.tolist() == ["A", "B"]
+        assert c.demand_values.tolist() == [10, 20, 30]
+
+    def test_from_distance_matrix_dense(self):
+        costs = pd.DataFrame([[5, 20], [1, 10]], index=[1, 2], columns=["A", "B"])
+        c = Coverage.from_distance_matrix(costs, 5)
+        assert c.df.to_numpy().tolist() == [[1, 0], [1, 0]]
+
+    def test_from_distance_matrix_invalid_costs(self):
+        with pytest.raises(TypeError) as e:
+            Coverage.from_distance_matrix(None, 5)
+        assert (
+            e.value.args[0]
+            == "Expected 'Dataframe' type for costs, got '<class 'NoneType'>'"
+        )
+
+    def test_from_distance_matrix_invalid_threshold(self):
+        with pytest.raises(TypeError) as e:
+            Coverage.from_distance_matrix(pd.DataFrame([[1]]), "5")
+        assert (
+            e.value.args[0]
+            == "Expected 'int' or 'float' type for threshold, got '<class 'str'>'"
+        )
+
+    def test_from_od_table(self, tmp_path):
+        od = pd.DataFrame(
+            {
+                "Origin": [1, 1, 2, 2, 3, 3],
+                "Destination": ["A", "B", "A", "B", "A", "B"],
+                "Minutes": [4, 12, 8, 20, 30, 9],
+            }
+        )
+        od.to_csv(tmp_path / "od.csv", index=False)
+        c5, c10 = Coverage.from_od_table(
+            str(tmp_path / "od.csv"),
+            "Origin",
+            "Destination",
+            "Minutes",
+            [5, 10],
+            sparse=True,
+            chunksize=2,
+        )
+        assert c5.demand_ids.tolist() == [1, 2, 3]
+        assert c5.supply_ids.tolist() == ["A", "B"]
+        assert c5.matrix.toarray().tolist() == [[1, 0], [0, 0], [0, 0]]
+        assert c10.matrix.toarray().tolist() == [[1, 0], [1, 0], [0, 1]]
+
+    def test_from_od_table_parquet(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        od = pd.DataFrame(
+            {"Origin": [1, 2], "Destination": ["A", "A"], "Minutes": [4.0, 8.0]}
+        )
+        od.to_parquet(tmp_path / "od.parquet")
+        c = Coverage.from_od_table(
+            tmp_path / "od.parquet", "Origin", "Destination", "Minutes", 5
+        )
+        assert c.df.to_numpy().tolist() == [[1], [0]]
+
+    def test_from_od_table_chunks(self):
+        chunks = [
+            pd.DataFrame({"Origin": [2], "Destination": ["A"], "Minutes": [3]}),
+            pd.DataFrame({"Origin": [1], "Destination": ["B"], "Minutes": [3]}),
+        ]
+        c = Coverage.from_od_table(
+            iter(chunks),
+            "Origin",
+            "Destination",
+            "Minutes",
+            5,
+            demand_ids=[1, 2, 3],
+            supply_ids=["A", "B"],
+            demand=[10, 20, 30],
+            demand_col="Population",
+            sparse=True,
+        )
+        assert c.matrix.toarray().tolist() == [[0, 1], [1, 0], [0, 0]]
+        assert c.demand_values.tolist() == [10, 20, 30]
+
+    def test_from_od_table_unknown_ids(self):
+        od = pd.DataFrame({"Origin": [4], "Destination": ["A"], "Minutes": [3]})
+        with pytest.raises(ValueError) as e:
+            Coverage.from_od_table(
+                od, "Origin", "Destination", "Minutes", 5, demand_ids=[1, 2, 3]
+            )
+        assert e.value.args[0] == "Unknown ids in 'Origin'"
+
+    def test_from_od_table_invalid_source(self):
+        with pytest.raises(TypeError) as e:
+            Coverage.from_od_table(None, "Origin", "Destination", "Minutes", 5)
+        assert (
+            e.value.args[0]
+            == "Expected 'str', 'Dataframe' or iterable type for source, got '<class 'NoneType'>'"
+        )
@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+import scipy.sparse
+from allagash.coverage import Coverage
+from allagash.model import MatrixModel
+
+
+class TestMatrixModel:
+    def test_init_invalid_sense(self):
+        with pytest.raises(ValueError) as e:
+            MatrixModel(
+                "test",
+                "test",
+                [1],
+                scipy.sparse.csr_matrix([[1]]),
+                [1],
+                [np.inf],
+                ["x"],
+                ["c"],
+            )
+        assert e.value.args[0] == "Invalid sense 'test'"
+
+    def test_init_invalid_matrix(self):
+        with pytest.raises(TypeError) as e:
+            MatrixModel("test", "minimize", [1], [[1]], [1], [np.inf], ["x"], ["c"])
+        assert (
+            e.value.args[0]
+            == "Expected 'spmatrix' type for matrix, got '<class 'list'>'"
+        )
+
+    def test_lscp(self, binary_coverage):
+        model = MatrixModel.lscp(binary_coverage)
+        assert model.sense == "minimize"
+        assert model.matrix.shape == (5, 3)
+        assert (model.matrix != binary_coverage.matrix).nnz == 0
+        assert model.objective.tolist() == [1, 1, 1]
+        assert model.row_lower.tolist() == [1, 1, 1, 1, 1]
+        assert model.row_names[0] == f"D{binary_coverage.demand_name}1"
+
+    def test_mclp(self, binary_coverage):
+        model = MatrixModel.mclp(binary_coverage, {binary_coverage: 2})
+        assert model.sense == "maximize"
+        assert model.matrix.shape == (6, 8)
+        assert model.matrix.nnz == binary_coverage.matrix.nnz + 8
+        assert model.objective[:5].tolist() == binary_coverage.demand_values.tolist()
+        assert model.row_upper[-1] == 2
+        assert model.row_lower[-1] == -np.inf
+        assert model.row_names[-1] == f"Num${binary_coverage.supply_name}"
+        assert model.col_names[0] == f"{binary_coverage.demand_name}$1"
+
+    def test_bclp(self, binary_coverage):
+        model = MatrixModel.bclp(binary_coverage, {binary_coverage: 2})
+        assert model.row_lower[:5].tolist() == [1, 1, 1, 1, 1]
+
+    def test_cmclp(self, binary_coverage):
+        model = MatrixModel.cmclp(
+            binary_coverage, {binary_coverage: 2}, {binary_coverage: [250, 300, 400]}
+        )
+        # 5 demand, 3 supply and 6 assignment variables, one for each covered pair
+        assert model.matrix.shape == (9, 14)
+        assert model.integer.tolist() == [True] * 8 + [False] * 6
+        assert model.row_lower[:5].tolist() == [0] * 5
+        assert model.row_upper[:5].tolist() == [0] * 5
+        assert model.row_upper[5:8].tolist() == [0] * 3
+        assert model.row_upper[-1] == 2
+        demand_ids, supply_ids, block = model.assignment_columns[
+            binary_coverage.supply_name
+        ]
+        assert demand_ids.tolist() == [1, 2, 3, 3, 3, 4]
+        assert supply_ids.tolist() == [1, 1, 1, 2, 3, 3]
+        assert block == slice(8, 14)
+
+    def test_clscp_unweighted_demand(self, binary_coverage):
+        coverage = Coverage.from_sparse_matrix(
+            binary_coverage.matrix,
+            binary_coverage.demand_ids,
+            binary_coverage.supply_ids,
+            demand=[0, 1, 1, 1, 1],
+            demand_col="Value",
+        )
+        model = MatrixModel.clscp(coverage, {coverage: [1, 1, 1]})
+        # The assignment of the location without demand is linked to the supply variable
+        assert model.sense == "minimize"
+        assert model.matrix.shape == (9, 9)
+        assert model.row_names[-1].startswith("Link$")
+        assert model.matrix[-1].toarray().ravel().tolist() == [
+            -1,
+            0,
+            0,
+            1,
+            0,
+            0,
+            0,
+            0,
+            0,
+        ]
+
+    def test_sparse_coverage(self, binary_coverage, binary_sparse_coverage):
+        model = MatrixModel.mclp(binary_coverage, {binary_coverage: 2})
+        sparse_model = MatrixModel.mclp(
+            binary_sparse_coverage, {binary_sparse_coverage: 2}
+        )
+        assert (model.matrix != sparse_model.matrix).nnz == 0
+        assert model.objective.tolist() == sparse_model.objective.tolist()
+
+    def test_write_mps(self, binary_coverage, tmp_path):
+        path = tmp_path / "mclp.mps"
+        MatrixModel.mclp(binary_coverage, {binary_coverage: 2}).write_mps(path)
+        lines = path.read_text().splitlines()
+        assert lines[0] == "*SENSE:Maximize"
+        assert "OBJSENSE" not in lines
+        assert lines[-1] == "ENDATA"
+        assert f"    RHS  Num${binary_coverage.supply_name}  2" in lines
+        assert f"    {binary_coverage.demand_name}$1  OBJ  -100" in lines
+
+    def test_write_mps_objsense(self, binary_coverage, tmp_path):
+        path = tmp_path / "mclp.mps"
+        model = MatrixModel.mclp(binary_coverage, {binary_coverage: 2})
+        model.write_mps(path, objsense=True)
+        lines = path.read_text().splitlines()
+        assert lines[2:4] == ["OBJSENSE", "    MAX"]
+        assert f"    {binary_coverage.demand_name}$1  OBJ  100" in lines
+
+    def test_pmedian(self, cost_matrix):
+        model = MatrixModel.pmedian(cost_matrix, 2)
+        assert model.sense == "minimize"
+        # 4 demand rows, a link row for each of the 12 pairs and the number of supply locations
+        assert model.matrix.shape == (17, 15)
+        assert model.objective[:3].tolist() == [0, 0, 0]
+        assert model.objective[3:7].tolist() == [10, 20, 90, 80]
+        assert model.integer.tolist() == [True] * 3 + [False] * 12
+        assert model.row_lower[16] == model.row_upper[16] == 2
+        demand_ids, supply_ids, block = model.assignment_columns["Facility"]
+        assert supply_ids[:4].tolist() == ["A"] * 4
+        assert demand_ids[:4].tolist() == [1, 2, 3, 4]
+        assert block == slice(3, 15)
+
+    def test_pcenter(self, cost_matrix):
+        model = MatrixModel.pcenter(cost_matrix.nearest(2), 2)
+        # 4 demand rows, 8 link rows, the number of supply locations and 4 rows bounding the largest cost
+        assert model.matrix.shape == (17, 12)
+        assert model.col_names[-1] == "MaxCost"
+        assert model.col_upper[-1] == np.inf
+        assert model.objective.tolist() == [0] * 11 + [1]
+        assert model.matrix[13].toarray().ravel().tolist() == (
+            [0, 0, 0, 1, 0, 5, 0, 0, 0, 0, 0, -1]
+        )
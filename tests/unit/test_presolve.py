@@ -0,0 +1,73 @@
+import pytest
+from pulp import GLPK
+from allagash.problem import Problem
+from allagash.solvers import GreedySolver
+
+
+class TestPresolve:
+    def test_mclp_reductions(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, {binary_coverage: 1}, presolve=True)
+        # Supply 2 is dominated, demand 1 and 2 are merged and demand 5 can not be covered
+        assert p.presolve.shape == (3, 2)
+        assert p.presolve.removed_supply[binary_coverage.supply_name].tolist() == [2]
+        reduced = p.presolve.coverage(binary_coverage.supply_name)
+        assert reduced.demand_ids.tolist() == [1, 3, 4]
+        assert reduced.demand_values.tolist() == [300, 300, 400]
+
+    def test_mclp_solve(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, {binary_coverage: 1}, presolve=True)
+        p.solve(GLPK(msg=False))
+        assert p.selected_supply(binary_coverage).tolist() == [3]
+        assert p.selected_demand(binary_coverage).tolist() == [3, 4]
+
+    def test_mclp_solve_merged_demand(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, {binary_coverage: 2}, presolve=True)
+        p.solve(GLPK(msg=False))
+        assert p.selected_supply(binary_coverage).tolist() == [1, 3]
+        assert p.selected_demand(binary_coverage).tolist() == [1, 2, 3, 4]
+        assert p.selected_supply(binary_coverage, value=0).tolist() == [2]
+
+    def test_mclp_set_max_supply(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, {binary_coverage: 1}, presolve=True)
+        p.solve(GLPK(msg=False))
+        p.set_max_supply({binary_coverage: 2})
+        p.solve(GLPK(msg=False))
+        assert p.selected_supply(binary_coverage).tolist() == [1, 3]
+
+    def test_mclp_heuristic(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, {binary_coverage: 1}, presolve=True)
+        p.solve(GreedySolver())
+        assert p.selected_supply(binary_coverage).tolist() == [3]
+        assert p.selected_demand(binary_coverage).tolist() == [3, 4]
+
+    def test_lscp_fixed_supply(self, binary_coverage):
+        p = Problem.lscp(binary_coverage, presolve=True)
+        # Demand 1 is only covered by supply 1 and demand 4 only by supply 3
+        assert p.presolve.fixed_supply[binary_coverage.supply_name].tolist() == [1, 3]
+        assert p.presolve.shape == (1, 0)
+
+    def test_lscp_solve(self, binary_coverage, binary_coverage2):
+        expected = Problem.lscp([binary_coverage, binary_coverage2])
+        expected.solve(GLPK(msg=False))
+        p = Problem.lscp([binary_coverage, binary_coverage2], presolve=True)
+        p.solve(GLPK(msg=False))
+        assert len(p.selected_supply(binary_coverage)) + len(
+            p.selected_supply(binary_coverage2)
+        ) == len(expected.selected_supply(binary_coverage)) + len(
+            expected.selected_supply(binary_coverage2)
+        )
+
+    def test_bclp_reductions(self, binary_coverage):
+        p = Problem.bclp(binary_coverage, {binary_coverage: 2}, presolve=True)
+        # Dominated supply locations can still provide backup coverage
+        assert p.presolve.removed_supply[binary_coverage.supply_name].tolist() == []
+        reduced = p.presolve.coverage(binary_coverage.supply_name)
+        assert reduced.demand_ids.tolist() == [1, 3, 4, 5]
+        assert reduced.demand_values.tolist() == [300, 300, 400, 500]
+
+    def test_invalid_presolve(self, binary_coverage):
+        with pytest.raises(TypeError) as e:
+            Problem.lscp(binary_coverage, presolve=1)
+        assert (
+            e.value.args[0] == "Expected 'bool' type for presolve, got '<class 'int'>'"
+        )
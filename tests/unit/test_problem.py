@@ -1,6 +1,10 @@
+import operator
+import numpy as np
+import pandas as pd
 import pytest
 from pulp import GLPK
-from allagash.problem import Problem
+from allagash.costs import CostMatrix
+from allagash.problem import InfeasibleException, Problem
 
 
 class TestProblem:
@@ -62,12 +66,66 @@ class TestProblem:
             p.solve(None)
         assert (
             e.value.args[0]
-            == "Expected 'LpSolver' type for solver, got '<class 'NoneType'>'"
+            == "Expected 'LpSolver' or 'MatrixSolver' type for solver, got '<class 'NoneType'>'"
         )
 
-    def test_selected_supply_list(self, mclp_problem_solved):
-        assert isinstance(
-            mclp_problem_solved.selected_supply(mclp_problem_solved.coverages[0]), list
+    def test_sparse_coverage(
+        self,
+        binary_coverage,
+        binary_coverage2,
+        binary_sparse_coverage,
+        binary_sparse_coverage2,
+    ):
+        dense = Problem.mclp(
+            [binary_coverage, binary_coverage2],
+            max_supply={binary_coverage: 2, binary_coverage2: 2},
+        )
+        sparse = Problem.mclp(
+            [binary_sparse_coverage, binary_sparse_coverage2],
+            max_supply={binary_sparse_coverage: 2, binary_sparse_coverage2: 2},
+        )
+        assert len(sparse.pulp_problem.constraints) == len(
+            dense.pulp_problem.constraints
+        )
+        assert str(sparse.pulp_problem.objective) == str(dense.pulp_problem.objective)
+
+    def test_write_mps(self, mclp_problem, tmp_path):
+        path = tmp_path / "mclp.mps"
+        mclp_problem.write_mps(path)
+        lines = path.read_text().splitlines()
+        assert lines[0] == "*SENSE:Maximize"
+        assert lines[-1] == "ENDATA"
+
+    def test_matrix_model_init(self, binary_lscp_pulp_problem, binary_coverage):
+        p = Problem(binary_lscp_pulp_problem, binary_coverage, "mclp")
+        with pytest.raises(ValueError) as e:
+            p.matrix_model
+        assert (
+            e.value.args[0]
+            == "The matrix model can only be generated for problems created from a factory method"
+        )
+
+    def test_selected_supply_index(self, mclp_problem_solved):
+        selected = mclp_problem_solved.selected_supply(mclp_problem_solved.coverages[0])
+        assert isinstance(selected, pd.Index)
+        assert selected.dtype == np.int64
+
+    def test_selected_supply_sparse_coverage(self, binary_sparse_coverage):
+        p = Problem.mclp(binary_sparse_coverage, max_supply={binary_sparse_coverage: 1})
+        p.solve(GLPK())
+        assert p.selected_supply(binary_sparse_coverage).tolist() == [3]
+        assert p.selected_supply(
+            binary_sparse_coverage, operation=operator.lt
+        ).tolist() == [1, 2]
+
+    def test_selected_supply_unknown_coverage(
+        self, mclp_problem_solved, partial_coverage
+    ):
+        with pytest.raises(ValueError) as e:
+            mclp_problem_solved.selected_supply(partial_coverage)
+        assert (
+            e.value.args[0]
+            == f"Unable to find supply named '{partial_coverage.supply_name}'"
         )
 
     def test_selected_supply_invalid_coverage(self, mclp_problem_solved):
@@ -99,9 +157,9 @@ class TestProblem:
         )
 
     def test_selected_demand(self, mclp_problem_solved):
-        assert isinstance(
-            mclp_problem_solved.selected_demand(mclp_problem_solved.coverages[0]), list
-        )
+        selected = mclp_problem_solved.selected_demand(mclp_problem_solved.coverages[0])
+        assert isinstance(selected, pd.Index)
+        assert selected.dtype == np.int64
 
     def test_selected_demand_invalid_coverage(self, mclp_problem_solved):
         with pytest.raises(TypeError) as e:
@@ -127,6 +185,14 @@ class TestLSCPProblem:
         p = Problem.lscp([binary_coverage, binary_coverage2])
         assert p.problem_type == "lscp"
 
+    def test_lscp_constraints(self, binary_coverage):
+        p = Problem.lscp(binary_coverage)
+        s = binary_coverage.supply_name
+        constraints = p.pulp_problem.constraints
+        assert str(constraints["Ddemand1"]) == f"{s}$1 >= 1"
+        assert str(constraints["Ddemand3"]) == f"{s}$1 + {s}$2 + {s}$3 >= 1"
+        assert str(constraints["Ddemand5"]) == "0 >= 1"
+
     def test_lscp_invalid_coverages(self):
         with pytest.raises(TypeError) as e:
             Problem.lscp(None)
@@ -164,6 +230,67 @@ class TestMCLPProblem:
         )
         assert p.problem_type == "mclp"
 
+    def test_mclp_constraints(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 2})
+        s = binary_coverage.supply_name
+        constraints = p.pulp_problem.constraints
+        assert {v.name: x for v, x in constraints["D3"].items()} == {
+            "demand$3": -1,
+            f"{s}$1": 1,
+            f"{s}$2": 1,
+            f"{s}$3": 1,
+        }
+        assert {v.name: x for v, x in constraints["D5"].items()} == {"demand$5": -1}
+        assert str(constraints[f"Num${s}"]) == f"{s}$1 + {s}$2 + {s}$3 <= 2"
+        assert str(p.pulp_problem.objective) == (
+            "100*demand$1 + 200*demand$2 + 300*demand$3 + 400*demand$4 + 500*demand$5"
+        )
+
+    def test_set_max_supply(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 1})
+        p.solve(GLPK())
+        assert len(p.selected_supply(binary_coverage)) == 1
+        p.set_max_supply({binary_coverage: 3})
+        s = binary_coverage.supply_name
+        assert str(p.pulp_problem.constraints[f"Num${s}"]).endswith("<= 3")
+        with pytest.raises(RuntimeError):
+            p.selected_supply(binary_coverage)
+        p.solve(GLPK())
+        assert sorted(p.selected_demand(binary_coverage)) == [1, 2, 3, 4]
+
+    def test_set_max_supply_initial_values(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 3})
+        p.solve(GLPK())
+        p.set_max_supply({binary_coverage: 1})
+        variables = p.pulp_problem.variablesDict()
+        s = binary_coverage.supply_name
+        # Supply location 3 covers the most demand so it is kept in the initial values
+        assert [variables[f"{s}$1"].varValue, variables[f"{s}$3"].varValue] == [0, 1]
+        assert variables["demand$1"].varValue == 0
+        assert variables["demand$4"].varValue == 1
+
+    def test_set_max_supply_before_solve(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 1})
+        p.set_max_supply({binary_coverage: 2})
+        s = binary_coverage.supply_name
+        assert str(p.pulp_problem.constraints[f"Num${s}"]).endswith("<= 2")
+        assert p.matrix_model.row_upper[-1] == 2
+
+    def test_set_max_supply_lscp(self, binary_coverage):
+        p = Problem.lscp(binary_coverage)
+        with pytest.raises(ValueError) as e:
+            p.set_max_supply({binary_coverage: 2})
+        assert e.value.args[0] == "max_supply can not be set for 'lscp' problems"
+
+    def test_set_max_supply_invalid_coverage(self, binary_coverage, binary_coverage2):
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 1})
+        with pytest.raises(ValueError) as e:
+            p.set_max_supply({binary_coverage2: 2})
+        assert (
+            e.value.args[0]
+            == f"Coverage with supply named '{binary_coverage2.supply_name}' is not part of the problem"
+        )
+
     def test_mclp_invalid_coverages(self):
         with pytest.raises(TypeError) as e:
             Problem.mclp(None, max_supply={})
@@ -302,3 +429,161 @@ class TestBCLPProblem:
                 max_supply={binary_coverage: 5, binary_coverage2_other_demand_name: 10},
             )
         assert e.value.args[0] == "All Coverages must have the same 'demand_name'"
+
+
+class TestCapacitatedProblem:
+    def test_cmclp(self, binary_coverage):
+        p = Problem.cmclp(
+            binary_coverage,
+            max_supply={binary_coverage: 2},
+            capacity={binary_coverage: pd.Series([250, 300, 400], index=[1, 2, 3])},
+        )
+        assert p.problem_type == "cmclp"
+        p.solve(GLPK())
+        assert p.selected_supply(binary_coverage).tolist() == [2, 3]
+        assert sorted(p.selected_demand(binary_coverage)) == [3, 4]
+        assignments = p.assignments(binary_coverage)
+        assert assignments["demand_id"].tolist() == [3, 4]
+        assert assignments["supply_id"].tolist() == [2, 3]
+        assert assignments["share"].tolist() == [1, 1]
+
+    def test_cmclp_constraints(self, binary_coverage):
+        p = Problem.cmclp(
+            binary_coverage,
+            max_supply={binary_coverage: 2},
+            capacity={binary_coverage: [250, 300, 400]},
+        )
+        s = binary_coverage.supply_name
+        constraints = p.pulp_problem.constraints
+        assert {v.name: x for v, x in constraints[f"Cap${s}$3"].items()} == {
+            f"{s}$3": -400,
+            f"{s}$3$demand$3": 300,
+            f"{s}$3$demand$4": 400,
+        }
+        assert constraints[f"Cap${s}$3"].sense == -1
+        assert {v.name: x for v, x in constraints["Ddemand3"].items()} == {
+            "demand$3": -1,
+            f"{s}$1$demand$3": 1,
+            f"{s}$2$demand$3": 1,
+            f"{s}$3$demand$3": 1,
+        }
+        assert constraints["Ddemand3"].sense == 0
+        assert p.stats.variables == 14
+
+    def test_clscp(self, binary_coverage):
+        coverage = binary_coverage.subset(demand_ids=[1, 2, 3, 4])
+        p = Problem.clscp(coverage, capacity={coverage: [300, 300, 400]})
+        p.solve(GLPK())
+        assert p.selected_supply(coverage).tolist() == [1, 2, 3]
+        assert sorted(p.selected_demand(coverage)) == [1, 2, 3, 4]
+        assignments = p.assignments(coverage)
+        assert assignments.groupby("demand_id")["share"].sum().tolist() == [1] * 4
+
+    def test_assignments_not_capacitated(self, mclp_problem_solved, binary_coverage):
+        with pytest.raises(ValueError) as e:
+            mclp_problem_solved.assignments(binary_coverage)
+        assert e.value.args[0] == "Assignments are not available for 'mclp' problems"
+
+    def test_missing_capacity(self, binary_coverage, binary_coverage2):
+        with pytest.raises(ValueError) as e:
+            Problem.clscp(
+                [binary_coverage, binary_coverage2],
+                capacity={binary_coverage: [1, 1, 1]},
+            )
+        assert (
+            e.value.args[0]
+            == f"Missing capacity for supply named '{binary_coverage2.supply_name}'"
+        )
+
+    def test_invalid_capacity(self, binary_coverage):
+        with pytest.raises(ValueError) as e:
+            Problem.cmclp(
+                binary_coverage,
+                max_supply={binary_coverage: 1},
+                capacity={binary_coverage: [1, 1]},
+            )
+        assert e.value.args[0] == (
+            f"Expected 3 capacity values for supply named '{binary_coverage.supply_name}', got 2"
+        )
+
+    def test_capacity_requires_demand(self, binary_coverage_no_demand):
+        with pytest.raises(TypeError) as e:
+            Problem.clscp(
+                binary_coverage_no_demand,
+                capacity={binary_coverage_no_demand: [1, 1, 1]},
+            )
+        assert e.value.args[0] == "Coverages used in CLSCP must have 'demand_col'"
+
+
+class TestPMedianProblem:
+    def test_pmedian(self, cost_matrix):
+        p = Problem.pmedian(cost_matrix, 2)
+        assert p.problem_type == "pmedian"
+        p.solve(GLPK())
+        assert p.selected_supply(cost_matrix).tolist() == ["A", "C"]
+        assert p.selected_demand(cost_matrix).tolist() == [1, 2, 3, 4]
+        assignments = p.assignments(cost_matrix)
+        assert assignments["demand_id"].tolist() == [1, 2, 3, 4]
+        assert assignments["supply_id"].tolist() == ["A", "A", "C", "C"]
+        assert assignments["share"].tolist() == [1, 1, 1, 1]
+        assert p.pulp_problem.objective.value() == 70
+
+    def test_pmedian_nearest(self, cost_matrix):
+        costs = cost_matrix.nearest(2)
+        p = Problem.pmedian(costs, 2)
+        assert p.stats.variables is None
+        p.solve(GLPK())
+        assert p.selected_supply(costs).tolist() == ["A", "C"]
+        # 3 supply variables and an assignment variable for each of the 8 kept pairs
+        assert p.stats.variables == 11
+
+    def test_pmedian_nearest_infeasible(self, cost_matrix):
+        p = Problem.pmedian(cost_matrix.nearest(1), 2)
+        with pytest.raises(InfeasibleException):
+            p.solve(GLPK())
+
+    def test_pcenter(self, cost_matrix):
+        p = Problem.pcenter(cost_matrix, 2)
+        assert p.problem_type == "pcenter"
+        p.solve(GLPK())
+        assert p.selected_supply(cost_matrix).tolist() == ["A", "C"]
+        assert p.pulp_problem.objective.value() == 3
+
+    def test_pcenter_constraints(self, cost_matrix):
+        p = Problem.pcenter(cost_matrix, 2)
+        constraints = p.pulp_problem.constraints
+        assert {v.name: x for v, x in constraints["Max$demand$3"].items()} == {
+            "Facility$A$demand$3": 9,
+            "Facility$B$demand$3": 1,
+            "Facility$C$demand$3": 3,
+            "MaxCost": -1,
+        }
+        assert constraints["Max$demand$3"].sense == -1
+        assert {v.name: x for v, x in constraints["Num$Facility"].items()} == {
+            "Facility$A": 1,
+            "Facility$B": 1,
+            "Facility$C": 1,
+        }
+        assert constraints["Num$Facility"].sense == 0
+
+    def test_pmedian_invalid_costs(self, binary_coverage):
+        with pytest.raises(TypeError) as e:
+            Problem.pmedian(binary_coverage, 2)
+        assert (
+            e.value.args[0]
+            == "Expected 'CostMatrix' type for costs, got '<class 'allagash.coverage.Coverage'>'"
+        )
+
+    def test_pmedian_invalid_p(self, cost_matrix):
+        with pytest.raises(ValueError) as e:
+            Problem.pmedian(cost_matrix, 4)
+        assert e.value.args[0] == "Invalid p '4'"
+
+    def test_pmedian_unassigned_demand(self):
+        costs = CostMatrix.from_distance_matrix(pd.DataFrame([[1, 2], [np.nan] * 2]))
+        with pytest.raises(ValueError) as e:
+            Problem.pmedian(costs, 1)
+        assert (
+            e.value.args[0]
+            == "Every demand location must have a cost, 1 demand locations have none"
+        )
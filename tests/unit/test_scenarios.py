@@ -0,0 +1,111 @@
+import pytest
+from pulp import GLPK
+from allagash.problem import InfeasibleException
+from allagash.scenarios import Scenario, ScenarioRunner
+from allagash.solvers import GreedySolver
+
+
+class TestScenarioRunner:
+    def test_run(self, binary_coverage):
+        runner = ScenarioRunner(binary_coverage)
+        scenarios = [
+            Scenario("mclp", binary_coverage, max_supply={binary_coverage: k}, name=k)
+            for k in (1, 2)
+        ]
+        results = {r.name: r for r in runner.run(scenarios, GreedySolver())}
+        assert results[1].status == 1
+        assert results[1].objective == 700
+        assert results[1].selected_supply(binary_coverage).tolist() == [3]
+        assert sorted(results[1].selected_demand(binary_coverage)) == [3, 4]
+        assert results[2].objective == 1000
+
+    def test_run_processes(self, binary_coverage):
+        runner = ScenarioRunner(binary_coverage, n_jobs=2)
+        scenarios = [
+            Scenario("mclp", binary_coverage, max_supply={binary_coverage: k})
+            for k in (1, 2, 3)
+        ]
+        results = {r.name: r for r in runner.run(scenarios, GreedySolver())}
+        assert sorted(results) == [0, 1, 2]
+        assert results[0].selected_supply(binary_coverage).tolist() == [3]
+        assert results[2].objective == 1000
+
+    def test_run_pulp_solver(self, binary_coverage):
+        runner = ScenarioRunner(binary_coverage, n_jobs=2)
+        scenarios = [
+            Scenario("mclp", binary_coverage, max_supply={binary_coverage: k}, name=k)
+            for k in (1, 2)
+        ]
+        results = {r.name: r for r in runner.run(scenarios, GLPK(msg=False))}
+        assert results[1].objective == 700
+        assert results[2].objective == 1000
+        assert sorted(results[2].selected_supply(binary_coverage)) == [1, 3]
+
+    def test_run_supply_ids(self, binary_coverage):
+        runner = ScenarioRunner(binary_coverage)
+        scenario = Scenario(
+            "mclp",
+            binary_coverage,
+            max_supply={binary_coverage: 1},
+            supply_ids={binary_coverage: [1, 2]},
+        )
+        result = next(runner.run([scenario], GreedySolver()))
+        assert result.selected_supply(binary_coverage).tolist() == [1]
+        assert result.objective == 600
+
+    def test_run_demand(self, binary_coverage):
+        runner = ScenarioRunner(binary_coverage)
+        scenario = Scenario(
+            "mclp",
+            binary_coverage,
+            max_supply={binary_coverage: 1},
+            demand={binary_coverage: [1000, 0, 0, 0, 0]},
+        )
+        result = next(runner.run([scenario], GreedySolver()))
+        assert result.selected_supply(binary_coverage).tolist() == [1]
+        assert result.objective == 1000
+
+    def test_run_infeasible(self, binary_coverage):
+        runner = ScenarioRunner(binary_coverage)
+        result = next(runner.run([Scenario("lscp", binary_coverage)], GreedySolver()))
+        assert result.status == -1
+        assert result.objective is None
+        assert isinstance(result.exception, InfeasibleException)
+        with pytest.raises(RuntimeError) as e:
+            result.selected_supply(binary_coverage)
+        assert e.value.args[0] == "Scenario '0' was not solved"
+
+    def test_run_unknown_coverage(self, binary_coverage, binary_coverage2):
+        runner = ScenarioRunner(binary_coverage)
+        scenario = Scenario("mclp", binary_coverage2, max_supply={binary_coverage2: 1})
+        with pytest.raises(ValueError) as e:
+            list(runner.run([scenario], GreedySolver()))
+        assert (
+            e.value.args[0]
+            == f"Coverage with supply named '{binary_coverage2.supply_name}' is not a base coverage of the runner"
+        )
+
+    def test_init_invalid_n_jobs(self, binary_coverage):
+        with pytest.raises(ValueError) as e:
+            ScenarioRunner(binary_coverage, n_jobs=0)
+        assert e.value.args[0] == "Invalid n_jobs '0'"
+
+
+class TestScenario:
+    def test_invalid_problem_type(self, binary_coverage):
+        with pytest.raises(ValueError) as e:
+            Scenario("pmedian", binary_coverage)
+        assert e.value.args[0] == "Invalid problem_type: 'pmedian'"
+
+    def test_missing_max_supply(self, binary_coverage):
+        with pytest.raises(ValueError) as e:
+            Scenario("mclp", binary_coverage)
+        assert e.value.args[0] == "'max_supply' is required for 'mclp' scenarios"
+
+    def test_invalid_supply_ids(self, binary_coverage):
+        with pytest.raises(TypeError) as e:
+            Scenario("lscp", binary_coverage, supply_ids=[1, 2])
+        assert (
+            e.value.args[0]
+            == "Expected 'dict' type for supply_ids, got '<class 'list'>'"
+        )
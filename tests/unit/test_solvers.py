@@ -0,0 +1,287 @@
+import pulp
+import pytest
+from pulp import GLPK
+from allagash.model import MatrixModel
+from allagash.problem import Problem, InfeasibleException
+from allagash.solvers import (
+    DecompositionSolver,
+    GreedySolver,
+    HeuristicSolution,
+    HeuristicSolver,
+    HighsSolver,
+    LagrangianSolver,
+    MatrixSolution,
+    MatrixSolver,
+    _solve_component_model,
+)
+
+
+class _LimitedCBC(pulp.PULP_CBC_CMD):
+    # CBC reports an optimal status with a feasible solution status when it stops on a time or gap limit
+    def actualSolve(self, lp, **kwargs):
+        status = super().actualSolve(lp, **kwargs)
+        lp.sol_status = pulp.LpSolutionIntegerFeasible
+        return status
+
+
+class TestGreedySolver:
+    def test_mclp(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 1})
+        p.solve(GreedySolver())
+        assert p.selected_supply(binary_coverage).tolist() == [3]
+        assert sorted(p.selected_demand(binary_coverage)) == [3, 4]
+        assert p.solution.objective == 700
+        assert p.solution.bound is None
+        assert p.solution.gap is None
+
+    def test_mclp_multiple_coverages(self, binary_coverage, binary_coverage2):
+        p = Problem.mclp(
+            [binary_coverage, binary_coverage2],
+            max_supply={binary_coverage: 1, binary_coverage2: 1},
+        )
+        p.solve(GreedySolver())
+        assert len(p.selected_supply(binary_coverage)) == 1
+        assert len(p.selected_supply(binary_coverage2)) == 1
+
+    def test_lscp(self, binary_coverage, binary_coverage2):
+        p = Problem.lscp([binary_coverage, binary_coverage2])
+        p.solve(GreedySolver())
+        assert len(p.selected_supply(binary_coverage)) == 1
+        assert len(p.selected_supply(binary_coverage2)) == 1
+
+    def test_lscp_infeasible(self, binary_coverage):
+        p = Problem.lscp(binary_coverage)
+        with pytest.raises(InfeasibleException):
+            p.solve(GreedySolver())
+
+    def test_bclp(self, binary_coverage):
+        p = Problem.bclp(binary_coverage, max_supply={binary_coverage: 1})
+        with pytest.raises(ValueError) as e:
+            p.solve(GreedySolver())
+        assert e.value.args[0] == "GreedySolver can not solve 'bclp' problems"
+
+    def test_solve_invalid_model(self):
+        with pytest.raises(TypeError) as e:
+            GreedySolver().solve(None, "mclp")
+        assert (
+            e.value.args[0]
+            == "Expected 'MatrixModel' type for model, got '<class 'NoneType'>'"
+        )
+
+    def test_abstract_base(self):
+        with pytest.raises(TypeError):
+            HeuristicSolver()
+
+
+class TestLagrangianSolver:
+    def test_mclp(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 1})
+        p.solve(LagrangianSolver())
+        assert p.selected_supply(binary_coverage).tolist() == [3]
+        assert p.solution.objective == 700
+        assert p.solution.bound >= 700
+        assert p.solution.gap == pytest.approx(0, abs=1e-3)
+
+    def test_lscp(self, binary_coverage, binary_coverage2):
+        p = Problem.lscp([binary_coverage, binary_coverage2])
+        p.solve(LagrangianSolver())
+        assert p.solution.objective == 2
+        assert p.solution.bound <= 2
+
+    def test_lscp_model(self, binary_coverage, binary_coverage2):
+        solution = LagrangianSolver().solve(
+            MatrixModel.lscp([binary_coverage, binary_coverage2]), "lscp"
+        )
+        assert sum(solution.values.values()) == 2
+
+    def test_invalid_iterations(self):
+        with pytest.raises(TypeError) as e:
+            LagrangianSolver(iterations=None)
+        assert (
+            e.value.args[0]
+            == "Expected 'int' type for iterations, got '<class 'NoneType'>'"
+        )
+
+
+class TestHighsSolver:
+    def test_mclp(self, binary_coverage):
+        pytest.importorskip("highspy")
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 1})
+        p.solve(HighsSolver())
+        assert p.selected_supply(binary_coverage).tolist() == [3]
+        assert sorted(p.selected_demand(binary_coverage)) == [3, 4]
+        assert p.solution.objective == 700
+        assert p.solution.gap == pytest.approx(0, abs=1e-4)
+
+    def test_lscp(self, binary_coverage, binary_coverage2):
+        pytest.importorskip("highspy")
+        p = Problem.lscp([binary_coverage, binary_coverage2])
+        p.solve(HighsSolver(time_limit=10, mip_gap=0, threads=1))
+        assert p.solution.objective == 2
+        assert len(p.selected_supply(binary_coverage)) == 1
+        assert len(p.selected_supply(binary_coverage2)) == 1
+
+    def test_lscp_infeasible(self, binary_coverage):
+        pytest.importorskip("highspy")
+        p = Problem.lscp(binary_coverage)
+        with pytest.raises(InfeasibleException):
+            p.solve(HighsSolver())
+
+    def test_lscp_presolve_infeasible(self, binary_coverage):
+        pytest.importorskip("highspy")
+        p = Problem.lscp(binary_coverage, presolve=True)
+        with pytest.raises(InfeasibleException):
+            p.solve(HighsSolver())
+
+    def test_bclp(self, binary_coverage, binary_coverage2):
+        pytest.importorskip("highspy")
+        p = Problem.bclp(
+            [binary_coverage, binary_coverage2],
+            max_supply={binary_coverage: 2, binary_coverage2: 2},
+        )
+        p.solve(HighsSolver())
+        assert p.solution.status == 1
+        assert len(p.selected_supply(binary_coverage)) <= 2
+
+    def test_cmclp(self, binary_coverage):
+        pytest.importorskip("highspy")
+        p = Problem.cmclp(
+            binary_coverage,
+            max_supply={binary_coverage: 2},
+            capacity={binary_coverage: [250, 300, 400]},
+        )
+        p.solve(HighsSolver())
+        assert p.selected_supply(binary_coverage).tolist() == [2, 3]
+        assert p.solution.objective == 700
+        assert p.assignments(binary_coverage)["supply_id"].tolist() == [2, 3]
+
+    def test_pmedian(self, cost_matrix):
+        pytest.importorskip("highspy")
+        p = Problem.pmedian(cost_matrix.nearest(2), 2)
+        p.solve(HighsSolver())
+        assert p.selected_supply(cost_matrix).tolist() == ["A", "C"]
+        assert p.solution.objective == 70
+
+    def test_pcenter(self, cost_matrix):
+        pytest.importorskip("highspy")
+        p = Problem.pcenter(cost_matrix, 2)
+        p.solve(HighsSolver())
+        assert p.selected_supply(cost_matrix).tolist() == ["A", "C"]
+        assert p.solution.objective == pytest.approx(3)
+
+    def test_solution_type(self, binary_coverage):
+        pytest.importorskip("highspy")
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 1})
+        p.solve(HighsSolver())
+        assert isinstance(p.solution, MatrixSolution)
+        # The former name is kept as an alias
+        assert HeuristicSolution is MatrixSolution
+
+    def test_matrix_solver(self):
+        assert isinstance(HighsSolver(), MatrixSolver)
+        assert not isinstance(HighsSolver(), HeuristicSolver)
+
+    def test_invalid_time_limit(self):
+        with pytest.raises(TypeError) as e:
+            HighsSolver(time_limit="10")
+        assert (
+            e.value.args[0]
+            == "Expected 'float' type for time_limit, got '<class 'str'>'"
+        )
+
+    def test_negative_mip_gap(self):
+        with pytest.raises(ValueError) as e:
+            HighsSolver(mip_gap=-1)
+        assert e.value.args[0] == "Invalid mip_gap '-1'"
+
+    def test_invalid_threads(self):
+        with pytest.raises(ValueError) as e:
+            HighsSolver(threads=0)
+        assert e.value.args[0] == "Invalid threads '0'"
+
+
+class TestDecompositionSolver:
+    def test_components(self, component_coverage):
+        n, demand_labels, supply_labels = DecompositionSolver.components(
+            component_coverage.matrix
+        )
+        assert n == 2
+        assert demand_labels.tolist() == [0, 1, 0, 1, 0, 1]
+        assert supply_labels.tolist() == [0, 0, 1, 1]
+
+    def test_lscp(self, component_coverage):
+        p = Problem.lscp(component_coverage)
+        p.solve(DecompositionSolver(GLPK()))
+        assert p.selected_supply(component_coverage).tolist() == ["A", "B", "C", "D"]
+        assert p.solution.objective == 4
+
+    def test_lscp_highs(self, component_coverage):
+        pytest.importorskip("highspy")
+        p = Problem.lscp(component_coverage)
+        p.solve(DecompositionSolver(HighsSolver(), n_jobs=2))
+        assert p.solution.objective == 4
+        assert p.solution.bound == pytest.approx(4)
+
+    def test_lscp_infeasible(self, binary_coverage):
+        p = Problem.lscp(binary_coverage)
+        with pytest.raises(InfeasibleException):
+            p.solve(DecompositionSolver(GreedySolver()))
+
+    def test_lscp_feasible_components(self, component_coverage):
+        p = Problem.lscp(component_coverage)
+        p.solve(DecompositionSolver(_LimitedCBC(msg=False)))
+        assert p.solution.objective == 4
+        # The components are not known to be optimal, so neither is the solution
+        assert p.solution.bound is None
+        assert p.solution.gap is None
+
+    def test_mclp_feasible_components(self, component_coverage):
+        model = MatrixModel.mclp(component_coverage, max_supply={component_coverage: 2})
+        solution = _solve_component_model(_LimitedCBC(msg=False), model, "mclp")
+        assert solution.objective == 160
+        assert solution.bound is None
+
+    @pytest.mark.parametrize(
+        "max_supply, supply, objective",
+        [(1, ["D"], 110), (2, ["B", "D"], 160), (3, ["B", "C", "D"], 200)],
+    )
+    def test_mclp(self, component_coverage, max_supply, supply, objective):
+        p = Problem.mclp(
+            component_coverage, max_supply={component_coverage: max_supply}
+        )
+        p.solve(DecompositionSolver(GLPK()))
+        assert p.selected_supply(component_coverage).tolist() == supply
+        assert p.solution.objective == objective
+        assert p.solution.bound == pytest.approx(objective)
+
+    def test_mclp_highs(self, binary_coverage):
+        pytest.importorskip("highspy")
+        p = Problem.mclp(binary_coverage, max_supply={binary_coverage: 1})
+        p.solve(DecompositionSolver(HighsSolver()))
+        assert p.selected_supply(binary_coverage).tolist() == [3]
+        assert p.solution.objective == 700
+
+    def test_mclp_multiple_max_supply(self, binary_coverage, binary_coverage2):
+        p = Problem.mclp(
+            [binary_coverage, binary_coverage2],
+            max_supply={binary_coverage: 1, binary_coverage2: 1},
+        )
+        with pytest.raises(ValueError) as e:
+            p.solve(DecompositionSolver(GreedySolver()))
+        assert (
+            e.value.args[0]
+            == "DecompositionSolver can only solve MCLP problems with one maximum supply"
+        )
+
+    def test_matrix_solver(self):
+        solver = DecompositionSolver(GreedySolver())
+        assert isinstance(solver, MatrixSolver)
+        assert not isinstance(solver, HeuristicSolver)
+
+    def test_invalid_solver(self):
+        with pytest.raises(TypeError) as e:
+            DecompositionSolver(None)
+        assert (
+            e.value.args[0]
+            == "Expected 'LpSolver' or 'MatrixSolver' type for solver, got '<class 'NoneType'>'"
+        )
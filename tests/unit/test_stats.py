@@ -0,0 +1,79 @@
+import pytest
+from pulp import GLPK
+from allagash.problem import Problem
+from allagash.solvers import GreedySolver
+from allagash.stats import ProblemStats
+
+
+class TestProblemStats:
+    def test_phases(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, {binary_coverage: 1})
+        p.solve(GLPK(msg=False))
+        p.selected_supply(binary_coverage)
+        assert list(p.stats.durations) == [
+            "validate",
+            "generate",
+            "solve",
+            "read_solution",
+        ]
+        assert all(v >= 0 for v in p.stats.durations.values())
+        assert p.stats.total_time == pytest.approx(sum(p.stats.durations.values()))
+
+    def test_size(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, {binary_coverage: 1})
+        assert p.stats.variables is None
+        p.pulp_problem
+        # 5 demand and 3 supply variables, 5 demand and 1 supply constraints
+        assert p.stats.variables == 8
+        assert p.stats.constraints == 6
+        assert p.stats.nonzeros == 14
+
+    def test_size_matrix_model(self, binary_coverage):
+        p = Problem.mclp(binary_coverage, {binary_coverage: 1})
+        p.solve(GreedySolver())
+        assert list(p.stats.durations) == ["validate", "matrix_model", "solve"]
+        assert p.stats.variables == 8
+        assert p.stats.constraints == 6
+        assert p.stats.nonzeros == 14
+
+    def test_presolve(self, binary_coverage):
+        p = Problem.lscp(binary_coverage, presolve=True)
+        assert "presolve" in p.stats.durations
+
+    def test_callback(self, binary_coverage):
+        phases = []
+        p = Problem.mclp(binary_coverage, {binary_coverage: 1})
+        p.stats.add_callback(lambda phase, seconds, stats: phases.append(phase))
+        p.solve(GLPK(msg=False))
+        p.solve(GLPK(msg=False))
+        assert phases == ["generate", "solve", "solve"]
+
+    def test_failed_phase(self, binary_coverage):
+        phases = []
+        p = Problem.bclp(binary_coverage, {binary_coverage: 1})
+        p.stats.add_callback(lambda phase, seconds, stats: phases.append(phase))
+        with pytest.raises(ValueError):
+            p.solve(GreedySolver())
+        assert phases == ["matrix_model", "solve"]
+        assert p.stats.durations["solve"] >= 0
+
+    def test_callback_invalid(self):
+        with pytest.raises(TypeError) as e:
+            ProblemStats().add_callback(None)
+        assert (
+            e.value.args[0]
+            == "Expected callable for callback, got '<class 'NoneType'>'"
+        )
+
+    def test_to_dict(self, binary_coverage):
+        p = Problem.lscp(binary_coverage)
+        stats = p.stats.to_dict()
+        assert list(stats) == [
+            "durations",
+            "total_time",
+            "variables",
+            "constraints",
+            "nonzeros",
+            "peak_memory",
+        ]
+        assert stats["peak_memory"] > 0